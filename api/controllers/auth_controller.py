@@ -1,7 +1,6 @@
 from fastapi import HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from json import JSONDecodeError
-from api import db
 from api.models.user.User import User
 from api.models.user.Role import Role
 from api.extensions.jwt.dependencies import get_current_user
@@ -27,11 +26,11 @@ async def signup(request: Request):
     print(f"DEBUG: Role extracted from request: {role}")  # Debug line
     
     # Validate that the role exists
-    if not Role.get_role_by_name(role):
+    if not await Role.get_role_by_name(role):
         raise HTTPException(status_code=400, detail=f"Invalid role: {role}")
 
     try:
-        result = User.signup(
+        result = await User.signup(
             username=data["username"],
             first_name=data["first_name"],
             last_name=data["last_name"],
@@ -40,7 +39,7 @@ async def signup(request: Request):
             role=role  # Pass the role parameter
         )
         print(f"DEBUG: User.signup result: {result}")  # Debug line
-        return JSONResponse(
+        return FastJSONResponse(
             content={"message": "User created", "data": result},
             status_code=201
         )
@@ -62,10 +61,10 @@ async def signin(request: Request):
         raise HTTPException(status_code=400, detail="Missing credentials")
 
     try:
-        user = User.authenticate(identifier, password)
-        token, expires = User.generate_token(str(user["_id"]))
+        user = await User.authenticate(identifier, password)
+        token, expires = await User.generate_token(str(user["_id"]))
         
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Login successful",
                 "token": token,
@@ -92,18 +91,16 @@ async def reset_password(request: Request):
         if not email or not new_password:
             raise HTTPException(status_code=400, detail="Email and new password are required")
 
-        user = User.get_by_email(email)
+        user = await User.get_by_email(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Hash the new password (assuming User.hash_password exists)
-        hashed = User.hash_password(new_password)
-        users_collection = getattr(db, "users", None)
-        if users_collection is None:
-            raise HTTPException(status_code=500, detail="Users collection not found in db module")
-        users_collection.update_one({"email": email}, {"$set": {"password": hashed}})
+        hashed = await User.hash_password(new_password)
+        users_collection = User.get_collection()
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"password": hashed}})
 
-        return JSONResponse(content={"message": "Password reset successful"}, status_code=200)
+        return FastJSONResponse(content={"message": "Password reset successful"}, status_code=200)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reset password: {str(e)}")
 
@@ -129,8 +126,8 @@ async def update_profile(request: Request, current_user: dict = Depends(get_curr
             raise HTTPException(status_code=400, detail="Password must be at least 6 characters long")
     
     try:
-        result = User.update_profile(user_id, update_data)
-        return JSONResponse(
+        result = await User.update_profile(user_id, update_data)
+        return FastJSONResponse(
             content={
                 "message": "Profile updated successfully",
                 "data": result
@@ -148,7 +145,7 @@ async def get_profile(current_user: dict = Depends(get_current_user)):
         # Clean and serialize user data
         user_data = clean_user_data(current_user)
         
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Profile retrieved successfully",
                 "data": user_data
@@ -1,11 +1,13 @@
 # import datetime
 from fastapi import HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from json import JSONDecodeError
-from api.models.order.Order import Order
+from api.models.order.Order import Order, BOOKING_EXPORT_FIELDS
 from datetime import datetime
 from api.extensions.jwt.dependencies import get_current_user, require_vendor, require_supplier, require_any_role
 from typing import Optional
+from api.extensions.helper.pagination import get_page_params
+from api.extensions.helper.export import get_export_format, stream_export
 
 # create booking function 
 async def create_booking(request: Request, current_user: dict):
@@ -26,7 +28,9 @@ async def create_booking(request: Request, current_user: dict):
     data["vendor_id"] = current_user["uid"]
     print(f"DEBUG: vendor_id set to: {current_user['uid']}")
 
-    required_fields = ["supplier_id", "product_id", "qty", "total_price"]
+    # supplier_id and total_price are derived from the product when stock is reserved;
+    # a multi-line order sends {"items": [{"product_id", "qty"}, ...]} instead
+    required_fields = ["items"] if "items" in data else ["product_id", "qty"]
     # FIX: Accept 0 and 0.0 as valid values
     missing = [field for field in required_fields if field not in data or data[field] is None]
     if missing:
@@ -35,11 +39,11 @@ async def create_booking(request: Request, current_user: dict):
 
     print(f"DEBUG: About to call Order.create_booking with: {data}")
     try:
-        booking = Order.create_booking(data)
+        booking = await Order.create_booking(data)
         print(f"DEBUG: Booking created: {booking}")
         if "order_date" in booking and isinstance(booking["order_date"], datetime):
             booking["order_date"] = booking["order_date"].isoformat()
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Booking created successfully",
                 "data": booking
@@ -62,11 +66,13 @@ async def get_bookings_by_supplier(supplier_id: str, request: Request, current_u
     try:
         if not current_user or current_user.get("uid") != supplier_id:
             raise HTTPException(status_code=403, detail="Access denied: can only view own bookings")
-        bookings = Order.get_bookings_by_supplier(supplier_id)
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await Order.get_bookings_by_supplier(supplier_id, cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Bookings fetched successfully",
-                "data": bookings
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
@@ -83,11 +89,13 @@ async def get_bookings_by_vendor(vendor_id: str, request: Request, current_user:
     try:
         if not current_user or current_user.get("uid") != vendor_id:
             raise HTTPException(status_code=403, detail="Access denied: can only view own bookings")
-        bookings = Order.get_bookings_by_vendor(vendor_id)
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await Order.get_bookings_by_vendor(vendor_id, cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Bookings fetched successfully",
-                "data": bookings
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
@@ -102,11 +110,8 @@ async def update_booking_status_controller(booking_id: str, status: str, current
     Update the status of a booking (supplier only).
     """
     try:
-        # Fetch the booking to check supplier_id
-        booking = Order.get_booking_by_id(booking_id)
-        if not booking or booking.get("supplier_id") != current_user["uid"]:
-            raise HTTPException(status_code=403, detail="Access denied: can only update your own bookings")
-        updated_booking = Order.update_booking_status(booking_id, status)
+        # Ownership and the allowed transition are checked by the update itself
+        updated_booking = await Order.update_booking_status(booking_id, status, supplier_id=current_user["uid"])
         return {
             "message": "Booking status updated successfully",
             "data": updated_booking
@@ -116,17 +121,63 @@ async def update_booking_status_controller(booking_id: str, status: str, current
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update booking: {str(e)}")
 
+async def bulk_update_booking_status_controller(request: Request, current_user: dict):
+    """
+    Update the status of many bookings in one request (supplier only).
+    Body: {"updates": [{"booking_id": "...", "status": "confirmed"}, ...]}
+    Each item gets its own result; one failing item does not fail the others.
+    """
+    try:
+        data = await request.json()
+    except JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body cannot be empty")
+    updates = data.get("updates") if isinstance(data, dict) else None
+    if not isinstance(updates, list) or not updates:
+        raise HTTPException(status_code=400, detail="updates must be a non-empty list")
+
+    results = await Order.bulk_update_status(updates, supplier_id=current_user["uid"])
+    updated = sum(1 for result in results if result["ok"])
+    return FastJSONResponse(
+        content={
+            "message": "Booking statuses processed",
+            "data": {"updated": updated, "failed": len(results) - updated, "results": results}
+        },
+        status_code=200
+    )
+
+async def quote_order(request: Request, current_user: dict):
+    """
+    Price a cart server-side before checkout.
+    Body: {"items": [{"product_id": "...", "qty": 3}, ...]}
+    """
+    try:
+        data = await request.json()
+    except JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Request body cannot be empty")
+    items = data.get("items") if isinstance(data, dict) else None
+
+    quote = await Order.quote(items)
+    return FastJSONResponse(
+        content={
+            "message": "Quote computed",
+            "data": quote
+        },
+        status_code=200
+    )
+
 async def get_my_bookings(request: Request, current_user: dict):
     """
     Endpoint to get all bookings for the current vendor (vendor only).
     """
     try:
         vendor_id = current_user["uid"]
-        bookings = Order.get_bookings_by_vendor(vendor_id)
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await Order.get_bookings_by_vendor(vendor_id, cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Bookings fetched successfully",
-                "data": bookings
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
@@ -141,11 +192,13 @@ async def get_my_supplier_bookings(request: Request, current_user: dict):
     """
     try:
         supplier_id = current_user["uid"]
-        bookings = Order.get_bookings_by_supplier(supplier_id)
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await Order.get_bookings_by_supplier(supplier_id, cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Bookings fetched successfully",
-                "data": bookings
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
@@ -153,3 +206,16 @@ async def get_my_supplier_bookings(request: Request, current_user: dict):
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch bookings: {str(e)}")
+
+async def export_bookings(request: Request, current_user: dict):
+    """
+    Endpoint to stream bookings as NDJSON or CSV (?format=ndjson|csv).
+    Vendors and suppliers get their own bookings, admins get all of them.
+    """
+    export_format = get_export_format(request)
+    role = current_user.get("role")
+    cursor = Order.export_bookings(
+        vendor_id=current_user["uid"] if role == "vendor" else None,
+        supplier_id=current_user["uid"] if role == "supplier" else None,
+    )
+    return stream_export(cursor, BOOKING_EXPORT_FIELDS, export_format, "bookings")
@@ -0,0 +1,16 @@
+from fastapi import Request
+from api.models.payment.Payment_history import PaymentHistory, PAYMENT_HISTORY_EXPORT_FIELDS
+from api.extensions.helper.export import get_export_format, stream_export
+
+async def export_payment_history(request: Request, current_user: dict):
+    """
+    Endpoint to stream payment history as NDJSON or CSV (?format=ndjson|csv).
+    Vendors and suppliers get their own records, admins get all of them.
+    """
+    export_format = get_export_format(request)
+    role = current_user.get("role")
+    cursor = PaymentHistory.export_payment_histories(
+        vendor_id=current_user["uid"] if role == "vendor" else None,
+        supplier_id=current_user["uid"] if role == "supplier" else None,
+    )
+    return stream_export(cursor, PAYMENT_HISTORY_EXPORT_FIELDS, export_format, "payment_history")
@@ -1,13 +1,13 @@
 from fastapi import HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from json import JSONDecodeError
-from api.models.product.Product import ProductModel
+from api.models.product.Product import ProductModel, PRODUCT_EXPORT_FIELDS
 from api.extensions.jwt.dependencies import get_current_user, require_supplier, require_admin, require_any_role
 from typing import Optional
 from api.models.Location import LocationModel
-from api.db import db
 from bson import ObjectId
-from api.extensions.helper.json_serializer import serialize_for_json
+from api.extensions.helper.pagination import get_page_params
+from api.extensions.helper.export import get_export_format, stream_export
 import traceback
 
 async def create_product(request: Request, current_user: dict = Depends(require_supplier)):
@@ -56,7 +56,7 @@ async def create_product(request: Request, current_user: dict = Depends(require_
         
         # Try to create the product step by step
         try:
-            product = ProductModel.create_product(
+            product = await ProductModel.create_product(
                 name=data["name"],
                 category=data["category"],
                 price_per_unit=data["price_per_unit"],
@@ -74,7 +74,7 @@ async def create_product(request: Request, current_user: dict = Depends(require_
             raise model_error
 
         print(f"DEBUG: About to return JSONResponse")
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Product created successfully",
                 "data": product
@@ -105,7 +105,7 @@ async def update_product(product_id: str, request: Request, current_user: dict =
     data.pop("supplier_id", None)  # Remove supplier_id from request - it comes from token
 
     try:
-        updated_product = ProductModel.update_product(
+        updated_product = await ProductModel.update_product(
             product_id=product_id,
             name=data.get("name"),
             category=data.get("category"),
@@ -117,7 +117,7 @@ async def update_product(product_id: str, request: Request, current_user: dict =
             image_url=data.get("image_url")
         )
 
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Product updated successfully",
                 "data": updated_product
@@ -132,14 +132,17 @@ async def update_product(product_id: str, request: Request, current_user: dict =
 # get all products of supplier
 async def get_all_products(request: Request, _=Depends(require_any_role)):
     """
-    Endpoint to get all products (any authenticated user).
+    Endpoint to get a page of products (any authenticated user).
+    Pass ?cursor=<next_cursor>&limit=<n> to fetch the following page.
     """
     try:
-        products = ProductModel.get_all_products()
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await ProductModel.get_all_products(cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Products fetched successfully",
-                "data": products
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
@@ -154,8 +157,8 @@ async def delete_product(product_id: str, request: Request, current_user: dict =
     Endpoint to delete a product (supplier only).
     """
     try:
-        result = ProductModel.delete_product(product_id)
-        return JSONResponse(
+        result = await ProductModel.delete_product(product_id)
+        return FastJSONResponse(
             content=result,
             status_code=200
         )
@@ -174,8 +177,8 @@ async def get_my_products(request: Request, current_user: dict = Depends(require
         print(f"DEBUG: Getting products for supplier: {supplier_id}")
         
         # Call the model method - use get_products_by_supplier
-        products = ProductModel.get_products_by_supplier(supplier_id)
-        return JSONResponse(
+        products = await ProductModel.get_products_by_supplier(supplier_id)
+        return FastJSONResponse(
             content={
                 "message": "Products fetched successfully",
                 "data": products
@@ -185,4 +188,14 @@ async def get_my_products(request: Request, current_user: dict = Depends(require
     except HTTPException as e:
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
+
+async def export_products(request: Request, current_user: dict):
+    """
+    Endpoint to stream products as NDJSON or CSV (?format=ndjson|csv).
+    Suppliers get their own products, admins get the whole catalogue.
+    """
+    export_format = get_export_format(request)
+    supplier_id = current_user["uid"] if current_user.get("role") == "supplier" else None
+    cursor = ProductModel.export_products(supplier_id=supplier_id)
+    return stream_export(cursor, PRODUCT_EXPORT_FIELDS, export_format, "products")
@@ -1,8 +1,9 @@
 from fastapi import HTTPException, Request, Depends
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from json import JSONDecodeError
 from api.models.review.Review import ReviewModel
 from api.extensions.jwt.dependencies import get_current_user, require_vendor, require_any_role
+from api.extensions.helper.pagination import get_page_params
 
 async def give_review(request: Request, current_user: dict = Depends(require_vendor)):
     """
@@ -23,14 +24,14 @@ async def give_review(request: Request, current_user: dict = Depends(require_ven
         raise HTTPException(status_code=400, detail=f"Missing required fields: {', '.join(missing)}")
 
     try:
-        review = ReviewModel.give_review(
+        review = await ReviewModel.give_review(
             vendor_id=data["vendor_id"],
             supplier_id=data["supplier_id"],
             rating=data["rating"],
             comment=data.get("comment")
         )
 
-        return JSONResponse(
+        return FastJSONResponse(
             content={
                 "message": "Review submitted successfully",
                 "data": review
@@ -50,11 +51,13 @@ async def list_reviews(request: Request, _=Depends(require_any_role)):
     try:
         vendor_id = request.query_params.get("vendor_id")
         supplier_id = request.query_params.get("supplier_id")
-        reviews = ReviewModel.list_reviews(vendor_id=vendor_id, supplier_id=supplier_id)
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await ReviewModel.list_reviews(vendor_id=vendor_id, supplier_id=supplier_id, cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Reviews fetched successfully",
-                "data": reviews
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
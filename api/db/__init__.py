@@ -1,10 +1,10 @@
 import os
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 import ssl
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.concurrency import asynccontextmanager
 import asyncio
 import redis.asyncio as redis
@@ -19,6 +19,8 @@ redis_client = None
 
 isMySqlAvailable = False
 isMongoDBAvailable = False
+# Set by init_mongo: the server is a replica set member or mongos, so it runs transactions
+mongoSupportsTransactions = False
 
 
 
@@ -26,23 +28,138 @@ load_dotenv()
 
 # Redis Configuration
 REDIS_URL = os.getenv('REDIS_HOST', 'redis://redis:6379')
+# Connections shared by the cache, ban store and rate limiter in one worker
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+# Seconds a command waits for a free pooled connection before failing
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', '5'))
+
+# MongoDB Configuration
+DB_TYPE = os.getenv('DB_TYPE', 'mongodb')  # Default to MongoDB if not set
+if DB_TYPE not in ['mongodb', 'mysql', 'both']:
+    raise ValueError("Unsupported DB_TYPE. Please set DB_TYPE to 'mongodb', 'mysql', or 'both'.")
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '100'))
+
+async def init_mongo():
+    """
+    Open the Motor (async MongoDB) client on the running event loop.
+    Called from the lifespan so the client is bound to the loop that serves requests.
+    """
+    global client, db, isMongoDBAvailable, mongoSupportsTransactions
+
+    if DB_TYPE not in ['mongodb', 'both']:
+        return
+
+    try:
+        MONGO_SERVER_URL = os.getenv('MONGO_SERVER_URL')
+        MONGO_DB_NAME = os.getenv('MONGO_DB_NAME')
+
+        if not MONGO_DB_NAME:
+            raise ValueError("MONGO_DB_NAME environment variable is not set.")
+
+        # Use default client options for Atlas SRV URI
+        client = AsyncIOMotorClient(MONGO_SERVER_URL, maxPoolSize=MONGO_MAX_POOL_SIZE)
+        hello = await client.admin.command('hello')
+        db = client[MONGO_DB_NAME]
+
+        # A standalone mongod rejects transactions; only replica sets and mongos accept them
+        mongoSupportsTransactions = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        isMongoDBAvailable = True
+        print(f"MongoDB connection established successfully (transactions: {'yes' if mongoSupportsTransactions else 'no'})")
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        isMongoDBAvailable = False
+        mongoSupportsTransactions = False
+        if client is not None:
+            client.close()
+        client = None
+        db = None
+
+def close_mongo():
+    """Close the Motor client opened by init_mongo"""
+    global client, db, isMongoDBAvailable, mongoSupportsTransactions
+
+    if client is not None:
+        client.close()
+    client = None
+    db = None
+    isMongoDBAvailable = False
+    mongoSupportsTransactions = False
+
+def get_collection(name: str):
+    """Return a Motor collection from the lifespan-owned database"""
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection not initialized")
+    return db[name]
+
+async def init_redis():
+    """
+    Open the shared Redis connection pool on the running event loop.
+    Commands wait up to REDIS_POOL_TIMEOUT for a free connection instead of failing.
+    """
+    global redis_client
+
+    pool = redis.BlockingConnectionPool.from_url(
+        REDIS_URL,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=5,
+        socket_timeout=5,
+        health_check_interval=30,
+    )
+    redis_client = redis.Redis(connection_pool=pool)
+    print(f"Redis pool initialized (max {REDIS_MAX_CONNECTIONS} connections)")
+
+async def close_redis():
+    """Close the pool opened by init_redis"""
+    global redis_client
+
+    if redis_client is not None:
+        await redis_client.aclose()
+        await redis_client.connection_pool.disconnect()
+    redis_client = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Lifespan context manager for FastAPI application"""
-    
+    """
+    Lifespan context manager for FastAPI application.
+    Runs once per worker process, so every connection and background task
+    below belongs to the worker's own event loop.
+    """
     try:
-        # Initialize Redis connection
-        redis_client_base = redis.from_url(
-            REDIS_URL,
-            encoding="utf8",
-            decode_responses=True,
-            socket_connect_timeout=5
-        )
+        print(f"Worker {os.getpid()} starting (DB_TYPE={DB_TYPE})")
+
+        # Initialize the databases and the Redis connection pool
+        await init_mongo()
+        init_mysql()
+        await init_redis()
+
+        # Drop stale in-process cache entries when any worker invalidates them
+        from api.extensions.redis_cache.tiered import TieredCache
+        await TieredCache.start()
 
-        # Initialize FastAPI Limiter
+        # Create indexes and default data
+        from api.models import init_models
+        await init_models()
+
+        # Start the bcrypt worker pool
+        from api.extensions.password import PasswordHasher
+        PasswordHasher.start()
+
+        # Start the outgoing mail queue
+        from api.extensions.mail import MAIL, MailQueue
+        await MailQueue.start(MAIL._create_server_connection)
+
+        # Load the shared IP ban list and subscribe to ban updates
+        from api.extensions.ban import BanStore
+        await BanStore.start()
+
+        # Background sender for Discord security alerts
+        from api.extensions.discord import AlertDispatcher
+        await AlertDispatcher.start()
+
+        # Initialize FastAPI Limiter on the same pool
         await FastAPILimiter.init(
-            redis=redis_client_base,
+            redis=redis_client,
             identifier=service_name_identifier,
             http_callback=custom_callback,
         )
@@ -50,89 +167,68 @@ async def lifespan(app: FastAPI):
         yield
 
     except Exception as e:
-        print(f"Failed to initialize Redis: {e}")
-        if redis_client_base:
-            await redis_client_base.close()
+        print(f"Application lifespan failed: {e}")
         raise
     finally:
-        if redis_client_base:
-            await redis_client_base.close()
-            await FastAPILimiter.close()
+        from api.extensions.mail import MailQueue
+        await MailQueue.stop()
 
-def initRedis():
-    global redis_client
+        # Stop Socket.IO background tasks (pings, Redis listener) of this worker
+        from api.socket import sio_server
+        await sio_server.shutdown()
 
-    redis_client = redis.Redis(host="redis", port=6379, db=0)
-    print("Initializing Redis...")
-    # Check if Redis is available
-    try:
-        print("Redis connection established successfully")
-    except redis.ConnectionError:
-        print("Redis connection failed")
-        raise
-    except Exception as e:
-        print(f"Error initializing Redis: {e}")
+        from api.extensions.ban import BanStore
+        await BanStore.stop()
+
+        from api.extensions.discord import AlertDispatcher
+        await AlertDispatcher.stop()
 
-def init_db():
+        from api.extensions.redis_cache.tiered import TieredCache
+        await TieredCache.stop()
+
+        # The limiter shares the pool, so close_redis() closes it for both
+        FastAPILimiter.redis = None
+        await close_redis()
+
+        close_mongo()
+        close_mysql()
+
+        from api.extensions.password import PasswordHasher
+        PasswordHasher.shutdown()
+
+def init_mysql():
     """
-    Initialize database connections based on the DB_TYPE environment variable.
-    Supports MongoDB, MySQL, or both databases simultaneously.
+    Open the SQLAlchemy session when DB_TYPE is 'mysql' or 'both'.
+    Called from the lifespan, so every worker process opens its own connection
+    and nothing is connected at import time.
     """
-    print("\n" * 20) 
-    print("*" * 50)
-    print("*     Welcome to Farm Stack Backend Template     *")
-    print("*" * 50)
-    print("Initializing DB...")
-
-    global client, db, session, isMySqlAvailable, isMongoDBAvailable
-
-    # initialize Redis
-    initRedis()
-
-    DB_TYPE = os.getenv('DB_TYPE', 'mongodb')  # Default to MongoDB if not set
-    print(f"Database type: {DB_TYPE}")
-
-    if DB_TYPE in ['mongodb', 'both']:
-        try:
-            MONGO_SERVER_URL = os.getenv('MONGO_SERVER_URL')
-            MONGO_DB_NAME = os.getenv('MONGO_DB_NAME')
-
-            if not MONGO_DB_NAME:
-                raise ValueError("MONGO_DB_NAME environment variable is not set.")
-
-            # Use default MongoClient for Atlas SRV URI
-            client = MongoClient(MONGO_SERVER_URL)
-            client.admin.command('ping')
-            db = client[MONGO_DB_NAME]
-
-            isMongoDBAvailable = True
-            print("MongoDB connection established successfully")
-        except Exception as e:
-            print(f"Error connecting to MongoDB: {e}")
-            isMongoDBAvailable = False
-            client = None
-            db = None
-
-    if DB_TYPE in ['mysql', 'both']:
-        try:
-            MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
-            MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
-            MYSQL_USER = os.getenv('MYSQL_USER', 'user')
-            MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'password')
-            MYSQL_DB_NAME = os.getenv('MYSQL_DB_NAME', 'dbname')
-
-            MYSQL_SERVER_URL = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB_NAME}"
-            engine = create_engine(MYSQL_SERVER_URL)
-            Session = sessionmaker(bind=engine)
-            session = Session()
-            isMySqlAvailable = True
-            print("MySQL connection established successfully")
-        except Exception as e:
-            print(f"Error connecting to MySQL: {e}")
-            isMySqlAvailable = False
-
-    if DB_TYPE not in ['mongodb', 'mysql', 'both']:
-        raise ValueError("Unsupported DB_TYPE. Please set DB_TYPE to 'mongodb', 'mysql', or 'both'.")
-
-    # Return the database connection objects
-init_db()
\ No newline at end of file
+    global session, isMySqlAvailable
+
+    if DB_TYPE not in ['mysql', 'both']:
+        return
+
+    try:
+        MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
+        MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
+        MYSQL_USER = os.getenv('MYSQL_USER', 'user')
+        MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'password')
+        MYSQL_DB_NAME = os.getenv('MYSQL_DB_NAME', 'dbname')
+
+        MYSQL_SERVER_URL = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB_NAME}"
+        engine = create_engine(MYSQL_SERVER_URL)
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        isMySqlAvailable = True
+        print("MySQL connection established successfully")
+    except Exception as e:
+        print(f"Error connecting to MySQL: {e}")
+        isMySqlAvailable = False
+
+def close_mysql():
+    """Close the session opened by init_mysql"""
+    global session, isMySqlAvailable
+
+    if session is not None:
+        session.close()
+    session = None
+    isMySqlAvailable = False
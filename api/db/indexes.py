@@ -0,0 +1,115 @@
+"""
+Declarative MongoDB index registry.
+
+Models register the indexes their queries rely on at import time:
+
+    register_indexes("users", IndexModel([("username_lower", ASCENDING)], name="username_lower_unique", unique=True))
+
+ensure_indexes() is called from init_models() on startup and is idempotent:
+creating an index that already exists with the same spec is a no-op.
+
+Check mode reports declared indexes that are missing and existing indexes that
+have not served a query since the server started:
+
+    python -m api.db.indexes --check
+"""
+import asyncio
+import sys
+from typing import Any, Dict, List
+
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+from api.db import get_collection
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {}
+
+
+def register_indexes(collection: str, *indexes: IndexModel) -> None:
+    """Declare indexes for a collection. Re-registering the same name replaces it."""
+    declared = INDEX_REGISTRY.setdefault(collection, [])
+    for index in indexes:
+        name = index.document["name"]
+        declared[:] = [existing for existing in declared if existing.document["name"] != name]
+        declared.append(index)
+
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """Create every registered index. Returns the index names created or confirmed per collection."""
+    applied: Dict[str, List[str]] = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = get_collection(collection_name)
+        try:
+            applied[collection_name] = await collection.create_indexes(indexes)
+        except OperationFailure:
+            # Fall back to one index at a time so a single conflict does not hide the others
+            applied[collection_name] = []
+            for index in indexes:
+                try:
+                    applied[collection_name] += await collection.create_indexes([index])
+                except OperationFailure as e:
+                    print(f"Failed to create index {collection_name}.{index.document['name']}: {e}")
+        print(f"Indexes ready on {collection_name}: {', '.join(applied[collection_name])}")
+    return applied
+
+
+async def check_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the registry with the live database.
+
+    Returns per collection:
+        missing:    declared but not present
+        unused:     present (other than _id_) with zero accesses since server start
+        undeclared: present but not in the registry
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for collection_name, indexes in INDEX_REGISTRY.items():
+        collection = get_collection(collection_name)
+        declared = {index.document["name"] for index in indexes}
+        existing = await collection.index_information()
+
+        usage: Dict[str, Any] = {}
+        try:
+            stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+            usage = {stat["name"]: stat.get("accesses", {}).get("ops", 0) for stat in stats}
+        except OperationFailure as e:
+            print(f"Index usage stats unavailable for {collection_name}: {e}")
+
+        report[collection_name] = {
+            "missing": sorted(declared - set(existing)),
+            "unused": sorted(name for name, ops in usage.items() if name != "_id_" and ops == 0),
+            "undeclared": sorted(name for name in existing if name != "_id_" and name not in declared),
+        }
+    return report
+
+
+async def _main(check: bool) -> int:
+    from api import db as database
+    import api.models  # noqa: F401  (imports every model so the registry is complete)
+    # Under `python -m` this file runs as __main__, a second copy with an empty
+    # registry; the models registered into the imported api.db.indexes
+    from api.db import indexes as registry
+
+    await database.init_mongo()
+    if not database.isMongoDBAvailable:
+        print("MongoDB is not available")
+        return 1
+    try:
+        if not check:
+            await registry.ensure_indexes()
+            return 0
+
+        report = await registry.check_indexes()
+        problems = 0
+        for collection_name, result in report.items():
+            for kind in ("missing", "unused", "undeclared"):
+                for name in result[kind]:
+                    problems += kind == "missing"
+                    print(f"{kind:<10} {collection_name}.{name}")
+        return 1 if problems else 0
+    finally:
+        database.close_mongo()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(check="--check" in sys.argv)))
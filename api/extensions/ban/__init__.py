@@ -1,12 +1,250 @@
-def ipBan(ip: str):
-    log_file_path = "/app/logs/custom-ban.log"
-    try:
-        with open(log_file_path, "r") as log:
-            if ip in [line.strip() for line in log]:
-                return  # IP already banned, do nothing
-
-        with open(log_file_path, "a") as log:
-            log.write(f"{ip}\n")
-    except FileNotFoundError:
-        with open(log_file_path, "a") as log:
-            log.write(f"{ip}\n")
+import asyncio
+import math
+import os
+import time
+from typing import Any, Dict, Optional
+from api import db as database
+from api.extensions.helper.metrics import register_metrics
+
+# Appended one IP per line for the host-side firewall (mounted from /opt/ipban/logs)
+BAN_LOG_PATH = os.getenv("BAN_LOG_PATH", "/app/logs/custom-ban.log")
+# Seconds between full reloads from Redis, covering pub/sub messages missed while disconnected
+BAN_REFRESH_INTERVAL = float(os.getenv("BAN_REFRESH_INTERVAL", "60"))
+
+# Sorted set of banned IPs scored by expiry (unix time, +inf for permanent bans)
+BAN_SET_KEY = "ban:ips"
+BAN_CHANNEL = "ban:events"
+
+
+class BanStore:
+    """
+    Shared IP ban list with an O(1) in-process lookup.
+
+    Redis holds the list for all workers as a sorted set scored by expiry. Every
+    worker keeps a local copy in a dict, which is updated from a pub/sub
+    channel and fully reloaded every BAN_REFRESH_INTERVAL. is_banned() only
+    reads the dict, so the per-request check does no I/O.
+
+    Permanent bans are also appended to BAN_LOG_PATH by a background writer.
+    Temporary bans are not, because the firewall reading that file has no
+    notion of expiry. Without Redis the store still works, but only inside the
+    current worker. A ban whose Redis write fails stays local until a refresh
+    manages to write it.
+    """
+    _banned: Dict[str, float] = {}
+    # Bans whose Redis write failed: kept through refreshes and written again by the next one
+    _unsynced: Dict[str, float] = {}
+    _log_queue: Optional[asyncio.Queue] = None
+    _tasks: list = []
+
+    checks = 0
+    blocked = 0
+    bans = 0
+    redis_errors = 0
+
+    @staticmethod
+    def _redis():
+        return database.redis_client
+
+    @staticmethod
+    def is_running() -> bool:
+        return BanStore._log_queue is not None
+
+    @staticmethod
+    async def start() -> None:
+        if BanStore.is_running():
+            return
+        BanStore._log_queue = asyncio.Queue()
+        await BanStore.refresh()
+        BanStore._tasks = [asyncio.create_task(BanStore._log_writer())]
+        if BanStore._redis() is not None:
+            BanStore._tasks.append(asyncio.create_task(BanStore._listener()))
+            BanStore._tasks.append(asyncio.create_task(BanStore._refresher()))
+        print(f"Ban store started with {len(BanStore._banned)} banned IPs")
+
+    @staticmethod
+    async def stop(timeout: float = 5) -> None:
+        if not BanStore.is_running():
+            return
+        try:
+            await asyncio.wait_for(BanStore._log_queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Ban store stopped with {BanStore._log_queue.qsize()} unwritten log lines")
+        for task in BanStore._tasks:
+            task.cancel()
+        await asyncio.gather(*BanStore._tasks, return_exceptions=True)
+        BanStore._tasks = []
+        BanStore._log_queue = None
+
+    @staticmethod
+    def is_banned(ip: str) -> bool:
+        """Per-request check against the local copy. Expired entries are dropped lazily."""
+        BanStore.checks += 1
+        expires_at = BanStore._banned.get(ip)
+        if expires_at is None:
+            return False
+        if expires_at <= time.time():
+            BanStore._banned.pop(ip, None)
+            return False
+        BanStore.blocked += 1
+        return True
+
+    @staticmethod
+    async def ban(ip: str, ttl: Optional[int] = None) -> None:
+        """Ban an IP in every worker, forever or for `ttl` seconds"""
+        expires_at = math.inf if ttl is None else time.time() + ttl
+        already_banned = BanStore._banned.get(ip, 0) > time.time()
+        BanStore._banned[ip] = expires_at
+        BanStore.bans += 1
+
+        if ttl is None and not already_banned and BanStore.is_running():
+            BanStore._log_queue.put_nowait(ip)
+
+        redis_client = BanStore._redis()
+        if redis_client is None:
+            return
+        try:
+            score = "+inf" if ttl is None else expires_at
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(BAN_SET_KEY, {ip: score})
+                pipe.publish(BAN_CHANNEL, f"ban {ip} {score}")
+                await pipe.execute()
+            BanStore._unsynced.pop(ip, None)
+        except Exception as e:
+            BanStore.redis_errors += 1
+            BanStore._unsynced[ip] = expires_at
+            print(f"Ban store write failed, {ip} is banned in this worker until the next refresh: {e}")
+
+    @staticmethod
+    async def unban(ip: str) -> None:
+        BanStore._banned.pop(ip, None)
+        BanStore._unsynced.pop(ip, None)
+        redis_client = BanStore._redis()
+        if redis_client is None:
+            return
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zrem(BAN_SET_KEY, ip)
+                pipe.publish(BAN_CHANNEL, f"unban {ip}")
+                await pipe.execute()
+        except Exception as e:
+            BanStore.redis_errors += 1
+            print(f"Ban store write failed: {e}")
+
+    @staticmethod
+    async def refresh() -> None:
+        """
+        Replace the local copy with the live entries from Redis and purge expired ones.
+        Bans that only exist here (their write failed) are written first, in the same round-trip.
+        """
+        redis_client = BanStore._redis()
+        if redis_client is None:
+            return
+        now = time.time()
+        pending = {ip: expires_at for ip, expires_at in BanStore._unsynced.items() if expires_at > now}
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                if pending:
+                    scores = {ip: "+inf" if expires_at == math.inf else expires_at for ip, expires_at in pending.items()}
+                    pipe.zadd(BAN_SET_KEY, scores)
+                    for ip, score in scores.items():
+                        pipe.publish(BAN_CHANNEL, f"ban {ip} {score}")
+                pipe.zremrangebyscore(BAN_SET_KEY, "-inf", now)
+                pipe.zrangebyscore(BAN_SET_KEY, now, "+inf", withscores=True)
+                entries = (await pipe.execute())[-1]
+        except Exception as e:
+            BanStore.redis_errors += 1
+            print(f"Ban store refresh failed: {e}")
+            return
+        banned = {
+            (ip.decode() if isinstance(ip, bytes) else ip): float(score)
+            for ip, score in entries
+        }
+        # Written above; a ban that failed again during the await stays pending
+        for ip, expires_at in pending.items():
+            if BanStore._unsynced.get(ip) == expires_at:
+                BanStore._unsynced.pop(ip)
+        for ip, expires_at in BanStore._unsynced.items():
+            if expires_at > now:
+                banned[ip] = max(banned.get(ip, 0), expires_at)
+        BanStore._banned = banned
+
+    @staticmethod
+    def _apply_event(data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        parts = str(data).split()
+        if len(parts) == 3 and parts[0] == "ban":
+            BanStore._banned[parts[1]] = float(parts[2])
+        elif len(parts) == 2 and parts[0] == "unban":
+            BanStore._banned.pop(parts[1], None)
+
+    @staticmethod
+    async def _listener() -> None:
+        backoff = 1
+        while True:
+            pubsub = BanStore._redis().pubsub()
+            try:
+                await pubsub.subscribe(BAN_CHANNEL)
+                # Anything published while we were disconnected is picked up here
+                await BanStore.refresh()
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        BanStore._apply_event(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                BanStore.redis_errors += 1
+                print(f"Ban store subscription lost: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    @staticmethod
+    async def _refresher() -> None:
+        while True:
+            await asyncio.sleep(BAN_REFRESH_INTERVAL)
+            await BanStore.refresh()
+
+    @staticmethod
+    def _append_log(ips: list) -> None:
+        os.makedirs(os.path.dirname(BAN_LOG_PATH), exist_ok=True)
+        with open(BAN_LOG_PATH, "a") as log:
+            log.writelines(f"{ip}\n" for ip in ips)
+
+    @staticmethod
+    async def _log_writer() -> None:
+        queue = BanStore._log_queue
+        while True:
+            ips = [await queue.get()]
+            while not queue.empty():
+                ips.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(BanStore._append_log, ips)
+            except Exception as e:
+                print(f"Ban log write failed: {e}")
+            finally:
+                for _ in ips:
+                    queue.task_done()
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "running": BanStore.is_running(),
+            "banned": len(BanStore._banned),
+            "checks": BanStore.checks,
+            "blocked": BanStore.blocked,
+            "bans": BanStore.bans,
+            "redis_errors": BanStore.redis_errors,
+            "unsynced": len(BanStore._unsynced),
+            "log_backlog": BanStore._log_queue.qsize() if BanStore.is_running() else 0,
+        }
+
+
+register_metrics("ban_store", BanStore.stats)
@@ -0,0 +1,200 @@
+import asyncio
+import os
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from api.extensions.helper.metrics import register_metrics
+
+logger = logging.getLogger("uvicorn.error")
+
+# Alerts waiting to be posted before new ones are dropped
+DISCORD_ALERT_QUEUE_SIZE = int(os.getenv("DISCORD_ALERT_QUEUE_SIZE", "1000"))
+# Seconds during which repeat alerts for the same IP and route are suppressed
+DISCORD_ALERT_DEDUPE_WINDOW = float(os.getenv("DISCORD_ALERT_DEDUPE_WINDOW", "300"))
+# Seconds the sender keeps collecting alerts into one digest after the first arrives
+DISCORD_ALERT_BATCH_WINDOW = float(os.getenv("DISCORD_ALERT_BATCH_WINDOW", "2"))
+# Alerts listed in one digest before the rest are summarised as a count
+DISCORD_ALERT_MAX_BATCH = int(os.getenv("DISCORD_ALERT_MAX_BATCH", "50"))
+DISCORD_ALERT_TIMEOUT = float(os.getenv("DISCORD_ALERT_TIMEOUT", "5"))
+
+# Discord rejects message content longer than this
+DISCORD_CONTENT_LIMIT = 2000
+
+
+class AlertDispatcher:
+    """
+    Background sender for security alerts posted to the Discord webhook.
+
+    send() never waits on the network. It drops the alert when the same IP
+    and route were reported within DISCORD_ALERT_DEDUPE_WINDOW, or when the
+    queue is full. One sender task posts over a single long-lived
+    httpx client. Alerts arriving within DISCORD_ALERT_BATCH_WINDOW are merged
+    into one message. A lone alert keeps its full text; a burst becomes a
+    compact digest of IP and route lines.
+    """
+    _queue: Optional[asyncio.Queue] = None
+    _client: Optional[httpx.AsyncClient] = None
+    _worker: Optional[asyncio.Task] = None
+    _webhook_url: Optional[str] = None
+    # Dedupe key -> last queued time, oldest first, at most DISCORD_ALERT_QUEUE_SIZE keys
+    _recent: "OrderedDict[str, float]" = OrderedDict()
+
+    queued = 0
+    posted = 0
+    deduplicated = 0
+    dropped = 0
+    errors = 0
+
+    @staticmethod
+    def is_running() -> bool:
+        return AlertDispatcher._queue is not None
+
+    @staticmethod
+    async def start(webhook_url: Optional[str] = None) -> None:
+        if AlertDispatcher.is_running():
+            return
+        AlertDispatcher._webhook_url = webhook_url or os.getenv("DISCORD_SECURITY_WEBHOOK_URL")
+        if not AlertDispatcher._webhook_url:
+            return
+        AlertDispatcher._queue = asyncio.Queue(maxsize=DISCORD_ALERT_QUEUE_SIZE)
+        AlertDispatcher._client = httpx.AsyncClient(
+            timeout=DISCORD_ALERT_TIMEOUT,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1)
+        )
+        AlertDispatcher._worker = asyncio.create_task(AlertDispatcher._sender())
+
+    @staticmethod
+    async def stop(timeout: float = 5) -> None:
+        """Give queued alerts `timeout` seconds to go out, then close the client"""
+        if not AlertDispatcher.is_running():
+            return
+        try:
+            await asyncio.wait_for(AlertDispatcher._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            AlertDispatcher.dropped += AlertDispatcher._queue.qsize()
+        AlertDispatcher._worker.cancel()
+        await asyncio.gather(AlertDispatcher._worker, return_exceptions=True)
+        await AlertDispatcher._client.aclose()
+        AlertDispatcher._queue = None
+        AlertDispatcher._client = None
+        AlertDispatcher._worker = None
+        AlertDispatcher._recent = OrderedDict()
+
+    @staticmethod
+    def send(content: str, ip: str = "unknown", route: str = "") -> bool:
+        """Queue an alert without waiting. Returns False if it was deduplicated or dropped."""
+        if not AlertDispatcher.is_running():
+            return False
+
+        now = time.monotonic()
+        dedupe_key = f"{ip} {route}"
+        last_sent = AlertDispatcher._recent.get(dedupe_key)
+        if last_sent is not None and now - last_sent < DISCORD_ALERT_DEDUPE_WINDOW:
+            AlertDispatcher.deduplicated += 1
+            return False
+
+        try:
+            AlertDispatcher._queue.put_nowait((content, ip, route))
+        except asyncio.QueueFull:
+            AlertDispatcher.dropped += 1
+            return False
+
+        AlertDispatcher._recent[dedupe_key] = now
+        AlertDispatcher._recent.move_to_end(dedupe_key)
+        AlertDispatcher._prune(now)
+        AlertDispatcher.queued += 1
+        return True
+
+    @staticmethod
+    def _prune(now: float) -> None:
+        """Pop expired keys from the front, then the oldest live ones while over the bound"""
+        recent = AlertDispatcher._recent
+        while recent and now - next(iter(recent.values())) >= DISCORD_ALERT_DEDUPE_WINDOW:
+            recent.popitem(last=False)
+        # During a wide scan this ends dedupe early for the oldest keys rather than growing
+        while len(recent) > DISCORD_ALERT_QUEUE_SIZE:
+            recent.popitem(last=False)
+
+    @staticmethod
+    def _digest(batch: List[Tuple[str, str, str]]) -> str:
+        if len(batch) == 1:
+            return batch[0][0][:DISCORD_CONTENT_LIMIT]
+
+        header = f"🚨 {len(batch)} security events in the last {DISCORD_ALERT_BATCH_WINDOW:g}s\n"
+        footer = "```{}```".format(" ".join(sorted({ip for _, ip, _ in batch if ip != "unknown"})))
+        lines = []
+        for _, ip, route in batch[:DISCORD_ALERT_MAX_BATCH]:
+            lines.append(f"`{ip:<15}` {route[:60]}")
+        if len(batch) > DISCORD_ALERT_MAX_BATCH:
+            lines.append(f"... and {len(batch) - DISCORD_ALERT_MAX_BATCH} more")
+
+        body = "\n".join(lines) + "\n"
+        budget = DISCORD_CONTENT_LIMIT - len(header) - len(footer)
+        if len(body) > budget:
+            body = body[:budget - 5].rsplit("\n", 1)[0] + "\n...\n"
+        return (header + body + footer)[:DISCORD_CONTENT_LIMIT]
+
+    @staticmethod
+    async def _post(content: str) -> None:
+        response = await AlertDispatcher._client.post(AlertDispatcher._webhook_url, json={"content": content})
+        if response.status_code == 429:
+            # Discord rate limit: wait the advertised time and try once more
+            try:
+                retry_after = float(response.json().get("retry_after", 1))
+            except Exception:
+                retry_after = 1
+            await asyncio.sleep(min(retry_after, 30))
+            response = await AlertDispatcher._client.post(AlertDispatcher._webhook_url, json={"content": content})
+        response.raise_for_status()
+
+    @staticmethod
+    async def _sender() -> None:
+        queue = AlertDispatcher._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + DISCORD_ALERT_BATCH_WINDOW
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await AlertDispatcher._post(AlertDispatcher._digest(batch))
+                AlertDispatcher.posted += 1
+            except Exception as discord_exc:
+                AlertDispatcher.errors += 1
+                logger.error(f"Failed to send Discord webhook: {discord_exc}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        running = AlertDispatcher.is_running()
+        return {
+            "pid": os.getpid(),
+            "running": running,
+            "queue_depth": AlertDispatcher._queue.qsize() if running else 0,
+            "queued": AlertDispatcher.queued,
+            "posted": AlertDispatcher.posted,
+            "deduplicated": AlertDispatcher.deduplicated,
+            "dropped": AlertDispatcher.dropped,
+            "dedupe_keys": len(AlertDispatcher._recent),
+            "errors": AlertDispatcher.errors,
+        }
+
+
+async def send_security_alert(content: str, ip: str = "unknown", route: str = "") -> None:
+    """Hand an alert to the background dispatcher, starting it on first use"""
+    if not AlertDispatcher.is_running():
+        await AlertDispatcher.start()
+    AlertDispatcher.send(content, ip, route)
+
+
+register_metrics("security_alerts", AlertDispatcher.stats)
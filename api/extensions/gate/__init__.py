@@ -0,0 +1,136 @@
+import logging
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from api.extensions.ban import BanStore
+from api.extensions.discord import send_security_alert
+
+logger = logging.getLogger("uvicorn.error")
+
+# User agents that are banned on sight
+BLOCKED_AGENTS = ("keydrop.io", "zgrab")
+# A request must look like it comes from a browser or mobile client
+ALLOWED_AGENTS = ("mozilla", "chrome", "safari", "firefox", "edge", "opera", "applewebkit", "trident", "msie", "mobile")
+# 404s on these paths are logged but never banned
+EXEMPT_404_PATHS = ("/favicon.ico", "/robots.txt")
+
+
+def _undefined_route_alert(path: str, real_ip: str, forwarded_for: str, user_agent: str) -> str:
+    return (
+        "┌──────────────────────────────────────────────\n"
+        "│  🚨 Undefined Route Access Attempt! Ip Banned 🚨 \n"
+        "├───────────────┬──────────────────────────────\n"
+        f"│ `Route         `   │ `{path:<24}`\n"
+        f"│ `Real-IP       `   │ `{real_ip:<24}`\n"
+        f"│ `X-Forwarded   `   │ `{forwarded_for:<24}`\n"
+        f"│ `User-Agent    `   │ `{user_agent[:24]:<24}`\n"
+        "├──────────────────────────────────────────────\n"
+        f"```{real_ip}```"
+        "└──────────────────────────────────────────────"
+    )
+
+
+def _blocked_agent_alert(path: str, real_ip: str, forwarded_for: str, user_agent: str) -> str:
+    return (
+        "┌──────────────────────────────────────────────\n"
+        "│  🚫 Banned Malicious User Agent! 🚫 \n"
+        "├───────────────┬──────────────────────────────\n"
+        f"│ `Route         `   │ `{path}`\n"
+        f"│ `User-Agent    `   │ `{user_agent}`\n"
+        f"│ `Real-IP       `   │ `{real_ip}`\n"
+        f"│ `X-Forwarded   `   │ `{forwarded_for}`\n"
+        "└──────────────────────────────────────────────"
+    )
+
+
+class SecurityGateMiddleware:
+    """
+    Single pure-ASGI gate in front of the application.
+
+    In one pass per HTTP request it:
+      1. rejects banned IPs before any other work (when `enforce` is on),
+      2. rejects blocked and non-browser user agents (when `enforce` is on),
+      3. classifies 404 responses as they are sent and bans the caller,
+      4. logs unhandled exceptions and turns them into a 500.
+
+    Response messages are forwarded as they arrive; nothing is buffered.
+    Bans and alerts for a 404 run after the response has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, enforce: bool = True) -> None:
+        self.app = app
+        self.enforce = enforce
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        path = scope["path"]
+
+        if self.enforce:
+            real_ip = headers.get("x-real-ip", "unknown")
+            if BanStore.is_banned(real_ip):
+                await JSONResponse(content={"detail": "Access denied"}, status_code=403)(scope, receive, send)
+                return
+
+            user_agent = headers.get("user-agent", "").lower()
+
+            if any(agent in user_agent for agent in BLOCKED_AGENTS):
+                forwarded_for = headers.get("x-forwarded-for", "unknown")
+                logger.warning(f"Blocked malicious user agent: {user_agent} | Real-IP={real_ip}, X-Forwarded-For={forwarded_for}")
+                await JSONResponse(content={"detail": "Access denied"}, status_code=403)(scope, receive, send)
+                await self._ban(real_ip)
+                await send_security_alert(_blocked_agent_alert(path, real_ip, forwarded_for, user_agent), real_ip, path)
+                return
+
+            if not any(agent in user_agent for agent in ALLOWED_AGENTS):
+                await JSONResponse(content={"detail": "Access denied"}, status_code=403)(scope, receive, send)
+                return
+
+        response_started = False
+        status_code = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started, status_code
+            if message["type"] == "http.response.start":
+                response_started = True
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            logger.error(f"Exception occurred: {e}", exc_info=True)
+            if not response_started:
+                await PlainTextResponse(str(e), status_code=500)(scope, receive, send)
+            return
+
+        if self.enforce and status_code == 404:
+            await self._handle_not_found(path, headers)
+
+    @staticmethod
+    async def _ban(real_ip: str) -> None:
+        # Without X-Real-IP there is nobody specific to ban
+        if real_ip == "unknown":
+            return
+        try:
+            await BanStore.ban(real_ip)
+        except Exception as ban_exc:
+            logger.error(f"Failed to ban {real_ip}: {ban_exc}")
+
+    @staticmethod
+    async def _handle_not_found(path: str, headers: Headers) -> None:
+        real_ip = headers.get("x-real-ip", "unknown")
+
+        if any(exempt_path in path for exempt_path in EXEMPT_404_PATHS):
+            logger.info(f"404 on exempt path (no ban): {path} | Real-IP={real_ip}")
+            return
+
+        forwarded_for = headers.get("x-forwarded-for", "unknown")
+        user_agent = headers.get("user-agent", "unknown")
+        logger.warning(f"404 Not Found (Middleware): {path} | Real-IP={real_ip}, X-Forwarded-For={forwarded_for}, User-Agent={user_agent}")
+
+        await SecurityGateMiddleware._ban(real_ip)
+        await send_security_alert(_undefined_route_alert(path, real_ip, forwarded_for, user_agent), real_ip, path)
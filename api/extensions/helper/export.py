@@ -0,0 +1,90 @@
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List
+from bson import ObjectId
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from api.extensions.helper.json_response import dumps
+
+# Documents fetched per cursor round-trip; memory per export is bounded by one batch
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def get_export_format(request: Request) -> str:
+    """Read ?format=ndjson|csv from the query string (ndjson by default)"""
+    export_format = (request.query_params.get("format") or "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return export_format
+
+def export_cursor(collection: Any, query: Dict[str, Any], fields: List[str]) -> Any:
+    """Batched cursor over the export fields, in _id order so dumps are stable"""
+    projection = {field: 1 for field in fields if field != "_id"}
+    return collection.find(query, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode("utf-8")
+    return value
+
+async def ndjson_rows(cursor: Any) -> AsyncIterator[bytes]:
+    """One JSON document per line, encoded as each document arrives"""
+    async for document in cursor:
+        yield dumps(document) + b"\n"
+
+async def csv_rows(cursor: Any, fields: List[str]) -> AsyncIterator[bytes]:
+    """A header line, then one CSV row per document; nested values are JSON-encoded"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take() -> bytes:
+        line = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writerow(fields)
+    yield take()
+    async for document in cursor:
+        writer.writerow([_csv_cell(document.get(field)) for field in fields])
+        yield take()
+
+async def _close_after(rows: AsyncIterator[bytes], cursor: Any, label: str) -> AsyncIterator[bytes]:
+    try:
+        async for row in rows:
+            yield row
+    except Exception as e:
+        # Headers are already sent, so the client only sees a truncated body
+        print(f"Export {label} failed mid-stream: {e}")
+    finally:
+        # Releases the server-side cursor when the client disconnects early
+        await cursor.close()
+
+def stream_export(cursor: Any, fields: List[str], export_format: str, filename: str) -> StreamingResponse:
+    """
+    Stream a Mongo cursor as NDJSON or CSV.
+
+    Each document is written to the client as soon as the cursor yields it;
+    nothing beyond the current cursor batch is held in memory.
+    """
+    rows = csv_rows(cursor, fields) if export_format == "csv" else ndjson_rows(cursor)
+    return StreamingResponse(
+        _close_after(rows, cursor, filename),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+            "Cache-Control": "no-store",
+        },
+    )
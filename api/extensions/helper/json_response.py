@@ -0,0 +1,38 @@
+from typing import Any
+import orjson
+from bson import ObjectId
+from bson.decimal128 import Decimal128
+from fastapi.responses import JSONResponse
+
+# Dict keys may be ObjectIds (e.g. grouped results); datetimes are emitted natively by orjson
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def bson_default(value: Any) -> Any:
+    """orjson fallback for the BSON types it does not know, in the same form serialize_for_json produces"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode Mongo documents straight to JSON bytes in one pass (no serialize_for_json copy)"""
+    return orjson.dumps(content, default=bson_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered by orjson with ObjectId support.
+
+    Raw documents from Motor can be returned as-is. ObjectId becomes its hex
+    string and datetime its ISO-8601 form, which is the output
+    serialize_for_json gives, without first building a converted copy.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,18 @@
+from typing import Any, Callable, Dict
+
+# name -> zero-argument callable returning a JSON-serializable dict
+_metrics_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_metrics(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """Expose an extension's counters under /api/v1/metrics"""
+    _metrics_providers[name] = provider
+
+def collect_metrics() -> Dict[str, Any]:
+    """Snapshot every registered provider for this worker process"""
+    snapshot = {}
+    for name, provider in _metrics_providers.items():
+        try:
+            snapshot[name] = provider()
+        except Exception as e:
+            snapshot[name] = {"error": str(e)}
+    return snapshot
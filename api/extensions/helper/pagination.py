@@ -0,0 +1,64 @@
+import base64
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException, Request
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 200
+
+def encode_cursor(last_id: ObjectId) -> str:
+    """Encode the last seen _id as an opaque, URL-safe cursor"""
+    return base64.urlsafe_b64encode(ObjectId(last_id).binary).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> ObjectId:
+    """Decode a cursor produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return ObjectId(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (InvalidId, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Apply the default and the upper cap to a requested page size"""
+    if limit is None:
+        return DEFAULT_PAGE_LIMIT
+    return max(1, min(int(limit), MAX_PAGE_LIMIT))
+
+def get_page_params(request: Request) -> Tuple[Optional[str], int]:
+    """Read ?cursor=&limit= from the query string"""
+    cursor = request.query_params.get("cursor") or None
+    limit = request.query_params.get("limit")
+    if limit is None:
+        return cursor, DEFAULT_PAGE_LIMIT
+    try:
+        return cursor, clamp_limit(int(limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="limit must be an integer")
+
+async def paginate(
+    collection: Any,
+    query: Dict[str, Any],
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Keyset pagination over _id.
+
+    Fetches one extra document to know whether another page exists, so no
+    count or offset scan is needed. Returns {"items": [...], "next_cursor": str | None}.
+    """
+    limit = clamp_limit(limit)
+    query = dict(query)
+    if cursor:
+        query["_id"] = {"$gt": decode_cursor(cursor)}
+
+    documents = await collection.find(query, projection).sort("_id", 1).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1]["_id"])
+
+    return {"items": documents, "next_cursor": next_cursor}
@@ -0,0 +1,55 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict
+from api.extensions.helper.metrics import register_metrics
+
+class SingleFlight:
+    """
+    Collapses concurrent identical calls in this worker into one computation.
+
+    The first caller for a key starts the computation as a task. Callers
+    arriving while it runs await the same task and receive the same result
+    or exception. Once it finishes, the next caller starts a fresh one.
+    Waiters are shielded, so a caller that disconnects does not cancel the
+    work for the others.
+
+    Keys must include everything that changes the result: route, parameters
+    and the caller's auth scope. The shared result object goes to every
+    waiter and must not be mutated.
+    """
+    _inflight: Dict[str, asyncio.Task] = {}
+    # group (first key segment) -> {"calls", "executions", "coalesced"}
+    _stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _count(group: str, counter: str) -> None:
+        stats = SingleFlight._stats.setdefault(group, {"calls": 0, "executions": 0, "coalesced": 0})
+        stats[counter] += 1
+
+    @staticmethod
+    async def do(key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        group = key.split(":", 1)[0]
+        SingleFlight._count(group, "calls")
+
+        task = SingleFlight._inflight.get(key)
+        if task is not None:
+            SingleFlight._count(group, "coalesced")
+        else:
+            SingleFlight._count(group, "executions")
+            task = asyncio.ensure_future(fn())
+            SingleFlight._inflight[key] = task
+            task.add_done_callback(lambda _: SingleFlight._inflight.pop(key, None))
+            # Nobody may be left to retrieve the exception if every waiter is cancelled
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        result = {"pid": os.getpid(), "in_flight": len(SingleFlight._inflight)}
+        for group, counters in SingleFlight._stats.items():
+            calls = counters["calls"]
+            result[group] = dict(counters, coalesced_ratio=counters["coalesced"] / calls if calls else 0.0)
+        return result
+
+
+register_metrics("single_flight", SingleFlight.stats)
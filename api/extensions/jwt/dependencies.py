@@ -2,6 +2,7 @@ from fastapi import Depends, HTTPException, Request
 from typing import Optional, List
 from api.extensions.jwt import extract_data_from_token_request, verify_token
 from api.models.user.User import User
+from api.extensions.redis_cache.user_cache import UserCache
 
 async def get_current_user(request: Request) -> dict:
     """
@@ -15,8 +16,8 @@ async def get_current_user(request: Request) -> dict:
         if not user_id:
             raise HTTPException(status_code=401, detail="Invalid token: missing user ID")
         
-        # Get user from database
-        user = User.get_by_id(user_id)
+        # Get user from the user cache, falling back to the database
+        user = await UserCache.get_user(user_id, lambda: User.get_by_id(user_id))
         if not user:
             raise HTTPException(status_code=401, detail="User not found")
         
@@ -78,4 +79,5 @@ require_admin = require_roles(["admin"])
 require_supplier = require_roles(["supplier"])
 require_vendor = require_roles(["vendor"])
 require_admin_or_vendor = require_roles(["admin", "vendor"])
+require_admin_or_supplier = require_roles(["admin", "supplier"])
 require_any_role = require_roles(["admin", "supplier", "vendor"]) 
\ No newline at end of file
@@ -6,6 +6,8 @@ from email.mime.text import MIMEText
 from email.mime.base import MIMEBase
 from email import encoders
 from dotenv import load_dotenv
+from typing import Iterable
+from api.extensions.mail.queue import MailQueue
 
 # Load environment variables from .env
 # load_dotenv()
@@ -54,16 +56,33 @@ class MAIL:
             server.send_message(msg)
     
     @staticmethod
-    def sendHtmlMail(to, from_name, subject, body, html):
+    def buildHtmlMail(to, from_name, subject, body, html):
         msg = EmailMessage()
         msg["From"] = f"{from_name} <{MAIL.MAIL_USERNAME}>"
         msg["To"] = to
         msg["Subject"] = subject
         msg.set_content(body)
         msg.add_alternative(html, subtype='html')
+        return msg
+
+    @staticmethod
+    def sendHtmlMail(to, from_name, subject, body, html):
+        msg = MAIL.buildHtmlMail(to, from_name, subject, body, html)
 
         with MAIL._create_server_connection() as server:
             server.send_message(msg)
+
+    @staticmethod
+    async def queueHtmlMail(to, from_name, subject, body, html):
+        """Queue an HTML mail for background delivery and return immediately"""
+        await MAIL.queueBatch([MAIL.buildHtmlMail(to, from_name, subject, body, html)])
+
+    @staticmethod
+    async def queueBatch(messages: Iterable[EmailMessage]) -> int:
+        """Queue many prepared messages at once, they go out over shared pooled connections"""
+        if not MailQueue.is_running():
+            await MailQueue.start(MAIL._create_server_connection)
+        return MailQueue.enqueue(messages)
     
     @staticmethod
     def sendHtmlMailWithFiles(to, from_name, subject, body, html, files):
@@ -90,6 +109,11 @@ class MAIL:
 
 # MAIL.sendmail("recipient@example.com", "Sender Name", "Test Subject", "Test Body")
 # MAIL.sendHtmlMail("recipient@example.com", "Sender Name", "Test Subject", "Test Body", "<h1>Test HTML</h1>")
+# await MAIL.queueHtmlMail("recipient@example.com", "Sender Name", "Test Subject", "Test Body", "<h1>Test HTML</h1>")
+# await MAIL.queueBatch([
+#     MAIL.buildHtmlMail(address, "Sender Name", "Newsletter", "Body", "<h1>Body</h1>")
+#     for address in ["a@example.com", "b@example.com"]
+# ])
 # MAIL.sendHtmlMailWithFiles(
 #     "recipient@example.com", 
 #     "Sender Name", 
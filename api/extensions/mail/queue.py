@@ -0,0 +1,254 @@
+import asyncio
+import os
+import smtplib
+import time
+from email.message import Message
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from api.extensions.helper.metrics import register_metrics
+
+# Persistent SMTP connections shared by the senders
+MAIL_POOL_SIZE = int(os.getenv("MAIL_POOL_SIZE", "2"))
+# Concurrent sender tasks (each holds one pooled connection while sending a batch)
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", str(MAIL_POOL_SIZE)))
+# Messages waiting to be sent before enqueue starts rejecting
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+# Messages sent back-to-back over one connection checkout
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "20"))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", "3"))
+# Seconds before the first retry, doubled on each further attempt
+MAIL_RETRY_BACKOFF = float(os.getenv("MAIL_RETRY_BACKOFF", "2"))
+# Idle seconds after which a pooled connection is NOOP-checked before reuse
+MAIL_IDLE_CHECK = float(os.getenv("MAIL_IDLE_CHECK", "30"))
+
+# Failures that will not succeed on retry
+_PERMANENT_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+# Failures that mean the connection itself is unusable
+_CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)
+
+
+class SMTPConnectionPool:
+    """
+    Bounded pool of logged-in SMTP connections.
+
+    Connections are created on demand up to `size`, reused LIFO, NOOP-checked
+    when they sat idle longer than MAIL_IDLE_CHECK, and replaced when broken.
+    smtplib is blocking, so every network call runs in a worker thread.
+    """
+
+    def __init__(self, connection_factory: Callable[[], smtplib.SMTP], size: int = MAIL_POOL_SIZE):
+        self._connection_factory = connection_factory
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[Tuple[smtplib.SMTP, float]] = []
+        self.created = 0
+        self.discarded = 0
+
+    async def acquire(self) -> smtplib.SMTP:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection, last_used = self._idle.pop()
+                if time.monotonic() - last_used < MAIL_IDLE_CHECK:
+                    return connection
+                if await self._is_healthy(connection):
+                    return connection
+                await self._discard(connection)
+            connection = await asyncio.to_thread(self._connection_factory)
+            self.created += 1
+            return connection
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, connection: smtplib.SMTP, broken: bool = False) -> None:
+        try:
+            if broken:
+                await self._discard(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    async def close(self) -> None:
+        while self._idle:
+            connection, _ = self._idle.pop()
+            await self._discard(connection, quit=True)
+
+    @staticmethod
+    async def _is_healthy(connection: smtplib.SMTP) -> bool:
+        try:
+            code, _ = await asyncio.to_thread(connection.noop)
+            return code == 250
+        except Exception:
+            return False
+
+    async def _discard(self, connection: smtplib.SMTP, quit: bool = False) -> None:
+        self.discarded += 1
+        try:
+            await asyncio.to_thread(connection.quit if quit else connection.close)
+        except Exception:
+            pass
+
+    @property
+    def idle(self) -> int:
+        return len(self._idle)
+
+
+class MailQueue:
+    """
+    In-process outgoing mail queue drained by background sender tasks.
+
+    enqueue() returns as soon as the message is queued. Senders take up to
+    MAIL_BATCH_SIZE messages at a time and push them over a single pooled
+    connection. Transient failures are retried with exponential backoff up to
+    MAIL_MAX_RETRIES; refused senders/recipients/data are dropped and counted.
+    """
+    _queue: Optional[asyncio.Queue] = None
+    _pool: Optional[SMTPConnectionPool] = None
+    _workers: List[asyncio.Task] = []
+    _retry_handles: set = set()
+
+    sent = 0
+    failed = 0
+    retried = 0
+    rejected = 0
+
+    @staticmethod
+    def is_running() -> bool:
+        return MailQueue._queue is not None
+
+    @staticmethod
+    async def start(connection_factory: Callable[[], smtplib.SMTP]) -> None:
+        if MailQueue.is_running():
+            return
+        MailQueue._queue = asyncio.Queue(maxsize=MAIL_QUEUE_SIZE)
+        MailQueue._pool = SMTPConnectionPool(connection_factory)
+        MailQueue._workers = [asyncio.create_task(MailQueue._sender()) for _ in range(MAIL_WORKERS)]
+        print(f"Mail queue started with {MAIL_WORKERS} senders")
+
+    @staticmethod
+    async def stop(timeout: float = 10) -> None:
+        """Give queued mail `timeout` seconds to go out, then stop the senders"""
+        if not MailQueue.is_running():
+            return
+        try:
+            await asyncio.wait_for(MailQueue._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Mail queue stopped with {MailQueue._queue.qsize()} unsent messages")
+        for handle in MailQueue._retry_handles:
+            handle.cancel()
+        MailQueue._retry_handles.clear()
+        for worker in MailQueue._workers:
+            worker.cancel()
+        await asyncio.gather(*MailQueue._workers, return_exceptions=True)
+        await MailQueue._pool.close()
+        MailQueue._queue = None
+        MailQueue._pool = None
+        MailQueue._workers = []
+
+    @staticmethod
+    def enqueue(messages: Iterable[Message]) -> int:
+        """Queue messages for delivery. Raises 503 if the queue cannot take all of them."""
+        if not MailQueue.is_running():
+            raise HTTPException(status_code=503, detail="Mail queue is not running")
+        messages = list(messages)
+        if MailQueue._queue.maxsize - MailQueue._queue.qsize() < len(messages):
+            MailQueue.rejected += len(messages)
+            raise HTTPException(status_code=503, detail="Mail queue is full, please retry")
+        for message in messages:
+            MailQueue._queue.put_nowait((message, 0))
+        return len(messages)
+
+    @staticmethod
+    def _schedule_retry(message: Message, attempt: int) -> None:
+        if attempt > MAIL_MAX_RETRIES:
+            MailQueue.failed += 1
+            print(f"Giving up on mail to {message['To']} after {attempt} attempts")
+            return
+
+        MailQueue.retried += 1
+        loop = asyncio.get_running_loop()
+
+        def requeue():
+            MailQueue._retry_handles.discard(handle)
+            if not MailQueue.is_running():
+                return
+            try:
+                MailQueue._queue.put_nowait((message, attempt))
+            except asyncio.QueueFull:
+                MailQueue.failed += 1
+
+        handle = loop.call_later(MAIL_RETRY_BACKOFF * 2 ** (attempt - 1), requeue)
+        MailQueue._retry_handles.add(handle)
+
+    @staticmethod
+    async def _sender() -> None:
+        queue = MailQueue._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < MAIL_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await MailQueue._send_batch(batch)
+            except Exception as e:
+                print(f"Mail sender error: {e}")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    @staticmethod
+    async def _send_batch(batch: List[Tuple[Message, int]]) -> None:
+        pool = MailQueue._pool
+        try:
+            connection = await pool.acquire()
+        except Exception as e:
+            print(f"SMTP connection failed: {e}")
+            for message, attempt in batch:
+                MailQueue._schedule_retry(message, attempt + 1)
+            return
+
+        broken = False
+        for message, attempt in batch:
+            if broken:
+                MailQueue._schedule_retry(message, attempt + 1)
+                continue
+            try:
+                await asyncio.to_thread(connection.send_message, message)
+                MailQueue.sent += 1
+            except _PERMANENT_ERRORS as e:
+                MailQueue.failed += 1
+                print(f"Mail to {message['To']} refused: {e}")
+            except _CONNECTION_ERRORS as e:
+                broken = True
+                print(f"SMTP connection lost: {e}")
+                MailQueue._schedule_retry(message, attempt + 1)
+            except smtplib.SMTPException as e:
+                # Transient server reply (4xx), the connection is still usable
+                print(f"Mail to {message['To']} failed: {e}")
+                MailQueue._schedule_retry(message, attempt + 1)
+            except OSError as e:
+                # Socket-level failure (timeout, reset)
+                broken = True
+                print(f"SMTP connection lost: {e}")
+                MailQueue._schedule_retry(message, attempt + 1)
+        await pool.release(connection, broken=broken)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        running = MailQueue.is_running()
+        return {
+            "pid": os.getpid(),
+            "running": running,
+            "queue_depth": MailQueue._queue.qsize() if running else 0,
+            "pending_retries": len(MailQueue._retry_handles),
+            "pool_idle": MailQueue._pool.idle if running else 0,
+            "connections_created": MailQueue._pool.created if running else 0,
+            "connections_discarded": MailQueue._pool.discarded if running else 0,
+            "sent": MailQueue.sent,
+            "failed": MailQueue.failed,
+            "retried": MailQueue.retried,
+            "rejected": MailQueue.rejected,
+        }
+
+
+register_metrics("mail_queue", MailQueue.stats)
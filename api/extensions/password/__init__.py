@@ -0,0 +1,128 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+import bcrypt
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from api.extensions.helper.metrics import register_metrics
+
+load_dotenv()
+
+# bcrypt cost factor for new hashes. Changing it rehashes users transparently on their next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Worker processes doing bcrypt work
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hash/verify calls allowed in flight at once
+PASSWORD_MAX_CONCURRENCY = int(os.getenv("PASSWORD_MAX_CONCURRENCY", str(PASSWORD_WORKERS)))
+# Calls allowed to wait for a slot before new ones are rejected with 503
+PASSWORD_MAX_QUEUE = int(os.getenv("PASSWORD_MAX_QUEUE", "256"))
+
+
+def _hash_password(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check_password(password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a dedicated process pool so hashing never blocks the event loop.
+
+    start()/shutdown() are called from the lifespan. Without a started pool
+    (scripts, tests) the work falls back to the default thread executor.
+    """
+    _executor: Optional[ProcessPoolExecutor] = None
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    waiting = 0
+    in_flight = 0
+    completed = 0
+    rejected = 0
+
+    @staticmethod
+    def start() -> None:
+        if PasswordHasher._executor is None:
+            # Spawned, not forked: the pool starts after Motor, Redis and background tasks
+            # own threads and sockets, which a forked child would inherit mid-use
+            PasswordHasher._executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"Password hasher started with {PASSWORD_WORKERS} workers")
+
+    @staticmethod
+    def shutdown() -> None:
+        if PasswordHasher._executor is not None:
+            PasswordHasher._executor.shutdown(wait=False, cancel_futures=True)
+            PasswordHasher._executor = None
+
+    @staticmethod
+    async def _run(fn, *args) -> Any:
+        if PasswordHasher._semaphore is None:
+            PasswordHasher._semaphore = asyncio.Semaphore(PASSWORD_MAX_CONCURRENCY)
+
+        if PasswordHasher.waiting >= PASSWORD_MAX_QUEUE:
+            PasswordHasher.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Password service busy, please retry",
+                headers={"Retry-After": "1"}
+            )
+
+        PasswordHasher.waiting += 1
+        try:
+            await PasswordHasher._semaphore.acquire()
+        finally:
+            PasswordHasher.waiting -= 1
+
+        PasswordHasher.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(PasswordHasher._executor, fn, *args)
+        finally:
+            PasswordHasher.in_flight -= 1
+            PasswordHasher.completed += 1
+            PasswordHasher._semaphore.release()
+
+    @staticmethod
+    async def hash(password: str) -> str:
+        hashed = await PasswordHasher._run(_hash_password, password.encode('utf-8'), BCRYPT_ROUNDS)
+        return hashed.decode('utf-8')
+
+    @staticmethod
+    async def verify(password: str, hashed_password) -> bool:
+        if isinstance(hashed_password, str):
+            hashed_password = hashed_password.encode('utf-8')
+        return await PasswordHasher._run(_check_password, password.encode('utf-8'), hashed_password)
+
+    @staticmethod
+    def needs_rehash(hashed_password) -> bool:
+        """True when a stored hash was made with a different cost factor than BCRYPT_ROUNDS"""
+        if isinstance(hashed_password, bytes):
+            hashed_password = hashed_password.decode('utf-8')
+        try:
+            # $2b$<rounds>$<salt+hash>
+            return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+        except (IndexError, ValueError):
+            return True
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "rounds": BCRYPT_ROUNDS,
+            "workers": PASSWORD_WORKERS if PasswordHasher._executor else 0,
+            "max_concurrency": PASSWORD_MAX_CONCURRENCY,
+            "max_queue": PASSWORD_MAX_QUEUE,
+            "queue_depth": PasswordHasher.waiting,
+            "in_flight": PasswordHasher.in_flight,
+            "completed": PasswordHasher.completed,
+            "rejected": PasswordHasher.rejected,
+        }
+
+
+register_metrics("password_hasher", PasswordHasher.stats)
@@ -1,181 +1,380 @@
+import asyncio
+import math
+import os
+import random
+import time
 import uuid
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
 from fastapi import HTTPException
-from api.db import redis_client
+from api import db as database
 import redis.asyncio as redis
+from api.extensions.helper.metrics import register_metrics
+from api.extensions.redis_cache.codecs import get_codec
+
+# Consecutive connection failures before calls fail fast instead of hitting Redis
+REDIS_FAILURE_THRESHOLD = int(os.getenv("REDIS_FAILURE_THRESHOLD", "3"))
+# Seconds calls fail fast once the threshold is reached, before one is let through to probe
+REDIS_RETRY_INTERVAL = float(os.getenv("REDIS_RETRY_INTERVAL", "2"))
+# Keys Redis examines per SCAN call; bounds how long each call holds the server
+REDIS_SCAN_COUNT = int(os.getenv("REDIS_SCAN_COUNT", "1000"))
+# Keys removed per UNLINK command in delete_by_pattern
+REDIS_UNLINK_BATCH = int(os.getenv("REDIS_UNLINK_BATCH", "500"))
+# get_or_compute: >1 refreshes earlier, <1 later (XFetch beta)
+CACHE_EARLY_EXPIRY_BETA = float(os.getenv("CACHE_EARLY_EXPIRY_BETA", "1.0"))
+# get_or_compute: seconds a recompute lock is held before Redis releases it on its own
+CACHE_COMPUTE_LOCK_TIMEOUT = float(os.getenv("CACHE_COMPUTE_LOCK_TIMEOUT", "10"))
+# get_or_compute: seconds a caller waits for another worker's recompute before computing itself
+CACHE_COMPUTE_WAIT = float(os.getenv("CACHE_COMPUTE_WAIT", "2"))
+
+
+def _decode(value: Any) -> Any:
+    # Convert value to string if it's bytes
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
 
 class Cache:
-    @staticmethod
-    async def store_with_unique_key(value: Any) -> str:
-        """Store a value with a unique key and 15-minute expiration time"""
-        try:
-            try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
+    """
+    Thin async wrapper over the lifespan-owned Redis connection pool.
 
-            unique_key = str(uuid.uuid4())
-            await redis_client.setex(unique_key, 900, value)  # 900 seconds = 15 minutes
-            return unique_key
+    There is no PING before each command. Health is tracked from the errors the
+    real commands raise: after REDIS_FAILURE_THRESHOLD consecutive connection
+    failures, calls fail with 503 for REDIS_RETRY_INTERVAL seconds without
+    touching the network. The first success closes the circuit again.
+    """
+    _consecutive_failures = 0
+    _unavailable_until = 0.0
 
-        except HTTPException as http_exc:
-            raise http_exc
-        except Exception as e:
+    commands = 0
+    connection_errors = 0
+    short_circuited = 0
+
+    compute_hits = 0
+    compute_misses = 0
+    early_refreshes = 0
+    lock_waits = 0
+    compute_fallbacks = 0
+
+    @staticmethod
+    def _client() -> redis.Redis:
+        if database.redis_client is None:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to store value: {str(e)}"
+                status_code=503,
+                detail="Redis service unavailable"
+            )
+        if Cache._unavailable_until > time.monotonic():
+            Cache.short_circuited += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Redis service unavailable"
             )
+        return database.redis_client
 
     @staticmethod
-    async def setValue(key: str, value: Any, ttl: int = 900) -> None:
-        """Set a value with a key and optional time-to-live (default 15 minutes)"""
+    async def _execute(operation: Callable[[redis.Redis], Awaitable[Any]], action: str) -> Any:
+        """Run one Redis round-trip, tracking health and mapping failures to HTTPException"""
+        client = Cache._client()
+        Cache.commands += 1
         try:
-            try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
-
-            await redis_client.setex(key, ttl, value)
-
-        except HTTPException as http_exc:
-            raise http_exc
+            result = await operation(client)
+        except (redis.ConnectionError, redis.TimeoutError):
+            Cache.connection_errors += 1
+            Cache._consecutive_failures += 1
+            if Cache._consecutive_failures >= REDIS_FAILURE_THRESHOLD:
+                Cache._unavailable_until = time.monotonic() + REDIS_RETRY_INTERVAL
+            raise HTTPException(
+                status_code=503,
+                detail="Redis service unavailable"
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Failed to set value: {str(e)}"
+                detail=f"Failed to {action}: {str(e)}"
             )
+        Cache._consecutive_failures = 0
+        Cache._unavailable_until = 0.0
+        return result
 
     @staticmethod
-    async def getValue(key: str) -> Optional[Any]:
-        """Retrieve a value using its key and delete it after access"""
-        try:
-            try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
-
-            value = await redis_client.get(key)
-            if value is None:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Key not found or expired"
-                )
-
-            # Convert value to string if it's bytes
-            if isinstance(value, bytes):
-                value = value.decode('utf-8')
-
-            return value
+    async def store_with_unique_key(value: Any) -> str:
+        """Store a value with a unique key and 15-minute expiration time"""
+        unique_key = str(uuid.uuid4())
+        await Cache._execute(lambda client: client.setex(unique_key, 900, value), "store value")  # 900 seconds = 15 minutes
+        return unique_key
 
-        except HTTPException as http_exc:
-            raise http_exc
-        except Exception as e:
+    @staticmethod
+    async def setValue(key: str, value: Any, ttl: int = 900) -> None:
+        """Set a value with a key and optional time-to-live (default 15 minutes)"""
+        await Cache._execute(lambda client: client.setex(key, ttl, value), "set value")
+
+    @staticmethod
+    async def getValue(key: str) -> Optional[Any]:
+        """Retrieve a value using its key"""
+        value = await Cache._execute(lambda client: client.get(key), "retrieve value")
+        if value is None:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to retrieve value: {str(e)}"
+                status_code=404,
+                detail="Key not found or expired"
             )
+        return _decode(value)
 
     @staticmethod
     async def deleteValue(key: str) -> None:
         """Delete a value using its key"""
-        try:
-            try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
-
-            result = await redis_client.delete(key)
-            if result == 0:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Key not found"
-                )
-
-        except HTTPException as http_exc:
-            raise http_exc
-        except Exception as e:
+        result = await Cache._execute(lambda client: client.delete(key), "delete value")
+        if result == 0:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to delete value: {str(e)}"
+                status_code=404,
+                detail="Key not found"
             )
 
     @staticmethod
     async def getValueDelete(key: str) -> Optional[Any]:
-        """Retrieve a value using its key and delete it after access"""
-        try:
-            try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
+        """Retrieve a value using its key and delete it in the same atomic GETDEL"""
+        value = await Cache._execute(lambda client: client.getdel(key), "retrieve value")
+        if value is None:
+            raise HTTPException(
+                status_code=404,
+                detail="Key not found or expired"
+            )
+        return _decode(value)
+
+    @staticmethod
+    async def incrementValue(key: str) -> int:
+        """Atomically increment an integer counter (created at 0 if missing, no expiry)"""
+        return await Cache._execute(lambda client: client.incr(key), "increment value")
 
-            value = await redis_client.get(key)
-            if value is None:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Key not found or expired"
-                )
+    @staticmethod
+    async def scan_keys(pattern: str, count: int = REDIS_SCAN_COUNT) -> AsyncIterator[List[str]]:
+        """
+        Iterate keys matching a pattern with SCAN, one batch per round-trip.
+
+        Each call examines about `count` keys, so Redis is never blocked for
+        longer than that. As with SCAN itself, a key may be yielded more than once
+        and keys written during the scan may or may not appear.
+        """
+        cursor = 0
+        while True:
+            cursor, keys = await Cache._execute(
+                lambda client: client.scan(cursor=cursor, match=pattern, count=count),
+                "scan keys"
+            )
+            if keys:
+                yield [_decode(key) for key in keys]
+            if cursor == 0:
+                return
+
+    @staticmethod
+    async def getKeysByPattern(pattern: str) -> list:
+        """Get all keys matching a pattern (collected from scan_keys, without blocking Redis)"""
+        keys = {}
+        async for batch in Cache.scan_keys(pattern):
+            keys.update(dict.fromkeys(batch))
+        return list(keys)
+
+    @staticmethod
+    async def delete_by_pattern(pattern: str, batch_size: int = REDIS_UNLINK_BATCH) -> int:
+        """
+        Remove every key matching a pattern and return how many were removed.
+        Keys are UNLINKed (memory is freed off the main Redis thread) in pipelined
+        batches of `batch_size` as the scan goes, so memory use stays bounded.
+        """
+        removed = 0
+        pending: List[str] = []
+
+        async def flush(keys: List[str]) -> int:
+            def build(pipe):
+                for start in range(0, len(keys), batch_size):
+                    pipe.unlink(*keys[start:start + batch_size])
+            return sum(await Cache.pipeline(build))
+
+        async for batch in Cache.scan_keys(pattern):
+            pending.extend(batch)
+            if len(pending) >= batch_size * 4:
+                removed += await flush(pending)
+                pending = []
+        if pending:
+            removed += await flush(pending)
+        return removed
+
+    @staticmethod
+    async def get_many(keys: List[str]) -> List[Optional[str]]:
+        """MGET: values in key order, None for missing keys"""
+        if not keys:
+            return []
+        values = await Cache._execute(lambda client: client.mget(keys), "retrieve values")
+        return [_decode(value) for value in values]
+
+    @staticmethod
+    async def set_many(mapping: Dict[str, Any], ttl: int = 900) -> None:
+        """Set several keys with the same time-to-live in one pipelined round-trip"""
+        if not mapping:
+            return
+
+        def build(pipe):
+            for key, value in mapping.items():
+                pipe.setex(key, ttl, value)
 
-            # Convert value to string if it's bytes
-            if isinstance(value, bytes):
-                value = value.decode('utf-8')
+        await Cache.pipeline(build)
 
-            # Delete the key after successful retrieval
-            await redis_client.delete(key)
+    @staticmethod
+    async def delete_many(keys: Iterable[str]) -> int:
+        """Delete several keys in one round-trip and return how many existed"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        return await Cache._execute(lambda client: client.delete(*keys), "delete values")
 
-            return value
+    @staticmethod
+    async def pipeline(build: Callable[[Any], None], transaction: bool = False) -> List[Any]:
+        """
+        Queue commands on a pipeline with `build(pipe)` and send them in one round-trip.
+        Returns the raw per-command results in order.
+        """
+        async def run(client: redis.Redis):
+            async with client.pipeline(transaction=transaction) as pipe:
+                build(pipe)
+                return await pipe.execute()
+
+        return await Cache._execute(run, "run pipeline")
+
+    @staticmethod
+    async def _try_lock(key: str):
+        lock = Cache._client().lock(
+            f"lock:{key}", timeout=CACHE_COMPUTE_LOCK_TIMEOUT, blocking=False, thread_local=False
+        )
+        acquired = await Cache._execute(lambda client: lock.acquire(), "acquire lock")
+        return lock if acquired else None
 
+    @staticmethod
+    async def _release_lock(lock) -> None:
+        try:
+            await lock.release()
+        except Exception:
+            # Expired (and maybe taken over) while we computed; nothing to undo
+            pass
+
+    @staticmethod
+    async def _read_entry(key: str, codec) -> Optional[tuple]:
+        """Return (value, compute_ms, remaining_ms) or None. Unreadable entries count as missing."""
+        def build(pipe):
+            pipe.get(key)
+            pipe.pttl(key)
+
+        raw, remaining_ms = await Cache.pipeline(build)
+        if raw is None:
+            return None
+        try:
+            compute_ms, payload = raw.split(b":", 1)
+            return codec.decode(payload), int(compute_ms), remaining_ms
+        except Exception:
+            return None
+
+    @staticmethod
+    async def _compute_and_store(key: str, loader: Callable[[], Awaitable[Any]], ttl: int, codec) -> Any:
+        started = time.perf_counter()
+        value = await loader()
+        compute_ms = int((time.perf_counter() - started) * 1000)
+        entry = str(compute_ms).encode() + b":" + codec.encode(value)
+        try:
+            await Cache._execute(lambda client: client.set(key, entry, ex=ttl), "set value")
         except HTTPException as http_exc:
-            raise http_exc
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to retrieve value: {str(e)}"
-            )
+            print(f"Cache write failed for {key}: {http_exc.detail}")
+        return value
 
     @staticmethod
-    async def getKeysByPattern(pattern: str) -> list:
-        """Get all keys matching a pattern"""
+    async def get_or_compute(key: str, loader: Callable[[], Awaitable[Any]], ttl: int = 900,
+                             codec: str = "json") -> Any:
+        """
+        Return the value cached under key, or compute it with loader and cache it for ttl seconds.
+
+        Values are encoded with the named codec from redis_cache.codecs, so
+        ObjectId and datetime round-trip. Two guards stop expiring hot keys
+        from stampeding:
+          - Probabilistic early expiry (XFetch). Shortly before expiry, one
+            caller, with a probability that grows as the key ages and with
+            how slow the last compute was, refreshes the entry. Everyone else
+            keeps getting the cached value.
+          - A Redis lock on a full miss. One caller computes while the others
+            poll for its result for up to CACHE_COMPUTE_WAIT seconds, then
+            compute themselves.
+        If Redis is unavailable the loader is called directly.
+        """
+        codec_impl = get_codec(codec)
+
         try:
+            entry = await Cache._read_entry(key, codec_impl)
+        except HTTPException:
+            Cache.compute_fallbacks += 1
+            return await loader()
+
+        if entry is not None:
+            value, compute_ms, remaining_ms = entry
+            Cache.compute_hits += 1
+            gap = compute_ms * CACHE_EARLY_EXPIRY_BETA * -math.log(1.0 - random.random())
+            if remaining_ms < 0 or gap < remaining_ms:
+                return value
+            # Early refresh: only the lock holder recomputes, the rest serve the current value
+            try:
+                lock = await Cache._try_lock(key)
+            except HTTPException:
+                return value
+            if lock is None:
+                return value
+            Cache.early_refreshes += 1
             try:
-                await redis_client.ping()
-            except redis.ConnectionError:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Redis service unavailable"
-                )
-
-            # Get keys matching the pattern
-            keys = await redis_client.keys(pattern)
-            
-            # Convert bytes to strings if needed
-            result = []
-            for key in keys:
-                if isinstance(key, bytes):
-                    result.append(key.decode('utf-8'))
-                else:
-                    result.append(key)
-                    
-            return result
+                return await Cache._compute_and_store(key, loader, ttl, codec_impl)
+            finally:
+                await Cache._release_lock(lock)
 
-        except HTTPException as http_exc:
-            raise http_exc
-        except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to get keys: {str(e)}"
-            )
\ No newline at end of file
+        Cache.compute_misses += 1
+        try:
+            lock = await Cache._try_lock(key)
+        except HTTPException:
+            Cache.compute_fallbacks += 1
+            return await loader()
+
+        if lock is not None:
+            try:
+                return await Cache._compute_and_store(key, loader, ttl, codec_impl)
+            finally:
+                await Cache._release_lock(lock)
+
+        # Someone else is computing: wait for their result instead of piling onto the database
+        Cache.lock_waits += 1
+        deadline = time.monotonic() + CACHE_COMPUTE_WAIT
+        delay = 0.01
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            try:
+                entry = await Cache._read_entry(key, codec_impl)
+            except HTTPException:
+                break
+            if entry is not None:
+                return entry[0]
+        Cache.compute_fallbacks += 1
+        return await Cache._compute_and_store(key, loader, ttl, codec_impl)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        pool = database.redis_client.connection_pool if database.redis_client is not None else None
+        return {
+            "pid": os.getpid(),
+            "healthy": Cache._unavailable_until <= time.monotonic(),
+            "pool_max_connections": getattr(pool, "max_connections", None),
+            "commands": Cache.commands,
+            "connection_errors": Cache.connection_errors,
+            "short_circuited": Cache.short_circuited,
+            "get_or_compute": {
+                "hits": Cache.compute_hits,
+                "misses": Cache.compute_misses,
+                "early_refreshes": Cache.early_refreshes,
+                "lock_waits": Cache.lock_waits,
+                "fallbacks": Cache.compute_fallbacks,
+            },
+        }
+
+
+register_metrics("redis", Cache.stats)
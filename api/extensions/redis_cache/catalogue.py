@@ -0,0 +1,118 @@
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from fastapi import HTTPException
+from api.extensions.redis_cache import Cache
+from api.extensions.helper.metrics import register_metrics
+
+# Seconds a cached page or supplier list stays valid if nothing invalidates it first
+CATALOGUE_CACHE_TTL = int(os.getenv("CATALOGUE_CACHE_TTL", "60"))
+
+class CatalogueCache:
+    """
+    Read-through cache for the product catalogue.
+
+    Entries are stored through Cache.get_or_compute under keys that embed a version
+    number. Writes bump the version instead of deleting keys, so readers move
+    to fresh keys immediately and the stale ones simply expire:
+
+        catalogue:version                          -> global catalogue version
+        catalogue:v{version}:page:{cursor}:{limit} -> one get_all_products page
+        catalogue:supplier:{id}:version            -> per-supplier version
+        catalogue:supplier:{id}:v{version}         -> get_products_by_supplier list
+
+    Redis failures are treated as misses so the catalogue keeps working from Mongo.
+    """
+    hits = 0
+    misses = 0
+    errors = 0
+
+    @staticmethod
+    async def _get(key: str) -> Optional[str]:
+        try:
+            return await Cache.getValue(key)
+        except HTTPException as http_exc:
+            if http_exc.status_code == 404:
+                return None
+            raise
+
+    @staticmethod
+    async def _version(key: str) -> str:
+        return await CatalogueCache._get(key) or "0"
+
+    @staticmethod
+    async def _page_key(cursor: Optional[str], limit: int) -> str:
+        version = await CatalogueCache._version("catalogue:version")
+        return f"catalogue:v{version}:page:{cursor or 'first'}:{limit}"
+
+    @staticmethod
+    async def _supplier_key(supplier_id: str) -> str:
+        version = await CatalogueCache._version(f"catalogue:supplier:{supplier_id}:version")
+        return f"catalogue:supplier:{supplier_id}:v{version}"
+
+    @staticmethod
+    async def _read_through(key_factory: Awaitable[str], loader: Callable[[], Awaitable[Any]]) -> Any:
+        # The key (and so the version) is fixed before loading, so a write that
+        # lands while we query Mongo moves readers to a newer key than ours.
+        try:
+            key = await key_factory
+        except Exception as e:
+            CatalogueCache.errors += 1
+            print(f"Catalogue cache read failed: {e}")
+            return await loader()
+
+        loaded = False
+
+        async def counting_loader():
+            nonlocal loaded
+            loaded = True
+            return await loader()
+
+        # get_or_compute keeps concurrent misses on a hot page from all hitting Mongo
+        value = await Cache.get_or_compute(key, counting_loader, CATALOGUE_CACHE_TTL)
+        if loaded:
+            CatalogueCache.misses += 1
+        else:
+            CatalogueCache.hits += 1
+        return value
+
+    @staticmethod
+    async def products_page(cursor: Optional[str], limit: int,
+                            loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return a get_all_products page from cache, loading and storing it on a miss"""
+        return await CatalogueCache._read_through(CatalogueCache._page_key(cursor, limit), loader)
+
+    @staticmethod
+    async def supplier_products(supplier_id: str,
+                                loader: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Return a supplier's product list from cache, loading and storing it on a miss"""
+        return await CatalogueCache._read_through(CatalogueCache._supplier_key(supplier_id), loader)
+
+    @staticmethod
+    async def invalidate(*supplier_ids: Optional[str]) -> None:
+        """Bump the catalogue version and the version of every affected supplier"""
+        def build(pipe):
+            pipe.incr("catalogue:version")
+            for supplier_id in {sid for sid in supplier_ids if sid}:
+                pipe.incr(f"catalogue:supplier:{supplier_id}:version")
+
+        try:
+            await Cache.pipeline(build)
+        except Exception as e:
+            CatalogueCache.errors += 1
+            print(f"Catalogue cache invalidation failed: {e}")
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        """Hit/miss counters for this worker process"""
+        lookups = CatalogueCache.hits + CatalogueCache.misses
+        return {
+            "pid": os.getpid(),
+            "ttl": CATALOGUE_CACHE_TTL,
+            "hits": CatalogueCache.hits,
+            "misses": CatalogueCache.misses,
+            "errors": CatalogueCache.errors,
+            "hit_ratio": CatalogueCache.hits / lookups if lookups else 0.0,
+        }
+
+
+register_metrics("catalogue_cache", CatalogueCache.stats)
@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from typing import Any, Dict
+import bson
+import msgpack
+from bson import ObjectId
+
+
+class JsonCodec:
+    """
+    JSON with ObjectId and datetime tagged as {"$oid": ...} / {"$date": ...}
+    so they decode back to the original types. Human-readable in redis-cli.
+    """
+    name = "json"
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, ObjectId):
+            return {"$oid": str(value)}
+        if isinstance(value, datetime):
+            return {"$date": value.isoformat()}
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @staticmethod
+    def _object_hook(value: Dict[str, Any]) -> Any:
+        if len(value) == 1:
+            if "$oid" in value:
+                return ObjectId(value["$oid"])
+            if "$date" in value:
+                return datetime.fromisoformat(value["$date"])
+        return value
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return json.dumps(value, default=JsonCodec._default, separators=(",", ":")).encode('utf-8')
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        return json.loads(data, object_hook=JsonCodec._object_hook)
+
+
+# msgpack extension type codes
+_EXT_OBJECT_ID = 1
+_EXT_DATETIME = 2
+
+
+class MsgpackCodec:
+    """msgpack with ObjectId (12 raw bytes) and datetime (ISO string) as extension types. Smaller and faster than JSON."""
+    name = "msgpack"
+
+    @staticmethod
+    def _default(value: Any) -> Any:
+        if isinstance(value, ObjectId):
+            return msgpack.ExtType(_EXT_OBJECT_ID, value.binary)
+        if isinstance(value, datetime):
+            return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode('utf-8'))
+        raise TypeError(f"Object of type {type(value).__name__} is not msgpack serializable")
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == _EXT_OBJECT_ID:
+            return ObjectId(data)
+        if code == _EXT_DATETIME:
+            return datetime.fromisoformat(data.decode('utf-8'))
+        return msgpack.ExtType(code, data)
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        return msgpack.packb(value, default=MsgpackCodec._default, use_bin_type=True)
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=MsgpackCodec._ext_hook, raw=False)
+
+
+class BsonCodec:
+    """
+    Compact binary via BSON, which stores ObjectId and datetime natively (no pickle).
+    BSON datetimes have millisecond precision and decode as naive UTC.
+    """
+    name = "bson"
+
+    @staticmethod
+    def encode(value: Any) -> bytes:
+        # BSON documents must be mappings, so wrap the value
+        return bson.encode({"v": value})
+
+    @staticmethod
+    def decode(data: bytes) -> Any:
+        return bson.decode(data)["v"]
+
+
+# Codecs selectable by name in TieredCache namespaces and Cache.get_or_compute
+CODECS: Dict[str, Any] = {codec.name: codec for codec in (JsonCodec, MsgpackCodec, BsonCodec)}
+
+
+def get_codec(name: str) -> Any:
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec '{name}'")
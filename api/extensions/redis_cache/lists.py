@@ -0,0 +1,88 @@
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+from api.extensions.redis_cache import Cache
+from api.extensions.helper.metrics import register_metrics
+
+# Seconds a cached list page stays valid if nothing invalidates it first
+LIST_CACHE_TTL = int(os.getenv("LIST_CACHE_TTL", "30"))
+# Codec for cached pages (see redis_cache.codecs)
+LIST_CACHE_CODEC = os.getenv("LIST_CACHE_CODEC", "msgpack")
+
+class ListCache:
+    """
+    One-call caching for paginated list endpoints, on top of Cache.get_or_compute.
+
+    A scope names one family of lists that are invalidated together, such as
+    "bookings:vendor:<id>" or "reviews". Pages are stored under versioned keys:
+
+        list:{scope}:version                                      -> scope version counter
+        list:{scope}:v{version}[:{variant}]:{cursor|first}:{limit} -> one page
+
+    `variant` tells apart differently filtered lists that share one scope's invalidation.
+
+    invalidate() bumps the version, so readers move to fresh keys at once and
+    old pages expire on their own. Redis failures fall back to the loader.
+    """
+    # kind (first scope segment) -> counters
+    _stats: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _count(scope: str, counter: str) -> None:
+        kind = scope.split(":", 1)[0]
+        stats = ListCache._stats.setdefault(kind, {"hits": 0, "misses": 0, "errors": 0})
+        stats[counter] += 1
+
+    @staticmethod
+    async def page(scope: str, cursor: Optional[str], limit: int,
+                   loader: Callable[[], Awaitable[Dict[str, Any]]],
+                   variant: str = "", ttl: int = LIST_CACHE_TTL,
+                   codec: str = LIST_CACHE_CODEC) -> Dict[str, Any]:
+        """Return one cached page of a list scope, computing it with loader on a miss"""
+        try:
+            version = (await Cache.get_many([f"list:{scope}:version"]))[0] or "0"
+        except Exception as e:
+            ListCache._count(scope, "errors")
+            print(f"List cache read failed for {scope}: {getattr(e, 'detail', e)}")
+            return await loader()
+
+        loaded = False
+
+        async def counting_loader():
+            nonlocal loaded
+            loaded = True
+            return await loader()
+
+        prefix = f"list:{scope}:v{version}:{variant}" if variant else f"list:{scope}:v{version}"
+        key = f"{prefix}:{cursor or 'first'}:{limit}"
+        value = await Cache.get_or_compute(key, counting_loader, ttl, codec)
+        ListCache._count(scope, "misses" if loaded else "hits")
+        return value
+
+    @staticmethod
+    async def invalidate(*scopes: Optional[str]) -> None:
+        """Bump the version of every given scope in one round-trip"""
+        scopes = {scope for scope in scopes if scope}
+        if not scopes:
+            return
+
+        def build(pipe):
+            for scope in scopes:
+                pipe.incr(f"list:{scope}:version")
+
+        try:
+            await Cache.pipeline(build)
+        except Exception as e:
+            for scope in scopes:
+                ListCache._count(scope, "errors")
+            print(f"List cache invalidation failed: {getattr(e, 'detail', e)}")
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        result = {"pid": os.getpid(), "ttl": LIST_CACHE_TTL, "codec": LIST_CACHE_CODEC}
+        for kind, counters in ListCache._stats.items():
+            lookups = counters["hits"] + counters["misses"]
+            result[kind] = dict(counters, hit_ratio=counters["hits"] / lookups if lookups else 0.0)
+        return result
+
+
+register_metrics("list_cache", ListCache.stats)
@@ -0,0 +1,312 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from api import db as database
+from api.extensions.redis_cache import Cache
+from api.extensions.redis_cache.codecs import get_codec
+from api.extensions.helper.metrics import register_metrics
+
+# Pub/sub channel carrying "<namespace> <key>" invalidations ("<namespace> *" clears a namespace)
+TIERED_CACHE_CHANNEL = "cache:invalidate"
+
+
+class CacheNamespace:
+    """
+    Declared settings and counters for one family of cached values.
+
+    ttl          seconds an entry lives in Redis (L2)
+    local_ttl    seconds an entry lives in the in-process LRU (L1), a safety net
+                 for invalidation messages missed while disconnected
+    max_entries  L1 size bound; least recently used entries are evicted first
+    codec        name of an entry in CODECS used for the Redis representation
+    """
+
+    def __init__(self, name: str, ttl: int = 60, local_ttl: float = 30,
+                 max_entries: int = 1024, codec: str = "json") -> None:
+        self.name = name
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.max_entries = max_entries
+        self.codec = get_codec(codec)
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation so a load that overlapped one is not stored
+        self.generation = 0
+
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.invalidations = 0
+
+    def redis_key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    def get_local(self, key: str) -> Tuple[bool, Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.entries.pop(key, None)
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def set_local(self, key: str, value: Any) -> None:
+        self.entries[key] = (time.monotonic() + self.local_ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.l1_hits + self.l2_hits + self.misses
+        return {
+            "ttl": self.ttl,
+            "local_ttl": self.local_ttl,
+            "max_entries": self.max_entries,
+            "codec": self.codec.name,
+            "size": len(self.entries),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "invalidations": self.invalidations,
+            "l1_hit_ratio": self.l1_hits / lookups if lookups else 0.0,
+            "hit_ratio": (self.l1_hits + self.l2_hits) / lookups if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """
+    Two-tier read-through cache: an in-process LRU (L1) in front of Redis (L2).
+
+    Namespaces are declared once with register_namespace(). A read checks L1,
+    then L2, then calls the loader and fills both tiers. invalidate() deletes
+    the Redis entry and publishes on TIERED_CACHE_CHANNEL. Every worker's
+    listener then drops its L1 copy, usually within a few milliseconds.
+    Loaders returning None are not cached, and Redis failures are treated as
+    misses.
+
+    Values handed out are the cached objects themselves, so callers must not
+    mutate them.
+    """
+    _namespaces: Dict[str, CacheNamespace] = {}
+    _listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def register_namespace(name: str, ttl: int = 60, local_ttl: float = 30,
+                           max_entries: int = 1024, codec: str = "json") -> CacheNamespace:
+        namespace = CacheNamespace(name, ttl, local_ttl, max_entries, codec)
+        TieredCache._namespaces[name] = namespace
+        return namespace
+
+    @staticmethod
+    def _namespace(name: str) -> CacheNamespace:
+        try:
+            return TieredCache._namespaces[name]
+        except KeyError:
+            raise ValueError(f"Cache namespace '{name}' is not registered")
+
+    @staticmethod
+    async def get(namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading and storing it on a miss in both tiers"""
+        ns = TieredCache._namespace(namespace)
+        found, value = ns.get_local(key)
+        if found:
+            ns.l1_hits += 1
+            return value
+
+        try:
+            cached = await Cache._execute(lambda client: client.get(ns.redis_key(key)), "retrieve value")
+            if cached is not None:
+                value = ns.codec.decode(cached)
+                ns.l2_hits += 1
+                ns.set_local(key, value)
+                return value
+        except Exception as e:
+            ns.errors += 1
+            print(f"Cache read failed for {ns.redis_key(key)}: {getattr(e, 'detail', e)}")
+
+        ns.misses += 1
+        generation = ns.generation
+        value = await loader()
+        if value is None or generation != ns.generation:
+            return value
+        await TieredCache.set(namespace, key, value)
+        return ns.entries[key][1] if key in ns.entries else value
+
+    @staticmethod
+    async def get_many(namespace: str, keys: List[str],
+                       loader: Callable[[List[str]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        get() for many keys with at most one round-trip per tier: L1, one MGET,
+        then one loader(missing_keys) call returning {key: value}. Keys the
+        loader leaves out are absent from the result.
+        """
+        ns = TieredCache._namespace(namespace)
+        values: Dict[str, Any] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            found, value = ns.get_local(key)
+            if found:
+                ns.l1_hits += 1
+                values[key] = value
+            else:
+                missing.append(key)
+        if not missing:
+            return values
+
+        try:
+            cached = await Cache._execute(lambda client: client.mget([ns.redis_key(key) for key in missing]), "retrieve values")
+            remaining = []
+            for key, raw in zip(missing, cached):
+                if raw is None:
+                    remaining.append(key)
+                    continue
+                values[key] = ns.codec.decode(raw)
+                ns.l2_hits += 1
+                ns.set_local(key, values[key])
+            missing = remaining
+        except Exception as e:
+            ns.errors += 1
+            print(f"Cache read failed for {len(missing)} {ns.name} keys: {getattr(e, 'detail', e)}")
+        if not missing:
+            return values
+
+        ns.misses += len(missing)
+        generation = ns.generation
+        loaded = {key: value for key, value in (await loader(missing)).items() if value is not None}
+        if generation != ns.generation:
+            values.update(loaded)
+            return values
+
+        encoded = {key: ns.codec.encode(value) for key, value in loaded.items()}
+        for key, raw in encoded.items():
+            values[key] = ns.codec.decode(raw)
+            ns.set_local(key, values[key])
+
+        def build(pipe):
+            for key, raw in encoded.items():
+                pipe.setex(ns.redis_key(key), ns.ttl, raw)
+
+        if encoded:
+            try:
+                await Cache.pipeline(build)
+            except Exception as e:
+                ns.errors += 1
+                print(f"Cache write failed for {len(encoded)} {ns.name} keys: {getattr(e, 'detail', e)}")
+        return values
+
+    @staticmethod
+    async def set(namespace: str, key: str, value: Any) -> None:
+        """Store a value in both tiers. L1 keeps the decoded codec form, the same thing other workers read."""
+        ns = TieredCache._namespace(namespace)
+        encoded = ns.codec.encode(value)
+        ns.set_local(key, ns.codec.decode(encoded))
+        try:
+            await Cache._execute(lambda client: client.setex(ns.redis_key(key), ns.ttl, encoded), "set value")
+        except Exception as e:
+            ns.errors += 1
+            print(f"Cache write failed for {ns.redis_key(key)}: {getattr(e, 'detail', e)}")
+
+    @staticmethod
+    async def invalidate(namespace: str, *keys: str) -> None:
+        """Drop keys from Redis and from the L1 of every worker"""
+        ns = TieredCache._namespace(namespace)
+        keys = [str(key) for key in keys if key is not None]
+        if not keys:
+            return
+        for key in keys:
+            ns.entries.pop(key, None)
+        ns.generation += 1
+        ns.invalidations += len(keys)
+
+        def build(pipe):
+            pipe.delete(*[ns.redis_key(key) for key in keys])
+            for key in keys:
+                pipe.publish(TIERED_CACHE_CHANNEL, f"{ns.name} {key}")
+
+        try:
+            await Cache.pipeline(build)
+        except Exception as e:
+            ns.errors += 1
+            print(f"Cache invalidation failed for {ns.name}: {getattr(e, 'detail', e)}")
+
+    @staticmethod
+    async def invalidate_namespace(namespace: str) -> None:
+        """Drop every entry of a namespace in Redis and in every worker"""
+        ns = TieredCache._namespace(namespace)
+        ns.entries.clear()
+        ns.generation += 1
+        ns.invalidations += 1
+        try:
+            await Cache.delete_by_pattern(ns.redis_key("*"))
+            await Cache._execute(lambda client: client.publish(TIERED_CACHE_CHANNEL, f"{ns.name} *"), "publish")
+        except Exception as e:
+            ns.errors += 1
+            print(f"Cache invalidation failed for {ns.name}: {getattr(e, 'detail', e)}")
+
+    @staticmethod
+    def _apply_invalidation(data: Any) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        name, _, key = str(data).partition(" ")
+        ns = TieredCache._namespaces.get(name)
+        if ns is None:
+            return
+        ns.generation += 1
+        if key == "*":
+            ns.entries.clear()
+        else:
+            ns.entries.pop(key, None)
+
+    @staticmethod
+    async def start() -> None:
+        if TieredCache._listener is None and database.redis_client is not None:
+            TieredCache._listener = asyncio.create_task(TieredCache._listen())
+
+    @staticmethod
+    async def stop() -> None:
+        if TieredCache._listener is not None:
+            TieredCache._listener.cancel()
+            await asyncio.gather(TieredCache._listener, return_exceptions=True)
+            TieredCache._listener = None
+
+    @staticmethod
+    async def _listen() -> None:
+        backoff = 1
+        while True:
+            pubsub = database.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(TIERED_CACHE_CHANNEL)
+                # Invalidations may have been missed while unsubscribed
+                for ns in TieredCache._namespaces.values():
+                    ns.entries.clear()
+                backoff = 1
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        TieredCache._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation subscription lost: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "subscribed": TieredCache._listener is not None,
+            "namespaces": {name: ns.stats() for name, ns in TieredCache._namespaces.items()},
+        }
+
+
+register_metrics("tiered_cache", TieredCache.stats)
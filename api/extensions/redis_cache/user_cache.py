@@ -0,0 +1,41 @@
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+from api.extensions.redis_cache.tiered import TieredCache
+from api.extensions.helper.json_serializer import serialize_for_json
+
+# In-process entries are dropped on invalidation in every worker; the TTL only covers missed messages
+USER_CACHE_LOCAL_TTL = float(os.getenv("USER_CACHE_LOCAL_TTL", "5"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))
+USER_CACHE_REDIS_TTL = int(os.getenv("USER_CACHE_REDIS_TTL", "60"))
+
+TieredCache.register_namespace(
+    "users",
+    ttl=USER_CACHE_REDIS_TTL,
+    local_ttl=USER_CACHE_LOCAL_TTL,
+    max_entries=USER_CACHE_MAX_ENTRIES,
+)
+
+class UserCache:
+    """
+    Cache of resolved user documents for get_current_user, on the "users"
+    TieredCache namespace. Entries never contain the password hash. User
+    writes call invalidate(), which drops the entry in Redis and in every
+    worker's in-process tier.
+    """
+
+    @staticmethod
+    async def get_user(user_id: str, loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Return the cached user document, calling loader on a miss in both levels"""
+        async def load_user():
+            loaded = await loader()
+            if not loaded:
+                return None
+            return serialize_for_json({k: v for k, v in loaded.items() if k != "password"})
+
+        user = await TieredCache.get("users", str(user_id), load_user)
+        return dict(user) if user is not None else None
+
+    @staticmethod
+    async def invalidate(user_id: str) -> None:
+        """Drop a user from both levels after any write to their document"""
+        await TieredCache.invalidate("users", str(user_id))
@@ -1,21 +1,32 @@
-from api.db import isMongoDBAvailable
+from api import db as database
 from fastapi import HTTPException
 
+from api.db.indexes import ensure_indexes
+
+# Import every model so each one registers its indexes
 from api.models.user.Role import Role
+from api.models.user.User import User
+from api.models.product.Product import ProductModel
+from api.models.order.Order import Order
+from api.models.review.Review import ReviewModel
+from api.models.payment.Payment import Payment
+from api.models.payment.Payment_history import PaymentHistory
+from api.models.payment.Transaction import Transaction
 
-def init_models():
+async def init_models():
     """
     Initialize default data for the application.
-    This function creates default roles and users if they don't exist.
+    This function creates registered indexes, then default roles and users if they don't exist.
     """
     # Check if MongoDB is available
-    if not isMongoDBAvailable:
+    if not database.isMongoDBAvailable:
         raise HTTPException(status_code=503, detail="MongoDB is not available. Skipping default data initialization.")
 
 
     try:
         print("Initializing Models...")
-        roles_result = Role.create_default_roles()
+        await ensure_indexes()
+        roles_result = await Role.create_default_roles()
         if roles_result is None:
             raise HTTPException(status_code=500, detail="Failed to create default roles. Skipping user creation.")
     except HTTPException as http_exc:
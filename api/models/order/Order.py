@@ -1,26 +1,145 @@
 from bson import ObjectId
 from pydantic import BaseModel, Field
-from typing import Optional, List, Literal
+from typing import Dict, Optional, List, Literal, Tuple
 from datetime import datetime
 from fastapi import HTTPException
+import os
+import re
 
 # from api.models.Location import LocationModel
 # from api.models.payment.Transaction import TransactionModel
 # from api.models.payment.Payment import PaymentModel
 # from api.models.user.User import UserModel
-from api.db import db  # Ensure this import is correct
+from api.db import get_collection  # Ensure this import is correct
+from api import db as database
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
 from api.extensions.helper.json_serializer import serialize_for_json
+from api.extensions.helper.pagination import paginate, clamp_limit
+from api.extensions.redis_cache.lists import ListCache
+from api.extensions.helper.singleflight import SingleFlight
+from api.extensions.helper.export import export_cursor
+from api.socket.events import UserEvents
+from api.models.product.Product import ProductModel
+from api.extensions.redis_cache.tiered import TieredCache
+from pymongo import ReturnDocument, UpdateOne
+
+# Fields returned by booking listings
+BOOKING_LIST_PROJECTION = {
+    "vendor_id": 1,
+    "supplier_id": 1,
+    "product_id": 1,
+    "qty": 1,
+    "items": 1,
+    "total_price": 1,
+    "status": 1,
+    "order_date": 1,
+}
+
+# Columns of /order/export, in CSV order
+BOOKING_EXPORT_FIELDS = ["_id", *BOOKING_LIST_PROJECTION]
+
+# Booking lifecycle: status -> statuses it may move to. delivered and cancelled are final.
+BOOKING_TRANSITIONS = {
+    "pending": {"confirmed", "cancelled"},
+    "confirmed": {"delivered", "cancelled"},
+    "delivered": set(),
+    "cancelled": set(),
+}
+
+# Most status changes accepted by one bulk_update_status call
+ORDER_BULK_MAX_ITEMS = int(os.getenv("ORDER_BULK_MAX_ITEMS", "5000"))
+# Most line items in one order
+ORDER_MAX_LINES = int(os.getenv("ORDER_MAX_LINES", "500"))
+# Reserve the stock of multi-line orders in a transaction: "auto" when the server is a replica
+# set or mongos, else "true"/"false". Without one, lines are reserved one by one and given back
+# if a later one fails
+ORDER_TRANSACTIONS = os.getenv("ORDER_TRANSACTIONS", "auto").lower()
+
+def allowed_sources(status: str) -> List[str]:
+    """Statuses a booking may be in to move to `status`"""
+    return sorted(source for source, targets in BOOKING_TRANSITIONS.items() if status in targets)
+
+def holds_stock(status: Optional[str]) -> bool:
+    """A booking keeps its stock reserved for as long as it can still be cancelled"""
+    return status in allowed_sources("cancelled")
+
+def _transition_filter(booking_id: ObjectId, status: str, supplier_id: Optional[str]) -> dict:
+    query = {"_id": booking_id, "status": {"$in": allowed_sources(status)}}
+    if supplier_id:
+        query["supplier_id"] = supplier_id
+    return query
+
+def _transition_update(status: str, supplier_id: Optional[str], at: datetime, batch: Optional[str] = None) -> list:
+    """Pipeline update setting the status and appending the history entry; "$status" still reads the old status"""
+    entry = {"from": "$status", "to": {"$literal": status}, "at": at, "by": {"$literal": supplier_id}}
+    if batch:
+        entry["batch"] = {"$literal": batch}
+    return [{"$set": {
+        "status": status,
+        "status_history": {"$concatArrays": [{"$ifNull": ["$status_history", []]}, [entry]]},
+    }}]
+
+
+_OBJECT_ID = re.compile(r"[0-9a-fA-F]{24}")
+
+def _use_transactions() -> bool:
+    if ORDER_TRANSACTIONS == "auto":
+        return database.mongoSupportsTransactions
+    return ORDER_TRANSACTIONS == "true"
+
+def stock_lines(booking: dict) -> Dict[str, int]:
+    """{product_id: qty} reserved by a booking, single-product or multi-line"""
+    lines: Dict[str, int] = {}
+    for item in booking.get("items") or [booking]:
+        if item.get("product_id") and item.get("qty"):
+            lines[item["product_id"]] = lines.get(item["product_id"], 0) + item["qty"]
+    return lines
+
+def price_lines(prices: List[float], quantities: List[int]) -> Tuple[List[float], float]:
+    """Line totals rounded to cents and their rounded sum; quotes and orders share it so they agree"""
+    line_totals = [round(price * qty, 2) for price, qty in zip(prices, quantities)]
+    return line_totals, round(sum(line_totals), 2)
+
+def _order_lines(items) -> Dict[str, int]:
+    """Validate [{"product_id", "qty"}, ...]; repeated products are merged, first-seen order kept"""
+    if not isinstance(items, list) or not items:
+        raise HTTPException(status_code=400, detail="items must be a non-empty list")
+    if len(items) > ORDER_MAX_LINES:
+        raise HTTPException(status_code=413, detail=f"At most {ORDER_MAX_LINES} items per order")
+    lines: Dict[str, int] = {}
+    for position, item in enumerate(items):
+        product_id = str(item.get("product_id")) if isinstance(item, dict) else ""
+        qty = item.get("qty") if isinstance(item, dict) else None
+        # Same check as ObjectId.is_valid for strings, without building an ObjectId per line
+        if not _OBJECT_ID.fullmatch(product_id):
+            raise HTTPException(status_code=400, detail=f"items[{position}]: invalid product_id")
+        if isinstance(qty, bool) or not isinstance(qty, int) or qty <= 0:
+            raise HTTPException(status_code=400, detail=f"items[{position}]: qty must be a positive integer")
+        lines[product_id] = lines.get(product_id, 0) + qty
+    return lines
+
+
+class OrderItemModel(BaseModel):
+    product_id: str
+    qty: int
+    price_per_unit: float
+    total_price: float
 
 
 class OrderModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
     vendor_id: str
     supplier_id: str
-    product_id: str
-    qty: int
+    # Single-product bookings; multi-line orders use items instead
+    product_id: Optional[str] = None
+    qty: Optional[int] = None
+    items: List[OrderItemModel] = Field(default_factory=list)
     total_price: float
     status: Literal["pending", "confirmed", "delivered", "cancelled"]
     order_date: datetime = Field(default_factory=datetime.utcnow)
+    # One {"from", "to", "at", "by"} entry per status change, oldest first
+    status_history: List[dict] = Field(default_factory=list)
 
     # payment_status: Optional[Literal["pending", "completed", "failed"]] = "pending"
     # payment_method: Optional[Literal["UPI", "COD", "Wallet", "Card"]] = None
@@ -37,12 +156,25 @@ class OrderModel(BaseModel):
 
 class Order:
 
+    @staticmethod
+    async def invalidate_lists(booking: Optional[dict]) -> None:
+        """Drop cached booking pages for the vendor and supplier of a changed booking"""
+        if booking:
+            await ListCache.invalidate(
+                f"bookings:vendor:{booking.get('vendor_id')}" if booking.get("vendor_id") else None,
+                f"bookings:supplier:{booking.get('supplier_id')}" if booking.get("supplier_id") else None,
+            )
 
     @staticmethod
-    def get_booking_by_id(booking_id: str):
+    async def publish_change(booking: dict, event: str, delta: dict) -> None:
+        """Push a booking delta to the vendor's and supplier's sockets, resumable after reconnects"""
+        await UserEvents.publish(event, delta, booking.get("vendor_id"), booking.get("supplier_id"))
+
+    @staticmethod
+    async def get_booking_by_id(booking_id: str):
         """Get a booking by its ID"""
         try:
-            booking = db["orders"].find_one({"_id": ObjectId(booking_id)})
+            booking = await get_collection("orders").find_one({"_id": ObjectId(booking_id)})
             if not booking:
                 raise HTTPException(status_code=404, detail="Booking not found")
             booking["_id"] = str(booking["_id"])
@@ -53,29 +185,56 @@ class Order:
             raise HTTPException(status_code=500, detail=f"Failed to fetch booking: {str(e)}")
         
     @staticmethod
-    def create_booking(order_data: dict):
-        """Create a new booking"""
+    async def create_booking(order_data: dict):
+        """
+        Create a new booking.
+
+        Stock is reserved first by one conditional update on the product, and
+        supplier_id and total_price are taken from the product it returns; any
+        client-sent values are ignored. If the insert fails the stock is released.
+        A body with "items" is a multi-line order (see _create_order).
+        """
         try:
-            print(f"DEBUG: Order.create_booking called with: {order_data}")
-            if db is None:
-                print("DEBUG: Database connection is None!")
-                raise HTTPException(status_code=500, detail="Database connection not initialized")
-            order_data["order_date"] = datetime.utcnow()
-            order_data["status"] = "pending"
+            if "items" in order_data:
+                return await Order._create_order(order_data)
+
             # Validate required fields
-            required_fields = ["vendor_id", "supplier_id", "product_id", "qty", "total_price"]
+            required_fields = ["vendor_id", "product_id", "qty"]
             for field in required_fields:
                 if field not in order_data:
-                    print(f"DEBUG: Missing field: {field}")
                     raise HTTPException(status_code=400, detail=f"Missing field: {field}")
-            print(f"DEBUG: All required fields present. Types: {[type(order_data[f]) for f in required_fields]}")
-            print(f"DEBUG: About to insert into DB: {order_data}")
-            result = db["orders"].insert_one(order_data)
-            print(f"DEBUG: Inserted booking with _id: {result.inserted_id}")
+            qty = order_data["qty"]
+            if isinstance(qty, bool) or not isinstance(qty, int) or qty <= 0:
+                raise HTTPException(status_code=400, detail="qty must be a positive integer")
+            product_id = str(order_data["product_id"])
+            if not ObjectId.is_valid(product_id):
+                raise HTTPException(status_code=400, detail="Invalid product_id")
+
+            product = await ProductModel.reserve_stock(product_id, qty, projection={"price_per_unit": 1, "supplier_id": 1})
+            order_data["product_id"] = product_id
+            order_data["supplier_id"] = product["supplier_id"]
+            order_data["total_price"] = round(float(product["price_per_unit"]) * qty, 2)
+            order_data["order_date"] = datetime.utcnow()
+            order_data["status"] = "pending"
+            order_data["status_history"] = [
+                {"from": None, "to": "pending", "at": order_data["order_date"], "by": order_data["vendor_id"]}
+            ]
+
+            try:
+                result = await get_collection("orders").insert_one(order_data)
+            except Exception:
+                await ProductModel.release_stock(product_id, qty)
+                raise
+
+            await Order.invalidate_lists(order_data)
             order_data["_id"] = str(result.inserted_id)
-            serialized = serialize_for_json(order_data)
-            print(f"DEBUG: Serialized booking: {serialized}")
-            return serialized
+            await Order.publish_change(order_data, "booking:created", {
+                "booking_id": order_data["_id"],
+                "booking": {field: order_data.get(field) for field in ["_id", *BOOKING_LIST_PROJECTION]},
+            })
+            return serialize_for_json(order_data)
+        except HTTPException:
+            raise
         except Exception as e:
             import traceback
             print(f"DEBUG: Exception in create_booking: {e}")
@@ -83,7 +242,138 @@ class Order:
             raise HTTPException(status_code=500, detail=f"Failed to create booking: {str(e)}")
 
     @staticmethod
-    def list_bookings(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
+    async def _create_order(order_data: dict):
+        """
+        Create one order document for many {"product_id", "qty"} lines of one supplier.
+
+        All products are read with one $in query, which prices the lines and
+        rejects unknown products, mixed suppliers and lines already short of
+        stock. The stock of every line is then taken by one bulk_write of
+        conditional $inc updates and the order inserted, both in one
+        transaction: if any line no longer has enough stock nothing is
+        reserved and the order is refused with 409. Servers without
+        transactions (standalone mongod, see ORDER_TRANSACTIONS) reserve line
+        by line instead and give back what was taken on failure.
+        """
+        if not order_data.get("vendor_id"):
+            raise HTTPException(status_code=400, detail="Missing field: vendor_id")
+        lines = _order_lines(order_data["items"])
+        oids = [ObjectId(product_id) for product_id in lines]
+
+        products = await get_collection("products").find(
+            {"_id": {"$in": oids}},
+            {"price_per_unit": 1, "supplier_id": 1, "available_quantity": 1}
+        ).to_list(length=len(oids))
+        found = {str(product["_id"]): product for product in products}
+        missing = [product_id for product_id in lines if product_id not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Product not found: {', '.join(missing)}")
+        suppliers = {product.get("supplier_id") for product in products}
+        if len(suppliers) != 1:
+            raise HTTPException(status_code=400, detail="All items of an order must be from the same supplier")
+        short = [product_id for product_id, qty in lines.items() if (found[product_id].get("available_quantity") or 0) < qty]
+        if short:
+            raise HTTPException(status_code=409, detail=f"Insufficient stock: {', '.join(short)}")
+
+        prices = [float(found[product_id]["price_per_unit"]) for product_id in lines]
+        line_totals, total_price = price_lines(prices, list(lines.values()))
+        items = [
+            {"product_id": product_id, "qty": qty, "price_per_unit": price, "total_price": line_total}
+            for (product_id, qty), price, line_total in zip(lines.items(), prices, line_totals)
+        ]
+        now = datetime.utcnow()
+        order = {
+            "vendor_id": order_data["vendor_id"],
+            "supplier_id": suppliers.pop(),
+            "items": items,
+            "total_price": total_price,
+            "order_date": now,
+            "status": "pending",
+            "status_history": [{"from": None, "to": "pending", "at": now, "by": order_data["vendor_id"]}],
+        }
+
+        if _use_transactions():
+            async def reserve_and_insert(session):
+                result = await get_collection("products").bulk_write(
+                    [
+                        UpdateOne({"_id": oid, "available_quantity": {"$gte": qty}}, {"$inc": {"available_quantity": -qty}})
+                        for oid, qty in zip(oids, lines.values())
+                    ],
+                    ordered=False,
+                    session=session
+                )
+                # Raising aborts the transaction, undoing the lines that did match
+                if result.matched_count != len(lines):
+                    raise HTTPException(status_code=409, detail="Insufficient stock")
+                return await get_collection("orders").insert_one(order, session=session)
+
+            client = get_collection("orders").database.client
+            async with await client.start_session() as session:
+                result = await session.with_transaction(reserve_and_insert)
+        else:
+            reserved: Dict[str, int] = {}
+            try:
+                for product_id, qty in lines.items():
+                    await ProductModel.reserve_stock(product_id, qty, projection={"_id": 1})
+                    reserved[product_id] = qty
+                result = await get_collection("orders").insert_one(order)
+            except Exception:
+                await ProductModel.release_stock_many(reserved)
+                raise
+
+        await TieredCache.invalidate("products", *lines)
+        await Order.invalidate_lists(order)
+        order["_id"] = str(result.inserted_id)
+        await Order.publish_change(order, "booking:created", {
+            "booking_id": order["_id"],
+            "booking": {field: order.get(field) for field in ["_id", *BOOKING_LIST_PROJECTION]},
+        })
+        return serialize_for_json(order)
+
+    @staticmethod
+    async def quote(items) -> dict:
+        """
+        Price a cart of {"product_id", "qty"} lines without reserving anything.
+
+        Prices come from ProductModel.get_prices (cached, misses read with one
+        $in) and are totalled with price_lines, exactly as _create_order would
+        charge them. Unknown products are listed under "missing" instead of
+        failing the whole quote.
+        """
+        lines = _order_lines(items)
+        prices = await ProductModel.get_prices(list(lines))
+        quoted = [product_id for product_id in lines if product_id in prices]
+        unit_prices = [float(prices[product_id]["price_per_unit"]) for product_id in quoted]
+        line_totals, total_price = price_lines(unit_prices, [lines[product_id] for product_id in quoted])
+        return {
+            "items": [
+                {
+                    "product_id": product_id,
+                    "name": prices[product_id].get("name"),
+                    "unit": prices[product_id].get("unit"),
+                    "supplier_id": prices[product_id].get("supplier_id"),
+                    "qty": lines[product_id],
+                    "price_per_unit": price,
+                    "total_price": line_total,
+                }
+                for product_id, price, line_total in zip(quoted, unit_prices, line_totals)
+            ],
+            "total_price": total_price,
+            "missing": [product_id for product_id in lines if product_id not in prices],
+        }
+
+    @staticmethod
+    def export_bookings(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
+        """Batched cursor over bookings for streaming export, optionally scoped to a vendor or supplier"""
+        query = {}
+        if vendor_id:
+            query["vendor_id"] = vendor_id
+        if supplier_id:
+            query["supplier_id"] = supplier_id
+        return export_cursor(get_collection("orders"), query, BOOKING_EXPORT_FIELDS)
+
+    @staticmethod
+    async def list_bookings(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
         """List all bookings, optionally filter by vendor or supplier"""
         try:
             query = {}
@@ -91,7 +381,7 @@ class Order:
                 query["vendor_id"] = vendor_id
             if supplier_id:
                 query["supplier_id"] = supplier_id
-            bookings = list(db["orders"].find(query))
+            bookings = await get_collection("orders").find(query).to_list(length=None)
             for booking in bookings:
                 booking["_id"] = str(booking["_id"])
             return bookings
@@ -100,72 +390,228 @@ class Order:
 
     # get all booking by vendor
     @staticmethod
-    def get_bookings_by_vendor(vendor_id: str):
-        """Get all bookings for a particular vendor"""
+    async def get_bookings_by_vendor(vendor_id: str, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """Get one page of bookings for a particular vendor"""
         try:
-            bookings = list(db["orders"].find({"vendor_id": vendor_id}))
-            for booking in bookings:
-                booking["_id"] = str(booking["_id"])
-                if "order_date" in booking and isinstance(booking["order_date"], datetime):
-                    booking["order_date"] = booking["order_date"].isoformat()
-            return serialize_for_json(bookings)
+            limit = clamp_limit(limit)
+
+            async def load_page():
+                # Raw documents: ObjectId/datetime are encoded by the cache codec and FastJSONResponse
+                return await paginate(get_collection("orders"), {"vendor_id": vendor_id}, cursor, limit, BOOKING_LIST_PROJECTION)
+
+            return await ListCache.page(f"bookings:vendor:{vendor_id}", cursor, limit, load_page)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch bookings: {str(e)}")
         
 
     # get all booking by supplier 
     @staticmethod
-    def get_bookings_by_supplier(supplier_id: str):
-        """Get all bookings for a particular supplier"""
+    async def get_bookings_by_supplier(supplier_id: str, cursor: Optional[str] = None, limit: Optional[int] = None):
+        """Get one page of bookings for a particular supplier"""
         try:
-            bookings = list(db["orders"].find({"supplier_id": supplier_id}))
-            for booking in bookings:
-                booking["_id"] = str(booking["_id"])
-                if "order_date" in booking and isinstance(booking["order_date"], datetime):
-                    booking["order_date"] = booking["order_date"].isoformat()
-            return serialize_for_json(bookings)
+            limit = clamp_limit(limit)
+
+            async def load_page():
+                return await paginate(get_collection("orders"), {"supplier_id": supplier_id}, cursor, limit, BOOKING_LIST_PROJECTION)
+
+            # Dashboards poll this; concurrent polls for the same supplier share one load
+            return await SingleFlight.do(
+                f"bookings:supplier:{supplier_id}:{cursor or 'first'}:{limit}",
+                lambda: ListCache.page(f"bookings:supplier:{supplier_id}", cursor, limit, load_page)
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch bookings: {str(e)}")    
 
 
     @staticmethod
-    def update_booking_status(booking_id: str, status: str):
-        """Update booking status"""
+    async def update_booking_status(booking_id: str, status: str, supplier_id: Optional[str] = None):
+        """
+        Move a booking to `status` in one round-trip.
+
+        The find_one_and_update filter carries the whole check: the booking
+        _id, its supplier (when given) and the states BOOKING_TRANSITIONS
+        allows to reach `status`. The same update appends
+        {"from", "to", "at", "by"} to status_history and returns the new
+        document. Only a failed update costs a second read, to report 404,
+        403 or 409. Only one concurrent cancel can match, so cancelling
+        releases the stock exactly once.
+        """
         try:
-            valid_statuses = ["pending", "confirmed", "delivered", "cancelled"]
-            if status not in valid_statuses:
-                raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
-            result = db["orders"].update_one(
-                {"_id": ObjectId(booking_id)},
-                {"$set": {"status": status}}
+            if status not in BOOKING_TRANSITIONS:
+                raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {list(BOOKING_TRANSITIONS)}")
+            if not ObjectId.is_valid(booking_id):
+                raise HTTPException(status_code=400, detail="Invalid booking_id")
+
+            now = datetime.utcnow()
+            booking = await get_collection("orders").find_one_and_update(
+                _transition_filter(ObjectId(booking_id), status, supplier_id),
+                _transition_update(status, supplier_id, now),
+                return_document=ReturnDocument.AFTER
             )
-            if result.matched_count == 0:
-                raise HTTPException(status_code=404, detail="Booking not found")
-            return serialize_for_json(Order.get_booking_by_id(booking_id))
+            if booking is None:
+                existing = await get_collection("orders").find_one({"_id": ObjectId(booking_id)}, {"status": 1, "supplier_id": 1})
+                if existing is None:
+                    raise HTTPException(status_code=404, detail="Booking not found")
+                if supplier_id and existing.get("supplier_id") != supplier_id:
+                    raise HTTPException(status_code=403, detail="Access denied: can only update your own bookings")
+                raise HTTPException(status_code=409, detail=f"Cannot change booking status from {existing.get('status')} to {status}")
+
+            if status == "cancelled":
+                await ProductModel.release_stock_many(stock_lines(booking))
+            await Order.invalidate_lists(booking)
+            await Order.publish_change(booking, "booking:status", {
+                "booking_id": booking_id,
+                "status": status,
+                "previous_status": booking["status_history"][-1]["from"],
+                "at": now,
+            })
+            return serialize_for_json(booking)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update booking: {str(e)}")
 
     @staticmethod
-    def update_booking(booking_id: str, update_data: dict):
-        """Update booking details (not just status)"""
+    async def bulk_update_status(updates: List[dict], supplier_id: str) -> List[dict]:
+        """
+        Apply many {"booking_id", "status"} changes for one supplier.
+
+        Every valid item becomes one UpdateOne with the same guarded filter and
+        history update as update_booking_status, all sent in one unordered
+        bulk_write. The history entries carry a batch id. bulk_write only
+        returns counts, so one $in read of the touched bookings (projecting the
+        entry with that batch id) then tells, per item, whether this batch
+        applied it, and otherwise why not (404, 403 or 409). Stock of cancelled bookings goes back in one more
+        bulk_write. Returns one result per input item, in order.
+        """
+        try:
+            if len(updates) > ORDER_BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"At most {ORDER_BULK_MAX_ITEMS} updates per request")
+
+            results: List[Optional[dict]] = [None] * len(updates)
+            pending = {}  # booking ObjectId -> (index, status)
+            for index, item in enumerate(updates):
+                booking_id = str(item.get("booking_id")) if isinstance(item, dict) else ""
+                status = item.get("status") if isinstance(item, dict) else None
+                if status not in BOOKING_TRANSITIONS:
+                    results[index] = {"booking_id": booking_id, "ok": False, "code": 400, "detail": "Invalid status"}
+                elif not ObjectId.is_valid(booking_id):
+                    results[index] = {"booking_id": booking_id, "ok": False, "code": 400, "detail": "Invalid booking_id"}
+                elif ObjectId(booking_id) in pending:
+                    results[index] = {"booking_id": booking_id, "ok": False, "code": 400, "detail": "Duplicate booking_id"}
+                else:
+                    pending[ObjectId(booking_id)] = (index, status)
+
+            if pending:
+                now = datetime.utcnow()
+                batch = str(ObjectId())
+                await get_collection("orders").bulk_write(
+                    [
+                        UpdateOne(_transition_filter(oid, status, supplier_id), _transition_update(status, supplier_id, now, batch))
+                        for oid, (_, status) in pending.items()
+                    ],
+                    ordered=False
+                )
+                documents = await get_collection("orders").find(
+                    {"_id": {"$in": list(pending)}},
+                    # Only this batch's history entry, if it applied (even if a later change followed)
+                    {"vendor_id": 1, "supplier_id": 1, "status": 1, "product_id": 1, "qty": 1, "items": 1,
+                     "status_history": {"$elemMatch": {"batch": batch}}}
+                ).to_list(length=len(pending))
+                found = {doc["_id"]: doc for doc in documents}
+
+                released: dict = {}
+                changed = []
+                for oid, (index, status) in pending.items():
+                    doc = found.get(oid)
+                    applied = (doc or {}).get("status_history") or []
+                    if doc is None:
+                        results[index] = {"booking_id": str(oid), "ok": False, "code": 404, "detail": "Booking not found"}
+                    elif doc.get("supplier_id") != supplier_id:
+                        results[index] = {"booking_id": str(oid), "ok": False, "code": 403, "detail": "Access denied: can only update your own bookings"}
+                    elif not applied:
+                        results[index] = {
+                            "booking_id": str(oid), "ok": False, "code": 409,
+                            "detail": f"Cannot change booking status from {doc.get('status')} to {status}",
+                        }
+                    else:
+                        previous = applied[0].get("from")
+                        results[index] = {"booking_id": str(oid), "ok": True, "code": 200, "status": status, "previous_status": previous}
+                        changed.append((doc, status, previous))
+                        if status == "cancelled":
+                            for product_id, qty in stock_lines(doc).items():
+                                released[product_id] = released.get(product_id, 0) + qty
+
+                if changed:
+                    await ProductModel.release_stock_many(released)
+                    await ListCache.invalidate(
+                        f"bookings:supplier:{supplier_id}",
+                        *{f"bookings:vendor:{doc['vendor_id']}" for doc, _, _ in changed if doc.get("vendor_id")}
+                    )
+                    await UserEvents.publish_many([
+                        (
+                            "booking:status",
+                            {"booking_id": str(doc["_id"]), "status": status, "previous_status": previous, "at": now},
+                            (doc.get("vendor_id"), doc.get("supplier_id")),
+                        )
+                        for doc, status, previous in changed
+                    ])
+            return results
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to update bookings: {str(e)}")
+
+    @staticmethod
+    async def update_booking(booking_id: str, update_data: dict):
+        """Update booking details other than the status (see update_booking_status)"""
         try:
-            result = db["orders"].update_one(
+            if "status" in update_data or "status_history" in update_data:
+                raise HTTPException(status_code=400, detail="Use update_booking_status to change the status")
+            booking = await get_collection("orders").find_one_and_update(
                 {"_id": ObjectId(booking_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                projection={"vendor_id": 1, "supplier_id": 1},
+                return_document=ReturnDocument.AFTER
             )
-            if result.matched_count == 0:
+            if booking is None:
                 raise HTTPException(status_code=404, detail="Booking not found")
-            return Order.get_booking_by_id(booking_id)
+            await Order.invalidate_lists(booking)
+            await Order.publish_change(booking, "booking:updated", {"booking_id": booking_id, "changes": update_data})
+            return await Order.get_booking_by_id(booking_id)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update booking: {str(e)}")
 
     @staticmethod
-    def delete_booking(booking_id: str):
+    async def delete_booking(booking_id: str):
         """Cancel/Delete booking"""
         try:
-            result = db["orders"].delete_one({"_id": ObjectId(booking_id)})
-            if result.deleted_count == 0:
+            booking = await get_collection("orders").find_one_and_delete(
+                {"_id": ObjectId(booking_id)},
+                projection={"vendor_id": 1, "supplier_id": 1, "status": 1, "product_id": 1, "qty": 1, "items": 1}
+            )
+            if booking is None:
                 raise HTTPException(status_code=404, detail="Booking not found")
+            # Cancelled stock was already given back and delivered stock has shipped
+            if holds_stock(booking.get("status")):
+                await ProductModel.release_stock_many(stock_lines(booking))
+            await Order.invalidate_lists(booking)
+            await Order.publish_change(booking, "booking:deleted", {"booking_id": booking_id})
             return {"message": "Booking deleted"}
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to delete booking: {str(e)}")
+
+# My-bookings and supplier dashboards filter on one party and read in _id order
+register_indexes(
+    "orders",
+    IndexModel([("vendor_id", ASCENDING), ("_id", ASCENDING)], name="vendor_id_id"),
+    IndexModel([("supplier_id", ASCENDING), ("_id", ASCENDING)], name="supplier_id_id"),
+)
@@ -2,7 +2,8 @@ from pydantic import BaseModel
 from typing import Optional, Literal
 from fastapi import HTTPException
 from bson import ObjectId
-from api.db import db
+from api.db import get_collection
+from api.extensions.helper.pagination import paginate
 
 class PaymentModel(BaseModel):
     amount: float
@@ -12,31 +13,33 @@ class PaymentModel(BaseModel):
 
 class Payment:
     @staticmethod
-    def create_payment(data: dict):
+    async def create_payment(data: dict):
         """Create a payment record"""
         try:
-            result = db["payments"].insert_one(data)
+            result = await get_collection("payments").insert_one(data)
             data["_id"] = str(result.inserted_id)
             return data
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to create payment: {str(e)}")
 
     @staticmethod
-    def get_all_payments():
-        """Get all payments"""
+    async def get_all_payments(cursor: Optional[str] = None, limit: Optional[int] = None):
+        """Get one page of payments"""
         try:
-            payments = list(db["payments"].find({}))
-            for p in payments:
+            page = await paginate(get_collection("payments"), {}, cursor, limit)
+            for p in page["items"]:
                 p["_id"] = str(p["_id"])
-            return payments
+            return page
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch payments: {str(e)}")
 
     @staticmethod
-    def get_payment_by_id(payment_id: str):
+    async def get_payment_by_id(payment_id: str):
         """Get specific payment by ID"""
         try:
-            payment = db["payments"].find_one({"_id": ObjectId(payment_id)})
+            payment = await get_collection("payments").find_one({"_id": ObjectId(payment_id)})
             if not payment:
                 raise HTTPException(status_code=404, detail="Payment not found")
             payment["_id"] = str(payment["_id"])
@@ -45,24 +48,24 @@ class Payment:
             raise HTTPException(status_code=500, detail=f"Failed to fetch payment: {str(e)}")
 
     @staticmethod
-    def update_payment(payment_id: str, update_data: dict):
+    async def update_payment(payment_id: str, update_data: dict):
         """Update payment details"""
         try:
-            result = db["payments"].update_one(
+            result = await get_collection("payments").update_one(
                 {"_id": ObjectId(payment_id)},
                 {"$set": update_data}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Payment not found")
-            return Payment.get_payment_by_id(payment_id)
+            return await Payment.get_payment_by_id(payment_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update payment: {str(e)}")
 
     @staticmethod
-    def delete_payment(payment_id: str):
+    async def delete_payment(payment_id: str):
         """Delete payment record"""
         try:
-            result = db["payments"].delete_one({"_id": ObjectId(payment_id)})
+            result = await get_collection("payments").delete_one({"_id": ObjectId(payment_id)})
             if result.deleted_count == 0:
                 raise HTTPException(status_code=404, detail="Payment not found")
             return {"message": "Payment deleted"}
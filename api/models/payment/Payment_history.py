@@ -5,7 +5,16 @@ from api.models.payment.Transaction import TransactionModel
 from api.models.payment.Payment import PaymentModel
 from fastapi import HTTPException
 from bson import ObjectId
-from api.db import db
+from api.db import get_collection
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
+from api.extensions.helper.export import export_cursor
+
+# Columns of /payment/export, in CSV order; transaction and payment lists are JSON-encoded in CSV
+PAYMENT_HISTORY_EXPORT_FIELDS = [
+    "_id", "order_id", "vendor_id", "supplier_id",
+    "payment_status", "payment_method", "payment_date", "transaction", "payment",
+]
 
 class PaymentHistoryModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -22,7 +31,7 @@ class PaymentHistoryModel(BaseModel):
 
 class PaymentHistory:
     @staticmethod
-    def get_all_order_histories(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
+    async def get_all_order_histories(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
         """Get all order histories, optionally filter by vendor or supplier"""
         try:
             query = {}
@@ -30,7 +39,7 @@ class PaymentHistory:
                 query["vendor_id"] = vendor_id
             if supplier_id:
                 query["supplier_id"] = supplier_id
-            histories = list(db["payment_history"].find(query))
+            histories = await get_collection("payment_history").find(query).to_list(length=None)
             for history in histories:
                 history["_id"] = str(history["_id"])
             return histories
@@ -38,10 +47,10 @@ class PaymentHistory:
             raise HTTPException(status_code=500, detail=f"Failed to fetch order histories: {str(e)}")
 
     @staticmethod
-    def get_order_history_by_id(booking_id: str):
+    async def get_order_history_by_id(booking_id: str):
         """Get one order record by booking/order ID"""
         try:
-            history = db["payment_history"].find_one({"order_id": booking_id})
+            history = await get_collection("payment_history").find_one({"order_id": booking_id})
             if not history:
                 raise HTTPException(status_code=404, detail="Order history not found")
             history["_id"] = str(history["_id"])
@@ -50,10 +59,20 @@ class PaymentHistory:
             raise HTTPException(status_code=500, detail=f"Failed to fetch order history: {str(e)}")
 
     @staticmethod
-    def get_all_payment_histories():
+    def export_payment_histories(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
+        """Batched cursor over payment histories for streaming export, optionally scoped to a vendor or supplier"""
+        query = {}
+        if vendor_id:
+            query["vendor_id"] = vendor_id
+        if supplier_id:
+            query["supplier_id"] = supplier_id
+        return export_cursor(get_collection("payment_history"), query, PAYMENT_HISTORY_EXPORT_FIELDS)
+
+    @staticmethod
+    async def get_all_payment_histories():
         """Get all payment histories"""
         try:
-            histories = list(db["payment_history"].find({}))
+            histories = await get_collection("payment_history").find({}).to_list(length=None)
             for history in histories:
                 history["_id"] = str(history["_id"])
             return histories
@@ -61,10 +80,10 @@ class PaymentHistory:
             raise HTTPException(status_code=500, detail=f"Failed to fetch payment histories: {str(e)}")
 
     @staticmethod
-    def get_payment_history_by_id(payment_id: str):
+    async def get_payment_history_by_id(payment_id: str):
         """Get one payment history by payment ID (_id)"""
         try:
-            history = db["payment_history"].find_one({"_id": ObjectId(payment_id)})
+            history = await get_collection("payment_history").find_one({"_id": ObjectId(payment_id)})
             if not history:
                 raise HTTPException(status_code=404, detail="Payment history not found")
             history["_id"] = str(history["_id"])
@@ -73,29 +92,36 @@ class PaymentHistory:
             raise HTTPException(status_code=500, detail=f"Failed to fetch payment history: {str(e)}")
 
     @staticmethod
-    def update_order_history(booking_id: str, update_data: dict):
+    async def update_order_history(booking_id: str, update_data: dict):
         """Update order history details by booking/order ID"""
         try:
-            result = db["payment_history"].update_one(
+            result = await get_collection("payment_history").update_one(
                 {"order_id": booking_id},
                 {"$set": update_data}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Order history not found")
-            return PaymentHistory.get_order_history_by_id(booking_id)
+            return await PaymentHistory.get_order_history_by_id(booking_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update order history: {str(e)}")
 
     @staticmethod
-    def update_payment_history(payment_id: str, update_data: dict):
+    async def update_payment_history(payment_id: str, update_data: dict):
         """Update payment history details by payment ID (_id)"""
         try:
-            result = db["payment_history"].update_one(
+            result = await get_collection("payment_history").update_one(
                 {"_id": ObjectId(payment_id)},
                 {"$set": update_data}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Payment history not found")
-            return PaymentHistory.get_payment_history_by_id(payment_id)
+            return await PaymentHistory.get_payment_history_by_id(payment_id)
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to update payment history: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Failed to update payment history: {str(e)}")
+
+register_indexes(
+    "payment_history",
+    IndexModel([("order_id", ASCENDING)], name="order_id"),
+    IndexModel([("vendor_id", ASCENDING), ("_id", ASCENDING)], name="vendor_id_id"),
+    IndexModel([("supplier_id", ASCENDING), ("_id", ASCENDING)], name="supplier_id_id"),
+)
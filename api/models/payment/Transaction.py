@@ -1,9 +1,10 @@
 from pydantic import BaseModel
-from typing import Literal
+from typing import Literal, Optional
 from datetime import datetime
 from fastapi import HTTPException
 from bson import ObjectId
-from api.db import db
+from api.db import get_collection
+from api.extensions.helper.pagination import paginate
 
 class TransactionModel(BaseModel):
     transaction_id: str
@@ -14,21 +15,23 @@ class TransactionModel(BaseModel):
 
 class Transaction:
     @staticmethod
-    def get_all_transactions():
-        """Get all transactions"""
+    async def get_all_transactions(cursor: Optional[str] = None, limit: Optional[int] = None):
+        """Get one page of transactions"""
         try:
-            transactions = list(db["transactions"].find({}))
-            for txn in transactions:
+            page = await paginate(get_collection("transactions"), {}, cursor, limit)
+            for txn in page["items"]:
                 txn["_id"] = str(txn["_id"])
-            return transactions
+            return page
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch transactions: {str(e)}")
 
     @staticmethod
-    def get_transaction_by_id(transaction_id: str):
+    async def get_transaction_by_id(transaction_id: str):
         """Get transaction detail by ID"""
         try:
-            txn = db["transactions"].find_one({"_id": ObjectId(transaction_id)})
+            txn = await get_collection("transactions").find_one({"_id": ObjectId(transaction_id)})
             if not txn:
                 raise HTTPException(status_code=404, detail="Transaction not found")
             txn["_id"] = str(txn["_id"])
@@ -1,10 +1,44 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from fastapi import HTTPException
 from bson import ObjectId
 from api.models.Location import LocationModel
-from api.db import db
+from api.db import get_collection
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
 from api.extensions.helper.json_serializer import serialize_for_json
+from api.extensions.helper.pagination import paginate, clamp_limit
+from api.extensions.redis_cache.catalogue import CatalogueCache
+from api.extensions.redis_cache.tiered import TieredCache
+from api.extensions.helper.singleflight import SingleFlight
+from api.extensions.helper.export import export_cursor
+from pymongo import ReturnDocument, UpdateOne
+import os
+
+# Single-product lookups; writes invalidate the entry in every worker
+PRODUCT_CACHE_TTL = int(os.getenv("PRODUCT_CACHE_TTL", "300"))
+TieredCache.register_namespace("products", ttl=PRODUCT_CACHE_TTL, local_ttl=30, max_entries=4096)
+# Prices read by cart quotes; short-lived, and dropped in every worker when a product changes
+PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "60"))
+TieredCache.register_namespace("prices", ttl=PRICE_CACHE_TTL, local_ttl=10, max_entries=16384)
+
+# Fields kept in the price cache
+PRICE_PROJECTION = {"name": 1, "unit": 1, "price_per_unit": 1, "supplier_id": 1}
+
+# Fields returned by catalogue listings
+PRODUCT_LIST_PROJECTION = {
+    "name": 1,
+    "category": 1,
+    "price_per_unit": 1,
+    "unit": 1,
+    "available_quantity": 1,
+    "image_url": 1,
+    "location": 1,
+    "supplier_id": 1,
+}
+
+# Columns of /product/export, in CSV order
+PRODUCT_EXPORT_FIELDS = ["_id", *PRODUCT_LIST_PROJECTION]
 
 class ProductModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -25,9 +59,7 @@ class ProductModel(BaseModel):
         @staticmethod
         def get_collection():
             try:
-                if db is None:
-                    raise HTTPException(status_code=500, detail="Database connection not initialized")
-                return db["products"]
+                return get_collection("products")
             except HTTPException as http_exc:
                 raise http_exc
             except Exception as e:
@@ -46,7 +78,7 @@ class ProductModel(BaseModel):
     #     self._id = _id
         
     @staticmethod
-    def create_product(
+    async def create_product(
         name: str,
         category: str,
         price_per_unit: float,
@@ -112,7 +144,7 @@ class ProductModel(BaseModel):
             # Save to DB
             print(f"DEBUG: Saving to database")
             try:
-                result = db["products"].insert_one(product_dict)
+                result = await get_collection("products").insert_one(product_dict)
                 print(f"DEBUG: Database insert successful, inserted_id: {result.inserted_id}")
             except Exception as db_error:
                 print(f"DEBUG: Database insert error: {db_error}")
@@ -121,12 +153,14 @@ class ProductModel(BaseModel):
             # Get the created product from database with the actual _id
             print(f"DEBUG: Retrieving created product from database")
             try:
-                created_product = db["products"].find_one({"_id": result.inserted_id})
+                created_product = await get_collection("products").find_one({"_id": result.inserted_id})
                 print(f"DEBUG: Retrieved product: {created_product}")
             except Exception as retrieve_error:
                 print(f"DEBUG: Error retrieving created product: {retrieve_error}")
                 raise HTTPException(status_code=500, detail=f"Error retrieving created product: {str(retrieve_error)}")
             
+            await CatalogueCache.invalidate(supplier_id)
+
             # Serialize for JSON response
             print(f"DEBUG: Serializing product for JSON")
             try:
@@ -148,7 +182,7 @@ class ProductModel(BaseModel):
 
 # update product
     @staticmethod
-    def update_product(
+    async def update_product(
         product_id: str,
         name: Optional[str] = None,
         category: Optional[str] = None,
@@ -166,96 +200,188 @@ class ProductModel(BaseModel):
             if not update_data:
                 raise HTTPException(status_code=400, detail="No valid fields to update")
             
-            result = db["products"].update_one(
+            previous_product = await get_collection("products").find_one_and_update(
                 {"_id": ObjectId(product_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE
             )
             
-            if result.matched_count == 0:
+            if previous_product is None:
                 raise HTTPException(status_code=404, detail="Product not found")
+
+            await CatalogueCache.invalidate(previous_product.get("supplier_id"), supplier_id)
+            await TieredCache.invalidate("products", product_id)
+            await TieredCache.invalidate("prices", product_id)
             
             # Return updated product
-            updated_product = db["products"].find_one({"_id": ObjectId(product_id)})
+            updated_product = await get_collection("products").find_one({"_id": ObjectId(product_id)})
             return serialize_for_json(updated_product)
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update product: {str(e)}")
         
+    @staticmethod
+    def export_products(supplier_id: Optional[str] = None):
+        """Batched cursor over products for streaming export, optionally scoped to a supplier"""
+        query = {"supplier_id": supplier_id} if supplier_id else {}
+        return export_cursor(get_collection("products"), query, PRODUCT_EXPORT_FIELDS)
+
 # get the all product 
 
     @staticmethod
-    def get_all_products():
-        """Get all products"""
+    async def get_all_products(cursor: Optional[str] = None, limit: Optional[int] = None):
+        """Get one page of products, returns {"items": [...], "next_cursor": str | None}"""
         try:
-            products = list(db["products"].find({}))
-            # Serialize all products for JSON
-            serialized_products = []
-            for product in products:
-                serialized_product = serialize_for_json(product)
-                serialized_products.append(serialized_product)
-            return serialized_products
+            limit = clamp_limit(limit)
+
+            async def load_page():
+                # Raw documents: ObjectId/datetime are encoded by the cache codec and FastJSONResponse
+                return await paginate(get_collection("products"), {}, cursor, limit, PRODUCT_LIST_PROJECTION)
+
+            # The catalogue is the same for every caller, so identical page requests share one load
+            return await SingleFlight.do(
+                f"products:page:{cursor or 'first'}:{limit}",
+                lambda: CatalogueCache.products_page(cursor, limit, load_page)
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
 
     @staticmethod
-    def get_my_products(supplier_id: str):
+    async def get_my_products(supplier_id: str):
         """Get all products for the current supplier"""
         try:
-            products = list(db["products"].find({"supplier_id": supplier_id}))
+            products = await get_collection("products").find({"supplier_id": supplier_id}).to_list(length=None)
             print(f"DEBUG: Found {len(products)} products")
-            
-            # Serialize all products for JSON
-            serialized_products = []
-            for product in products:
-                serialized_product = serialize_for_json(product)
-                serialized_products.append(serialized_product)
-            
-            return serialized_products
+            return products
         except Exception as e:
             print(f"DEBUG: Error getting products: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to fetch products: {str(e)}")
 
 # Keep the existing get_products_by_supplier method for backward compatibility
     @staticmethod
-    def get_products_by_supplier(supplier_id: str):
+    async def get_products_by_supplier(supplier_id: str):
         """Get all products for a particular supplier"""
         try:
-            products = list(db["products"].find({"supplier_id": supplier_id}))
-            # Serialize all products for JSON
-            serialized_products = []
-            for product in products:
-                serialized_product = serialize_for_json(product)
-                serialized_products.append(serialized_product)
-            return serialized_products
+            async def load_products():
+                return await get_collection("products").find({"supplier_id": supplier_id}).to_list(length=None)
+
+            return await CatalogueCache.supplier_products(supplier_id, load_products)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch products for supplier: {str(e)}")
             
     # delete product
     @staticmethod
-    def delete_product(product_id: str):
+    async def delete_product(product_id: str):
             """Delete a product"""
             try:
-                result = db["products"].delete_one({"_id": ObjectId(product_id)})
-                if result.deleted_count == 0:
+                deleted_product = await get_collection("products").find_one_and_delete({"_id": ObjectId(product_id)})
+                if deleted_product is None:
                     raise HTTPException(status_code=404, detail="Product not found")
+                await CatalogueCache.invalidate(deleted_product.get("supplier_id"))
+                await TieredCache.invalidate("products", product_id)
+                await TieredCache.invalidate("prices", product_id)
                 return {"message": "Product deleted successfully"}
             except HTTPException:
                 raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to delete product: {str(e)}")
             
+    # reserve stock for a booking
+    @staticmethod
+    async def reserve_stock(product_id: str, qty: float, projection: Optional[dict] = None):
+        """
+        Take qty units in one conditional update; the filter only matches while
+        available_quantity >= qty, so concurrent reservations can never oversell.
+        Returns the product after the decrement (with `projection` fields).
+        """
+        try:
+            product = await get_collection("products").find_one_and_update(
+                {"_id": ObjectId(product_id), "available_quantity": {"$gte": qty}},
+                {"$inc": {"available_quantity": -qty}},
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            if product is None:
+                # Failure path only: tell a missing product from a sold-out one
+                exists = await get_collection("products").find_one({"_id": ObjectId(product_id)}, {"_id": 1})
+                if exists is None:
+                    raise HTTPException(status_code=404, detail="Product not found")
+                raise HTTPException(status_code=409, detail="Insufficient stock")
+            # Catalogue pages keep their TTL; only the single-product entry shows live stock
+            await TieredCache.invalidate("products", product_id)
+            return product
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to reserve stock: {str(e)}")
+
+    # give reserved stock back (cancelled booking or failed insert)
+    @staticmethod
+    async def release_stock(product_id: str, qty: float):
+        """Return qty units with a single $inc"""
+        try:
+            await get_collection("products").update_one(
+                {"_id": ObjectId(product_id)},
+                {"$inc": {"available_quantity": qty}}
+            )
+            await TieredCache.invalidate("products", product_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to release stock: {str(e)}")
+
+    # give back stock of many bookings at once
+    @staticmethod
+    async def release_stock_many(quantities: dict):
+        """release_stock for {product_id: qty}, as one bulk_write"""
+        if not quantities:
+            return
+        try:
+            await get_collection("products").bulk_write(
+                [UpdateOne({"_id": ObjectId(product_id)}, {"$inc": {"available_quantity": qty}}) for product_id, qty in quantities.items()],
+                ordered=False
+            )
+            await TieredCache.invalidate("products", *quantities)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to release stock: {str(e)}")
+
+    # prices of many products at once (cart quotes)
+    @staticmethod
+    async def get_prices(product_ids: List[str]) -> Dict[str, dict]:
+        """{product_id: {name, unit, price_per_unit, supplier_id}} for the products that exist; misses are read with one $in"""
+        try:
+            async def load_prices(missing: List[str]) -> Dict[str, dict]:
+                products = await get_collection("products").find(
+                    {"_id": {"$in": [ObjectId(product_id) for product_id in missing]}}, PRICE_PROJECTION
+                ).to_list(length=len(missing))
+                return {str(product.pop("_id")): product for product in products}
+
+            return await TieredCache.get_many("prices", product_ids, load_prices)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to fetch prices: {str(e)}")
+
     # get product by id
     @staticmethod
-    def get_product_by_id(product_id: str):
+    async def get_product_by_id(product_id: str):
             """Get a product by ID"""
             try:
-                product = db["products"].find_one({"_id": ObjectId(product_id)})
+                async def load_product():
+                    product = await get_collection("products").find_one({"_id": ObjectId(product_id)})
+                    return serialize_for_json(product) if product else None
+
+                product = await TieredCache.get("products", product_id, load_product)
                 if not product:
                     raise HTTPException(status_code=404, detail="Product not found")
-                return serialize_for_json(product)
+                return dict(product)
             except HTTPException:
                 raise
             except Exception as e:
                 raise HTTPException(status_code=500, detail=f"Failed to fetch product: {str(e)}")
 
+register_indexes(
+    "products",
+    IndexModel([("supplier_id", ASCENDING), ("_id", ASCENDING)], name="supplier_id_id"),
+)
@@ -3,8 +3,22 @@ from typing import Optional
 from datetime import datetime
 from fastapi import HTTPException
 from bson import ObjectId
-from api.db import db  # Assuming you have a database module to handle MongoDB connections
+from api.db import get_collection  # Assuming you have a database module to handle MongoDB connections
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
 from api.extensions.helper.json_serializer import serialize_for_json
+from api.extensions.helper.pagination import paginate, clamp_limit
+from api.extensions.redis_cache.lists import ListCache
+from api.extensions.helper.singleflight import SingleFlight
+
+# Fields returned by review listings
+REVIEW_LIST_PROJECTION = {
+    "vendor_id": 1,
+    "supplier_id": 1,
+    "rating": 1,
+    "comment": 1,
+    "created_at": 1,
+}
 
 class ReviewModel(BaseModel):
     id: Optional[str] = Field(default=None, alias="_id")
@@ -32,7 +46,7 @@ class ReviewModel(BaseModel):
 
  # give the review on products by suppliers
     @staticmethod
-    def give_review(
+    async def give_review(
     vendor_id: str,
     supplier_id: str,
     rating: int,
@@ -51,7 +65,9 @@ class ReviewModel(BaseModel):
             review_dict = review.model_dump(by_alias=True)
             if review_dict.get("_id") is None:
                 review_dict.pop("_id")
-            db["reviews"].insert_one(review_dict)
+            await get_collection("reviews").insert_one(review_dict)
+            # Reviews are written rarely, so every review list shares one version
+            await ListCache.invalidate("reviews")
             if "_id" in review_dict:
                 review_dict["_id"] = str(review_dict["_id"])
             if "created_at" in review_dict and isinstance(review_dict["created_at"], datetime):
@@ -65,22 +81,33 @@ class ReviewModel(BaseModel):
         
     # list reviews by vendor_id and supplier_id
     @staticmethod
-    def list_reviews(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None):
-        """List all reviews, optionally filter by vendor or supplier"""
+    async def list_reviews(vendor_id: Optional[str] = None, supplier_id: Optional[str] = None,
+                           cursor: Optional[str] = None, limit: Optional[int] = None):
+        """List one page of reviews, optionally filter by vendor or supplier"""
         try:
             query = {}
             if vendor_id:
                 query["vendor_id"] = vendor_id
             if supplier_id:
                 query["supplier_id"] = supplier_id
-            
-            reviews = list(db["reviews"].find(query))
-            # Serialize all reviews for JSON
-            serialized_reviews = []
-            for review in reviews:
-                serialized_review = serialize_for_json(review)
-                serialized_reviews.append(serialized_review)
-            return serialized_reviews
+            limit = clamp_limit(limit)
+
+            async def load_page():
+                # Raw documents: ObjectId/datetime are encoded by the cache codec and FastJSONResponse
+                return await paginate(get_collection("reviews"), query, cursor, limit, REVIEW_LIST_PROJECTION)
+
+            variant = f"{vendor_id or '*'}:{supplier_id or '*'}"
+            return await SingleFlight.do(
+                f"reviews:{variant}:{cursor or 'first'}:{limit}",
+                lambda: ListCache.page("reviews", cursor, limit, load_page, variant=variant)
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch reviews: {str(e)}")
-        
\ No newline at end of file
+
+register_indexes(
+    "reviews",
+    IndexModel([("vendor_id", ASCENDING), ("_id", ASCENDING)], name="vendor_id_id"),
+    IndexModel([("supplier_id", ASCENDING), ("_id", ASCENDING)], name="supplier_id_id"),
+)
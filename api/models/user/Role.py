@@ -1,9 +1,17 @@
 from pydantic import BaseModel
 from datetime import datetime, timezone
 from bson import ObjectId
-from api.db import db
+from api.db import get_collection
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
+from api.extensions.redis_cache.tiered import TieredCache
 from fastapi import HTTPException
 from typing import Optional, List, Dict, Any
+import os
+
+# Roles change only through admin actions, which clear the whole namespace
+ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", "3600"))
+TieredCache.register_namespace("roles", ttl=ROLE_CACHE_TTL, local_ttl=300, max_entries=64)
 
 # Role base model for validation
 class RoleBaseModel(BaseModel):
@@ -24,9 +32,7 @@ class Role:
     @staticmethod
     def get_collection() -> Any:
         try:
-            if db is None:
-                raise HTTPException(status_code=500, detail="Database connection not initialized")
-            return db["roles"]
+            return get_collection("roles")
         except HTTPException as http_exc:
             raise http_exc
         except Exception as e:
@@ -40,7 +46,7 @@ class Role:
         self.created_at = created_at or datetime.now(timezone.utc)
         self.updated_at = updated_at or datetime.now(timezone.utc)
 
-    def save(self) -> Dict[str, str]:
+    async def save(self) -> Dict[str, str]:
         try:
             collection = Role.get_collection()
             if collection is None:
@@ -56,11 +62,12 @@ class Role:
             
             if hasattr(self, '_id'):
                 role_data['_id'] = self._id
-                collection.update_one({"_id": self._id}, {"$set": role_data})
+                await collection.update_one({"_id": self._id}, {"$set": role_data})
             else:
-                result = collection.insert_one(role_data)
+                result = await collection.insert_one(role_data)
                 self._id = result.inserted_id
-            
+
+            await TieredCache.invalidate_namespace("roles")
             return {"role_id": str(self._id)}
         except HTTPException as http_exc:
             raise http_exc
@@ -68,13 +75,13 @@ class Role:
             raise HTTPException(status_code=500, detail=f"Failed to save role: {str(e)}")
 
     @staticmethod
-    def create_default_roles() -> bool:
+    async def create_default_roles() -> bool:
         try:
             collection = Role.get_collection()
             if collection is None:
                 print("Database Connection Error")
                 return False
-            existing_docs_count = collection.count_documents({})
+            existing_docs_count = await collection.count_documents({})
             if existing_docs_count > 0:
                 print("Roles collection is not empty. Skipping default roles creation.")
                 return True
@@ -99,14 +106,14 @@ class Role:
 
             created_roles = []
             for role_data in default_roles:
-                existing_role = collection.find_one({"name": role_data["name"]})
+                existing_role = await collection.find_one({"name": role_data["name"]})
                 if existing_role is None:
                     role = Role(
                         name=role_data["name"],
                         priority=role_data["priority"],
                         permissions=role_data["permissions"]
                     )
-                    role.save()
+                    await role.save()
                     created_roles.append(role_data["name"])
 
             return True
@@ -117,18 +124,22 @@ class Role:
             return False
 
     @staticmethod
-    def get_role_by_name(name: str) -> Optional[Dict[str, Any]]:
+    async def _find_role(query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        collection = Role.get_collection()
+        if collection is None:
+            return None
+        role = await collection.find_one(query)
+        if role:
+            if "created_at" in role:
+                role["created_at"] = role["created_at"].isoformat()
+            if "updated_at" in role:
+                role["updated_at"] = role["updated_at"].isoformat()
+        return role
+
+    @staticmethod
+    async def get_role_by_name(name: str) -> Optional[Dict[str, Any]]:
         try:
-            collection = Role.get_collection()
-            if collection is None:
-                return None
-            role = collection.find_one({"name": name})
-            if role:
-                if "created_at" in role:
-                    role["created_at"] = role["created_at"].isoformat()
-                if "updated_at" in role:
-                    role["updated_at"] = role["updated_at"].isoformat()
-            return role
+            return await TieredCache.get("roles", f"name:{name}", lambda: Role._find_role({"name": name}))
         except HTTPException as http_exc:
             raise http_exc
         except Exception as e:
@@ -136,18 +147,9 @@ class Role:
             return None
 
     @staticmethod
-    def get_by_id(role_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_id(role_id: str) -> Optional[Dict[str, Any]]:
         try:
-            collection = Role.get_collection()
-            if collection is None:
-                return None
-            role = collection.find_one({"_id": ObjectId(role_id)})
-            if role:
-                if "created_at" in role:
-                    role["created_at"] = role["created_at"].isoformat()
-                if "updated_at" in role:
-                    role["updated_at"] = role["updated_at"].isoformat()
-            return role
+            return await TieredCache.get("roles", f"id:{role_id}", lambda: Role._find_role({"_id": ObjectId(role_id)}))
         except HTTPException as http_exc:
             raise http_exc
         except Exception as e:
@@ -155,13 +157,13 @@ class Role:
             return None
     
     @staticmethod 
-    def get_all_roles() -> List[Dict[str, Any]]:
+    async def get_all_roles() -> List[Dict[str, Any]]:
         try:
             collection = Role.get_collection()
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
             
-            roles = list(collection.find())
+            roles = await collection.find().to_list(length=None)
             for role in roles:
                 role['_id'] = str(role['_id'])
                 if "created_at" in role:
@@ -175,7 +177,7 @@ class Role:
             raise HTTPException(status_code=500, detail=f"Failed to get all roles: {str(e)}")
 
     @staticmethod
-    def update_role(role_id: str, name: Optional[str] = None, 
+    async def update_role(role_id: str, name: Optional[str] = None, 
                    priority: Optional[int] = None, 
                    permissions: Optional[List[str]] = None) -> Dict[str, str]:
         try:
@@ -183,7 +185,7 @@ class Role:
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
 
-            existing_role = collection.find_one({"_id": ObjectId(role_id)})
+            existing_role = await collection.find_one({"_id": ObjectId(role_id)})
             if not existing_role:
                 raise HTTPException(status_code=404, detail="Role not found")
 
@@ -203,23 +205,24 @@ class Role:
             if permissions is not None:
                 role.permissions = permissions
 
-            return role.save()
+            return await role.save()
         except HTTPException as http_exc:
             raise http_exc
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Failed to update role: {str(e)}")
 
     @staticmethod
-    def delete_role(role_id: str) -> bool:
+    async def delete_role(role_id: str) -> bool:
         try:
             collection = Role.get_collection()
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
 
-            result = collection.delete_one({"_id": ObjectId(role_id)})
+            result = await collection.delete_one({"_id": ObjectId(role_id)})
             if result.deleted_count == 0:
                 raise HTTPException(status_code=404, detail="Role not found")
 
+            await TieredCache.invalidate_namespace("roles")
             return True
         except HTTPException as http_exc:
             raise http_exc
@@ -227,13 +230,13 @@ class Role:
             raise HTTPException(status_code=500, detail=f"Failed to delete role: {str(e)}")
 
     @staticmethod
-    def add_permission(role_id: str, permission: str) -> List[str]:
+    async def add_permission(role_id: str, permission: str) -> List[str]:
         try:
             collection = Role.get_collection()
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
 
-            existing_role = collection.find_one({"_id": ObjectId(role_id)})
+            existing_role = await collection.find_one({"_id": ObjectId(role_id)})
             if not existing_role:
                 raise HTTPException(status_code=404, detail="Role not found")
 
@@ -241,10 +244,11 @@ class Role:
 
             if permission not in current_permissions:
                 current_permissions.append(permission)
-                collection.update_one(
+                await collection.update_one(
                     {"_id": ObjectId(role_id)},
                     {"$set": {"permissions": current_permissions, "updated_at": datetime.now(timezone.utc)}}
                 )
+                await TieredCache.invalidate_namespace("roles")
 
             return current_permissions
         except HTTPException as http_exc:
@@ -253,13 +257,13 @@ class Role:
             raise HTTPException(status_code=500, detail=f"Failed to add permission: {str(e)}")
 
     @staticmethod
-    def remove_permission(role_id: str, permission: str) -> List[str]:
+    async def remove_permission(role_id: str, permission: str) -> List[str]:
         try:
             collection = Role.get_collection()
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
 
-            existing_role = collection.find_one({"_id": ObjectId(role_id)})
+            existing_role = await collection.find_one({"_id": ObjectId(role_id)})
             if not existing_role:
                 raise HTTPException(status_code=404, detail="Role not found")
 
@@ -267,10 +271,11 @@ class Role:
 
             if permission in current_permissions:
                 current_permissions.remove(permission)
-                collection.update_one(
+                await collection.update_one(
                     {"_id": ObjectId(role_id)},
                     {"$set": {"permissions": current_permissions, "updated_at": datetime.now(timezone.utc)}}
                 )
+                await TieredCache.invalidate_namespace("roles")
             
             return current_permissions
         except HTTPException as http_exc:
@@ -279,13 +284,13 @@ class Role:
             raise HTTPException(status_code=500, detail=f"Failed to remove permission: {str(e)}")
 
     @staticmethod
-    def has_permission(role_id: str, permission: str) -> bool:
+    async def has_permission(role_id: str, permission: str) -> bool:
         try:
             collection = Role.get_collection()
             if collection is None:
                 raise HTTPException(status_code=500, detail="Database connection error")
                 
-            existing_role = collection.find_one({"_id": ObjectId(role_id)})
+            existing_role = await collection.find_one({"_id": ObjectId(role_id)})
             if not existing_role:
                 raise HTTPException(status_code=404, detail="Role not found")
                 
@@ -294,4 +299,9 @@ class Role:
         except HTTPException as http_exc:
             raise http_exc
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to check permission: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Failed to check permission: {str(e)}")
+
+register_indexes(
+    "roles",
+    IndexModel([("name", ASCENDING)], name="name_unique", unique=True),
+)
@@ -4,10 +4,14 @@ from fastapi import HTTPException
 from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Tuple
 from api.extensions.helper.json_serializer import serialize_for_json, clean_user_data
-from api.db import db
+from api.extensions.helper.pagination import paginate
+from api.extensions.redis_cache.user_cache import UserCache
+from api.db import get_collection
+from pymongo import IndexModel, ASCENDING
+from api.db.indexes import register_indexes
 from api.extensions.jwt.__init__ import create_token  # Ensure this import is correct
 from api.models.user.Role import Role
-import bcrypt
+from api.extensions.password import PasswordHasher
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -43,25 +47,27 @@ class User:
     @staticmethod
     def get_collection():
         try:
-            if db is None:
-                raise HTTPException(status_code=500, detail="Database connection not initialized")
-            return db["users"]
+            return get_collection("users")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error accessing database: {str(e)}")
 
     @staticmethod
-    def hash_password(password):
+    async def hash_password(password):
         try:
-            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            return await PasswordHasher.hash(password)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error processing password: {str(e)}")
 
     @staticmethod
-    def verify_password(password, hashed_password):
+    async def verify_password(password, hashed_password):
         try:
-            if isinstance(hashed_password, str):
-                hashed_password = hashed_password.encode('utf-8')
-            return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+            return await PasswordHasher.verify(password, hashed_password)
+        except HTTPException as http_exc:
+            if http_exc.status_code == 503:
+                raise
+            raise HTTPException(status_code=401, detail="Invalid credentials")
         except Exception as e:
             raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -75,57 +81,67 @@ class User:
         return identifier.strip().lower()
 
     @staticmethod
-    def get_by_username(username: str):
+    async def get_by_username(username: str):
         try:
             collection = User.get_collection()
             normalized_username = User.normalize_identifier(username)
-            return collection.find_one({"username_lower": normalized_username})
+            return await collection.find_one({"username_lower": normalized_username})
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving user: {str(e)}")
 
     @staticmethod
-    def get_by_email(email: str):
+    async def get_by_email(email: str):
         try:
             collection = User.get_collection()
             normalized_email = User.normalize_identifier(email)
-            return collection.find_one({"email_lower": normalized_email})
+            return await collection.find_one({"email_lower": normalized_email})
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving user: {str(e)}")
 
     @staticmethod
-    def get_by_id(user_id: str):
+    async def get_by_id(user_id: str):
         try:
             collection = User.get_collection()
-            return collection.find_one({"_id": ObjectId(user_id)})
+            return await collection.find_one({"_id": ObjectId(user_id)})
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error retrieving user: {str(e)}")
 
     @staticmethod
-    def authenticate(identifier: str, password: str):
+    async def authenticate(identifier: str, password: str):
         try:
             normalized_id = User.normalize_identifier(identifier)
             
             # Try username first
-            user = User.get_by_username(normalized_id)
+            user = await User.get_by_username(normalized_id)
             if not user:
                 # Try email if username not found
-                user = User.get_by_email(normalized_id)
+                user = await User.get_by_email(normalized_id)
             if not user:
                 raise HTTPException(status_code=401, detail="Invalid credentials")
 
             if not user.get("is_active", True):
                 raise HTTPException(status_code=403, detail="Account not active")
 
-            if not User.verify_password(password, user["password"]):
+            if not await User.verify_password(password, user["password"]):
                 raise HTTPException(status_code=401, detail="Invalid credentials")
 
+            # Upgrade the stored hash when the configured cost factor changed
+            if PasswordHasher.needs_rehash(user["password"]):
+                try:
+                    await User.get_collection().update_one(
+                        {"_id": user["_id"], "password": user["password"]},
+                        {"$set": {"password": await User.hash_password(password)}}
+                    )
+                except Exception as e:
+                    print(f"Password rehash failed for user {user['_id']}: {e}")
+
             # Handle role conversion
             user["_id"] = str(user["_id"])
             if isinstance(user["role"], ObjectId):
-                role_obj = Role.get_by_id(str(user["role"]))
+                role_obj = await Role.get_by_id(str(user["role"]))
                 user["role"] = role_obj["name"] if role_obj else "vendor"
             elif isinstance(user["role"], str):
-                if not Role.get_role_by_name(user["role"]):
+                if not await Role.get_role_by_name(user["role"]):
                     user["role"] = "vendor"
 
             # Serialize for JSON
@@ -136,7 +152,7 @@ class User:
             raise HTTPException(status_code=500, detail=f"Authentication failed: {str(e)}")
 
     @staticmethod
-    def signup(username: str, first_name: str, last_name: str, email: str, password: str, role: str = "vendor"):
+    async def signup(username: str, first_name: str, last_name: str, email: str, password: str, role: str = "vendor"):
         try:
             print(f"DEBUG: Signup called with role: {role}")  # Debug line
             
@@ -145,17 +161,17 @@ class User:
             normalized_email = User.normalize_identifier(email)
             
             # Get the specified role
-            role_obj = Role.get_role_by_name(role)
+            role_obj = await Role.get_role_by_name(role)
             print(f"DEBUG: Role object found: {role_obj}")  # Debug line
             
             if not role_obj:
                 raise HTTPException(status_code=400, detail=f"Role '{role}' not found. Available roles: admin, supplier, vendor")
 
             # Check for existing user
-            if User.get_by_username(normalized_username):
+            if await User.get_by_username(normalized_username):
                 raise HTTPException(status_code=409, detail="Username already exists")
 
-            if User.get_by_email(normalized_email):
+            if await User.get_by_email(normalized_email):
                 raise HTTPException(status_code=409, detail="Email already exists")
 
             # Create new user
@@ -165,7 +181,7 @@ class User:
                 "name": f"{first_name} {last_name}",
                 "email": email,
                 "email_lower": normalized_email,
-                "password": User.hash_password(password),
+                "password": await User.hash_password(password),
                 "phone1": "",
                 "role": role,  # Use the role string directly instead of role_obj["name"]
                 "is_active": True,
@@ -175,7 +191,7 @@ class User:
             }
 
             collection = User.get_collection()
-            result = collection.insert_one(new_user)
+            result = await collection.insert_one(new_user)
             
             return {
                 "id": str(result.inserted_id),
@@ -190,15 +206,15 @@ class User:
             raise HTTPException(status_code=500, detail=f"Signup failed: {str(e)}")
 
     @staticmethod
-    def generate_token(user_id: str):
+    async def generate_token(user_id: str):
         try:
-            user = User.get_by_id(user_id)
+            user = await User.get_by_id(user_id)
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
             role_name = user["role"]
             if isinstance(role_name, ObjectId):
-                role = Role.get_by_id(str(role_name))
+                role = await Role.get_by_id(str(role_name))
                 role_name = role["name"] if role else "vendor"
 
             payload = {
@@ -212,25 +228,23 @@ class User:
             raise HTTPException(status_code=500, detail=f"Token generation failed: {str(e)}")
         
     @staticmethod
-    def list_users():
-        """List all users (admin only)"""
+    async def list_users(cursor: Optional[str] = None, limit: Optional[int] = None):
+        """List one page of users (admin only)"""
         try:
             collection = User.get_collection()
-            users = list(collection.find({}))
-            # Serialize all users for JSON
-            serialized_users = []
-            for user in users:
-                serialized_user = clean_user_data(user)
-                serialized_users.append(serialized_user)
-            return serialized_users
+            # Sensitive fields never leave Mongo
+            projection = {"password": 0, "email_lower": 0, "username_lower": 0}
+            return await paginate(collection, {}, cursor, limit, projection)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error listing users: {str(e)}")
 
     @staticmethod
-    def get_user_by_id(user_id: str):
+    async def get_user_by_id(user_id: str):
         """Get user by ID"""
         try:
-            user = User.get_by_id(user_id)
+            user = await User.get_by_id(user_id)
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
             return clean_user_data(user)
@@ -238,7 +252,7 @@ class User:
             raise HTTPException(status_code=500, detail=f"Error retrieving user: {str(e)}")
 
     @staticmethod
-    def update_user(user_id: str, update_data: dict):
+    async def update_user(user_id: str, update_data: dict):
         """Update user fields (name, phone, etc.)"""
         try:
             collection = User.get_collection()
@@ -246,24 +260,25 @@ class User:
             update_fields = {k: v for k, v in update_data.items() if k in allowed_fields}
             if not update_fields:
                 raise HTTPException(status_code=400, detail="No valid fields to update")
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": ObjectId(user_id)},
                 {"$set": update_fields}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="User not found")
-            return User.get_user_by_id(user_id)
+            await UserCache.invalidate(user_id)
+            return await User.get_user_by_id(user_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error updating user: {str(e)}")
 
     @staticmethod
-    def update_profile(user_id: str, update_data: dict):
+    async def update_profile(user_id: str, update_data: dict):
         """Update user profile with enhanced validation and password change support"""
         try:
             collection = User.get_collection()
             
             # Get current user
-            current_user = User.get_by_id(user_id)
+            current_user = await User.get_by_id(user_id)
             if not current_user:
                 raise HTTPException(status_code=404, detail="User not found")
             
@@ -284,7 +299,7 @@ class User:
                 new_email = update_data["email"].lower().strip()
                 if new_email != current_user.get("email_lower", ""):
                     # Check if email already exists
-                    existing_user = User.get_by_email(new_email)
+                    existing_user = await User.get_by_email(new_email)
                     if existing_user and str(existing_user["_id"]) != user_id:
                         raise HTTPException(status_code=409, detail="Email already exists")
                     update_fields["email"] = update_data["email"]
@@ -296,11 +311,11 @@ class User:
                     raise HTTPException(status_code=400, detail="Both current and new password are required")
                 
                 # Verify current password
-                if not User.verify_password(update_data["current_password"], current_user["password"]):
+                if not await User.verify_password(update_data["current_password"], current_user["password"]):
                     raise HTTPException(status_code=401, detail="Current password is incorrect")
                 
                 # Hash new password
-                update_fields["password"] = User.hash_password(update_data["new_password"])
+                update_fields["password"] = await User.hash_password(update_data["new_password"])
             
             # Update timestamp
             update_fields["updated_at"] = datetime.now(timezone.utc)
@@ -309,16 +324,18 @@ class User:
                 raise HTTPException(status_code=400, detail="No valid fields to update")
             
             # Perform update
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": ObjectId(user_id)},
                 {"$set": update_fields}
             )
             
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="User not found")
+
+            await UserCache.invalidate(user_id)
             
             # Return updated user (excluding password)
-            updated_user = User.get_by_id(user_id)
+            updated_user = await User.get_by_id(user_id)
             if not updated_user:
                 raise HTTPException(status_code=404, detail="User not found")
             return clean_user_data(updated_user)
@@ -330,23 +347,24 @@ class User:
             raise HTTPException(status_code=500, detail=f"Error updating profile: {str(e)}")
 
     @staticmethod
-    def delete_user(user_id: str):
+    async def delete_user(user_id: str):
         """Delete user by ID"""
         try:
             collection = User.get_collection()
-            result = collection.delete_one({"_id": ObjectId(user_id)})
+            result = await collection.delete_one({"_id": ObjectId(user_id)})
             if result.deleted_count == 0:
                 raise HTTPException(status_code=404, detail="User not found")
+            await UserCache.invalidate(user_id)
             return {"message": "User deleted"}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error deleting user: {str(e)}")
 
     @staticmethod
-    def get_locations(user_id: str):
+    async def get_locations(user_id: str):
         """Get all locations for a user"""
         try:
             collection = User.get_collection()
-            user = collection.find_one({"_id": ObjectId(user_id)})
+            user = await collection.find_one({"_id": ObjectId(user_id)})
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
             locations = user.get("locations", [])
@@ -357,48 +375,58 @@ class User:
             raise HTTPException(status_code=500, detail=f"Error retrieving locations: {str(e)}")
 
     @staticmethod
-    def add_location(user_id: str, location_data: dict):
+    async def add_location(user_id: str, location_data: dict):
         """Add a new location for a user"""
         from bson import ObjectId
         try:
             collection = User.get_collection()
             location_data["id"] = str(ObjectId())
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": ObjectId(user_id)},
                 {"$push": {"locations": location_data}}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="User not found")
+            await UserCache.invalidate(user_id)
             return location_data
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error adding location: {str(e)}")
 
     @staticmethod
-    def update_location(user_id: str, loc_id: str, update_data: dict):
+    async def update_location(user_id: str, loc_id: str, update_data: dict):
         """Update a specific location for a user"""
         try:
             collection = User.get_collection()
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": ObjectId(user_id), "locations.id": loc_id},
                 {"$set": {f"locations.$.{k}": v for k, v in update_data.items()}}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Location not found")
-            return User.get_locations(user_id)
+            await UserCache.invalidate(user_id)
+            return await User.get_locations(user_id)
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error updating location: {str(e)}")
 
     @staticmethod
-    def delete_location(user_id: str, loc_id: str):
+    async def delete_location(user_id: str, loc_id: str):
         """Delete a specific location for a user"""
         try:
             collection = User.get_collection()
-            result = collection.update_one(
+            result = await collection.update_one(
                 {"_id": ObjectId(user_id)},
                 {"$pull": {"locations": {"id": loc_id}}}
             )
             if result.matched_count == 0:
                 raise HTTPException(status_code=404, detail="Location not found")
+            await UserCache.invalidate(user_id)
             return {"message": "Location deleted"}
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error deleting location: {str(e)}")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail=f"Error deleting location: {str(e)}")
+
+# Login and signup look users up by normalized username/email
+register_indexes(
+    "users",
+    IndexModel([("username_lower", ASCENDING)], name="username_lower_unique", unique=True),
+    IndexModel([("email_lower", ASCENDING)], name="email_lower_unique", unique=True),
+)
@@ -1,15 +1,135 @@
-import socketio # Import the Device model
+import os
+from typing import Any, Dict, Optional
+import orjson
+import socketio
+from fastapi import HTTPException
+from api.db import REDIS_URL
+from api.extensions.jwt import verify_token
+from api.extensions.helper.json_response import dumps
+from api.extensions.helper.metrics import register_metrics
+
+# Relay emits through Redis so they reach sockets held by every worker and node
+SOCKET_REDIS_MANAGER = os.getenv("SOCKET_REDIS_MANAGER", "true").lower() == "true"
+# Pub/sub channel shared by all Socket.IO servers of this deployment
+SOCKET_REDIS_CHANNEL = os.getenv("SOCKET_REDIS_CHANNEL", "socketio")
+
+class SocketJSON:
+    """orjson codec for Socket.IO packets; ObjectId and datetime payloads encode like HTTP responses"""
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        return dumps(obj).decode("utf-8")
+
+    @staticmethod
+    def loads(data: Any, **kwargs) -> Any:
+        return orjson.loads(data)
+
+client_manager = (
+    socketio.AsyncRedisManager(
+        REDIS_URL,
+        channel=SOCKET_REDIS_CHANNEL,
+        redis_options={"health_check_interval": 30},
+    )
+    if SOCKET_REDIS_MANAGER else None
+)
 
 sio_server = socketio.AsyncServer(
     async_mode='asgi',
-    cors_allowed_origins=[]
+    cors_allowed_origins=[],
+    client_manager=client_manager,
+    json=SocketJSON,
 )
 
+def user_room(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def role_room(role: str) -> str:
+    return f"role:{role}"
+
+class SocketEmitter:
+    """
+    Room-targeted emits usable from any request handler or task.
+
+    With the Redis manager an emit is delivered to the local sockets in the
+    room and published once for the other workers. Failures are logged and
+    reported as False; a realtime push never fails the request that caused it.
+    """
+    _stats: Dict[str, int] = {"connected": 0, "connects": 0, "refused": 0, "emits": 0, "emit_errors": 0}
+
+    @staticmethod
+    async def to_room(room: str, event: str, data: Any) -> bool:
+        try:
+            await sio_server.emit(event, data, room=room)
+            SocketEmitter._stats["emits"] += 1
+            return True
+        except Exception as e:
+            SocketEmitter._stats["emit_errors"] += 1
+            print(f"Socket emit '{event}' to {room} failed: {e}")
+            return False
+
+    @staticmethod
+    async def to_user(user_id: str, event: str, data: Any) -> bool:
+        """Every socket the user has open, on any worker"""
+        return await SocketEmitter.to_room(user_room(user_id), event, data)
+
+    @staticmethod
+    async def to_role(role: str, event: str, data: Any) -> bool:
+        """Every connected user with the role, on any worker"""
+        return await SocketEmitter.to_room(role_room(role), event, data)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return dict(
+            SocketEmitter._stats,
+            pid=os.getpid(),
+            manager="redis" if client_manager is not None else "local",
+        )
+
+def _token_from(environ: Dict[str, Any], auth: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The Socket.IO auth payload {"token": ...}, else an Authorization: Bearer header"""
+    if isinstance(auth, dict) and auth.get("token"):
+        return str(auth["token"])
+    header = environ.get("HTTP_AUTHORIZATION", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    return None
+
 @sio_server.event
-async def connect(sid):
-    print(f"Client connected: {sid}")
-    await sio_server.emit('message', {'data': 'Welcome!'}, to=sid)
+async def connect(sid, environ, auth=None):
+    token = _token_from(environ, auth)
+    if not token:
+        SocketEmitter._stats["refused"] += 1
+        raise socketio.exceptions.ConnectionRefusedError("Authentication required")
+    try:
+        claims = verify_token(token)
+    except HTTPException as e:
+        SocketEmitter._stats["refused"] += 1
+        raise socketio.exceptions.ConnectionRefusedError(e.detail)
+
+    user_id, role = claims.get("uid"), claims.get("role")
+    if not user_id:
+        SocketEmitter._stats["refused"] += 1
+        raise socketio.exceptions.ConnectionRefusedError("Invalid token: missing user ID")
+
+    await sio_server.save_session(sid, {"uid": user_id, "role": role})
+    await sio_server.enter_room(sid, user_room(user_id))
+    if role:
+        await sio_server.enter_room(sid, role_room(role))
+
+    SocketEmitter._stats["connects"] += 1
+    SocketEmitter._stats["connected"] += 1
+    # The new socket is always local, so skip the Redis round-trip
+    await sio_server.emit('message', {'data': 'Welcome!'}, to=sid, ignore_queue=True)
+
+    # Reconnecting clients pass the last "resume" they saw; replay once the connect is acknowledged
+    if isinstance(auth, dict) and auth.get("resume"):
+        from api.socket.events import UserEvents
+        sio_server.start_background_task(UserEvents.replay, sid, user_id, auth["resume"])
 
 @sio_server.event
 async def disconnect(sid):
-    print(f"Client disconnected: {sid}")
\ No newline at end of file
+    SocketEmitter._stats["connected"] = max(0, SocketEmitter._stats["connected"] - 1)
+
+
+register_metrics("sockets", SocketEmitter.stats)
@@ -0,0 +1,130 @@
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import orjson
+from api.extensions.redis_cache import Cache
+from api.extensions.helper.json_response import dumps
+from api.extensions.helper.metrics import register_metrics
+from api.socket import sio_server, SocketEmitter
+
+# Events kept per user for resuming clients; older ones are trimmed (approximately)
+USER_EVENTS_MAXLEN = int(os.getenv("USER_EVENTS_MAXLEN", "500"))
+# Seconds a user's event log outlives its last event
+USER_EVENTS_TTL = int(os.getenv("USER_EVENTS_TTL", str(24 * 3600)))
+
+# Sent instead of a replay when missed events are no longer retained
+RESYNC_EVENT = "events:resync"
+
+_STREAM_ID = re.compile(r"^\d+-\d+$")
+
+def _stream_id(value: Any) -> Tuple[int, int]:
+    ms, seq = _decode(value).split("-")
+    return int(ms), int(seq)
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+class UserEvents:
+    """
+    Per-user change feed: a live Socket.IO push plus a short Redis stream
+    (events:user:<uid>) for clients that were disconnected.
+
+    Every pushed payload carries "resume", the stream ID of that event in the
+    receiving user's log. A client that reconnects with auth
+    {"token": ..., "resume": <last resume seen>} gets the events it missed, in
+    order, or a single "events:resync" when they were trimmed and it must
+    refetch. Replay starts after the socket joined its rooms, so a live event
+    can arrive twice; clients drop any resume <= the last one applied.
+    """
+    _stats: Dict[str, int] = {"published": 0, "replayed": 0, "resyncs": 0, "errors": 0}
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"events:user:{user_id}"
+
+    @staticmethod
+    async def publish(event: str, delta: Dict[str, Any], *user_ids: Optional[str]) -> None:
+        """Log the event for each user in one round-trip, then push it to their rooms"""
+        await UserEvents.publish_many([(event, delta, user_ids)])
+
+    @staticmethod
+    async def publish_many(events: List[Tuple[str, Dict[str, Any], Iterable[Optional[str]]]]) -> None:
+        """publish() for a batch of (event, delta, user_ids): one pipeline for all of them"""
+        deliveries = []
+        for event, delta, user_ids in events:
+            payload = dumps({"event": event, "data": delta})
+            for user_id in dict.fromkeys(str(uid) for uid in user_ids if uid):
+                deliveries.append((user_id, event, delta, payload))
+        if not deliveries:
+            return
+
+        def build(pipe):
+            for user_id, _, _, payload in deliveries:
+                key = UserEvents._key(user_id)
+                pipe.xadd(key, {"p": payload}, maxlen=USER_EVENTS_MAXLEN, approximate=True)
+                pipe.expire(key, USER_EVENTS_TTL)
+
+        try:
+            results = await Cache.pipeline(build)
+            resume_ids = [_decode(stream_id) for stream_id in results[0::2]]
+        except Exception as e:
+            # Still push live; without a resume token the client resyncs on reconnect
+            UserEvents._stats["errors"] += 1
+            print(f"User event log write failed for {len(events)} event(s): {getattr(e, 'detail', e)}")
+            resume_ids = [None] * len(deliveries)
+
+        UserEvents._stats["published"] += len(events)
+        for (user_id, event, delta, _), resume in zip(deliveries, resume_ids):
+            await SocketEmitter.to_user(user_id, event, dict(delta, resume=resume))
+
+    @staticmethod
+    async def missed(user_id: str, since: str) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Events logged for the user after `since`, as (event, payload) pairs.
+        None means the gap can't be filled (trimmed, expired or unknown token).
+        """
+        if not isinstance(since, str) or not _STREAM_ID.match(since):
+            return None
+        key = UserEvents._key(user_id)
+
+        def build(pipe):
+            pipe.xrange(key, min="-", max="+", count=1)
+            pipe.xrange(key, min=f"({since}", max="+", count=USER_EVENTS_MAXLEN + 1)
+
+        oldest, entries = await Cache.pipeline(build)
+        # The token is older than anything retained: events in between were trimmed
+        if not oldest or _stream_id(oldest[0][0]) > _stream_id(since):
+            return None
+        if len(entries) > USER_EVENTS_MAXLEN:
+            return None
+
+        events = []
+        for stream_id, fields in entries:
+            message = orjson.loads(fields.get(b"p") or fields.get("p"))
+            events.append((message["event"], dict(message["data"], resume=_decode(stream_id))))
+        return events
+
+    @staticmethod
+    async def replay(sid: str, user_id: str, since: str) -> None:
+        """Send a reconnecting socket what it missed since its resume token"""
+        try:
+            events = await UserEvents.missed(user_id, since)
+        except Exception as e:
+            UserEvents._stats["errors"] += 1
+            print(f"User event replay failed for {user_id}: {getattr(e, 'detail', e)}")
+            events = None
+
+        if events is None:
+            UserEvents._stats["resyncs"] += 1
+            await sio_server.emit(RESYNC_EVENT, {}, to=sid, ignore_queue=True)
+            return
+        for event, data in events:
+            await sio_server.emit(event, data, to=sid, ignore_queue=True)
+        UserEvents._stats["replayed"] += len(events)
+
+    @staticmethod
+    def stats() -> Dict[str, Any]:
+        return dict(UserEvents._stats, pid=os.getpid(), maxlen=USER_EVENTS_MAXLEN)
+
+
+register_metrics("user_events", UserEvents.stats)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from api.versions.v1 import router as v1_router
 from api.versions.v2 import router as v2_router
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 
 router = APIRouter()
 
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("/", response_description="Api Version Manager route")
 # Define the API Version Manager Route
 async def hello_world():
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=200,
         content={
             "location": "api/",
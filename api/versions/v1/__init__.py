@@ -4,7 +4,9 @@ from api.versions.v1.user.auth import router as auth_router
 from api.versions.v1.product import router as product_router
 from api.versions.v1.review import router as review_router
 from api.versions.v1.booking import router as order_router
-from fastapi.responses import JSONResponse
+from api.versions.v1.payment import router as payment_router
+from api.versions.v1.metrics import router as metrics_router
+from api.extensions.helper.json_response import FastJSONResponse
 
 router = APIRouter()
 
@@ -13,7 +15,7 @@ router = APIRouter()
 @router.get("", response_description="Api Version 1 Manager route")
 @router.get("/", response_description="Api Version 1 Manager route")
 async def hello_world():
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=200,
         content={
         "location": "api/v1",
@@ -33,4 +35,10 @@ router.include_router(product_router, prefix="/product", tags=["API Version 1"])
 router.include_router(review_router, prefix="/review", tags=["API Version 1"])
 
 # https://localhost:10021/api/v1/order
-router.include_router(order_router, prefix="/order", tags=["API Version 1"])
\ No newline at end of file
+router.include_router(order_router, prefix="/order", tags=["API Version 1"])
+
+# https://localhost:10021/api/v1/payment
+router.include_router(payment_router, prefix="/payment", tags=["API Version 1"])
+
+# https://localhost:10021/api/v1/metrics
+router.include_router(metrics_router, prefix="/metrics", tags=["API Version 1"])
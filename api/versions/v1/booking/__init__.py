@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Request, Depends,Body
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from fastapi_limiter.depends import RateLimiter
-from api.controllers.order_controller import create_booking,get_bookings_by_vendor,get_bookings_by_supplier, get_my_bookings, get_my_supplier_bookings,update_booking_status_controller
-from api.extensions.jwt.dependencies import require_vendor, require_supplier
+from api.controllers.order_controller import create_booking,get_bookings_by_vendor,get_bookings_by_supplier, get_my_bookings, get_my_supplier_bookings,update_booking_status_controller, export_bookings, bulk_update_booking_status_controller, quote_order
+from api.extensions.jwt.dependencies import require_vendor, require_supplier, require_any_role
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 @router.get("", response_description="order API Home")
 @router.get("/", response_description="order API Home")
 async def user_home_route(_=Depends(RateLimiter(times=5, seconds=60))):
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "location": "api/v1/order",
             "message": "Welcome to the Order API"
@@ -28,6 +28,14 @@ async def create_booking_route(
 ):
     return await create_booking(request, current_user)
 
+# http://localhost:10021/api/v1/order/quote
+@router.post("/quote", response_description="Price a cart of products")
+async def quote_order_route(
+    request: Request,
+    current_user: dict = Depends(require_any_role)
+):
+    return await quote_order(request, current_user)
+
 # http://localhost:10021/api/v1/order/vendor/{vendor_id}
 @router.get("/vendor/{vendor_id}", response_description="Get all bookings for a vendor")
 async def get_bookings_by_vendor_route(
@@ -57,6 +65,14 @@ async def update_booking_status_route(
     status = data.get("status")
     return await update_booking_status_controller(booking_id, status, current_user)
 
+# http://localhost:10021/api/v1/order/bulk_update_status
+@router.put("/bulk_update_status", response_description="Update the status of many bookings with per-item results")
+async def bulk_update_booking_status_route(
+    request: Request,
+    current_user: dict = Depends(require_supplier)
+):
+    return await bulk_update_booking_status_controller(request, current_user)
+
 @router.get("/my-bookings", response_description="Get all bookings for the current vendor")
 async def get_my_bookings_route(
     request: Request,
@@ -70,3 +86,11 @@ async def get_my_supplier_bookings_route(
     current_user: dict = Depends(require_supplier)
 ):
     return await get_my_supplier_bookings(request, current_user)
+
+# http://localhost:10021/api/v1/order/export?format=ndjson|csv
+@router.get("/export", response_description="Stream bookings as NDJSON or CSV")
+async def export_bookings_route(
+    request: Request,
+    current_user: dict = Depends(require_any_role)
+):
+    return await export_bookings(request, current_user)
@@ -3,7 +3,7 @@ from api.extensions.mail import MAIL
 import random
 
 from api.extensions.mail.otpHtmlVariable import getHtml
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 
 router = APIRouter()
 
@@ -12,7 +12,7 @@ router = APIRouter()
 @router.get("", response_description="Api Mail Home")
 @router.get("/", response_description="Api Mail Home")
 async def hello_world():
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "location": "api/v1/mail",
             "message": "API Version V1 - Initial Version",
@@ -43,9 +43,9 @@ async def send_otp(request: Request):
 
         otp = random.randint(100000, 999999)
 
-        MAIL.sendHtmlMail(email, "Furniture Management System", "OTP for the Verification", f"Your OTP is {otp}", getHtml(otp))
+        await MAIL.queueHtmlMail(email, "Furniture Management System", "OTP for the Verification", f"Your OTP is {otp}", getHtml(otp))
 
-        return JSONResponse(
+        return FastJSONResponse(
             content={
             "status": 200,
             "status_message": "OK",
@@ -89,7 +89,7 @@ async def verify_otp(request: Request):
         if not otp:
             raise HTTPException(status_code=400, detail="OTP is required")
         
-        return JSONResponse(
+        return FastJSONResponse(
             content={
             "status": 200,
             "status_message": "OK",
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from api.extensions.helper.json_response import FastJSONResponse
+from api.extensions.helper.metrics import collect_metrics
+from api.extensions.jwt.dependencies import require_admin
+
+router = APIRouter()
+
+# http://localhost:10021/api/v1/metrics
+# http://localhost:10021/api/v1/metrics/
+@router.get("", response_description="Runtime counters for this worker (admin only)")
+@router.get("/", response_description="Runtime counters for this worker (admin only)")
+async def metrics_route(_=Depends(require_admin)):
+    return FastJSONResponse(
+        content={
+            "message": "Metrics fetched successfully",
+            "data": collect_metrics()
+        },
+        status_code=200
+    )
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Request, Depends
+from fastapi_limiter.depends import RateLimiter
+from api.extensions.helper.json_response import FastJSONResponse
+from api.controllers.payment_controller import export_payment_history
+from api.extensions.jwt.dependencies import require_any_role
+
+router = APIRouter()
+
+
+# http://localhost:10021/api/v1/payment
+# http://localhost:10021/api/v1/payment/
+@router.get("", response_description="Payment API Home")
+@router.get("/", response_description="Payment API Home")
+async def payment_home_route(_=Depends(RateLimiter(times=5, seconds=60))):
+    return FastJSONResponse(
+        content={
+            "location": "api/v1/payment",
+            "message": "Welcome to the Payment API"
+        },
+        status_code=200
+    )
+
+# http://localhost:10021/api/v1/payment/export?format=ndjson|csv
+@router.get("/export", response_description="Stream payment history as NDJSON or CSV")
+async def export_payment_history_route(request: Request, current_user: dict = Depends(require_any_role)):
+    return await export_payment_history(request, current_user)
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi_limiter.depends import RateLimiter
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from api.controllers.product_controller import (
     create_product, 
     update_product, 
     get_all_products, 
     delete_product, 
-    get_my_products
+    get_my_products,
+    export_products
 )
-from api.extensions.jwt.dependencies import get_current_user, require_supplier, require_any_role
+from api.extensions.jwt.dependencies import get_current_user, require_supplier, require_any_role, require_admin_or_supplier
 
 # Base Product Router
 router = APIRouter()
@@ -17,7 +18,7 @@ router = APIRouter()
 @router.get("", response_description="Product API Home")
 @router.get("/", response_description="Product API Home")
 async def product_home_route(_=Depends(RateLimiter(times=5, seconds=60))):
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "location": "api/v1/product",
             "message": "Welcome to the Product API"
@@ -50,3 +51,7 @@ async def delete_product_route(product_id: str, request: Request, current_user:
 async def get_my_products_route(request: Request, current_user: dict = Depends(require_supplier)):
     return await get_my_products(request, current_user)
 
+# http://localhost:10021/api/v1/product/export?format=ndjson|csv
+@router.get("/export", response_description="Stream products as NDJSON or CSV (supplier: own, admin: all)")
+async def export_products_route(request: Request, current_user: dict = Depends(require_admin_or_supplier)):
+    return await export_products(request, current_user)
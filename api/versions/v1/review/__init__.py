@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Request, Depends
 from api.controllers.review_controller import give_review,list_reviews
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from fastapi_limiter.depends import RateLimiter
 
 router = APIRouter()
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("", response_description="review API Home")
 @router.get("/", response_description="review API Home")
 async def user_home_route(_=Depends(RateLimiter(times=5, seconds=60))):
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "location": "api/v1/review",
             "message": "Welcome to the Review API"
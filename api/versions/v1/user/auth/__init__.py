@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi_limiter.depends import RateLimiter
-from fastapi.responses import JSONResponse
+from api.extensions.helper.json_response import FastJSONResponse
 from api.controllers.auth_controller import signup, signin, update_profile, get_profile
 from api.extensions.jwt.dependencies import get_current_user, require_admin, require_any_role
 
@@ -11,7 +11,7 @@ router = APIRouter()
 @router.get("", response_description="User API Home")
 @router.get("/", response_description="User API Home")
 async def user_home_route(_=Depends(RateLimiter(times=5, seconds=60))):
-    return JSONResponse(
+    return FastJSONResponse(
         content={
             "location": "api/v1/user/auth",
             "message": "Welcome to the User API"
@@ -38,16 +38,21 @@ async def update_profile_route(request: Request, current_user: dict = Depends(ge
 
 # Admin-only routes
 @router.get("/users", response_description="List all users (admin only)")
-async def list_users_route(_=Depends(require_admin)):
+async def list_users_route(request: Request, _=Depends(require_admin)):
     from api.models.user.User import User
+    from api.extensions.helper.pagination import get_page_params
     try:
-        users = User.list_users()
-        return JSONResponse(
+        cursor, limit = get_page_params(request)
+        page = await User.list_users(cursor=cursor, limit=limit)
+        return FastJSONResponse(
             content={
                 "message": "Users retrieved successfully",
-                "data": users
+                "data": page["items"],
+                "next_cursor": page["next_cursor"]
             },
             status_code=200
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to retrieve users: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Benchmark: concurrent get_all_products / get_my_bookings throughput,
+blocking pymongo calls inside async handlers (before) vs Motor (after).
+
+Usage:
+    MONGO_SERVER_URL=mongodb://localhost:27017 python -m benchmarks.bench_async_db
+
+Seeds a scratch database named "<MONGO_DB_NAME>_bench" and drops it when done.
+"""
+import asyncio
+import os
+import time
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+os.environ.setdefault("MONGO_DB_NAME", "farm_stack")
+os.environ["MONGO_DB_NAME"] = f"{os.environ['MONGO_DB_NAME']}_bench"
+
+from api import db as database
+from api.extensions.helper.json_serializer import serialize_for_json
+from api.models.order.Order import Order
+from api.models.product.Product import ProductModel
+
+PRODUCTS = int(os.getenv("BENCH_PRODUCTS", "200"))
+BOOKINGS = int(os.getenv("BENCH_BOOKINGS", "50"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "64"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "10"))
+
+VENDOR_ID = str(ObjectId())
+SUPPLIER_ID = str(ObjectId())
+
+
+def seed(sync_db):
+    sync_db["products"].delete_many({})
+    sync_db["orders"].delete_many({})
+    sync_db["products"].insert_many([
+        {
+            "name": f"Product {i}",
+            "category": "bench",
+            "price_per_unit": 1.0 + i,
+            "unit": "kg",
+            "available_quantity": 1000,
+            "supplier_id": SUPPLIER_ID,
+        }
+        for i in range(PRODUCTS)
+    ])
+    sync_db["orders"].insert_many([
+        {
+            "vendor_id": VENDOR_ID,
+            "supplier_id": SUPPLIER_ID,
+            "product_id": str(ObjectId()),
+            "qty": 1,
+            "total_price": 1.0,
+            "status": "pending",
+        }
+        for _ in range(BOOKINGS)
+    ])
+
+
+async def run_blocking(sync_db):
+    """The pre-Motor pattern: a synchronous pymongo call inside an async handler"""
+    async def get_all_products():
+        return [serialize_for_json(p) for p in sync_db["products"].find({})]
+
+    async def get_my_bookings():
+        return serialize_for_json(list(sync_db["orders"].find({"vendor_id": VENDOR_ID})))
+
+    return await measure(get_all_products, get_my_bookings)
+
+
+async def run_async():
+    async def get_all_products():
+        return await ProductModel.get_all_products()
+
+    async def get_my_bookings():
+        return await Order.get_bookings_by_vendor(VENDOR_ID)
+
+    return await measure(get_all_products, get_my_bookings)
+
+
+async def measure(get_all_products, get_my_bookings):
+    calls = 0
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        tasks = []
+        for i in range(CONCURRENCY):
+            tasks.append(get_all_products() if i % 2 == 0 else get_my_bookings())
+        await asyncio.gather(*tasks)
+        calls += len(tasks)
+    elapsed = time.perf_counter() - started
+    return calls / elapsed
+
+
+async def main():
+    sync_client = MongoClient(os.getenv("MONGO_SERVER_URL"))
+    sync_db = sync_client[os.environ["MONGO_DB_NAME"]]
+    seed(sync_db)
+
+    await database.init_mongo()
+    if not database.isMongoDBAvailable:
+        raise SystemExit("MongoDB is not reachable, set MONGO_SERVER_URL")
+
+    try:
+        before = await run_blocking(sync_db)
+        after = await run_async()
+        print(f"products={PRODUCTS} bookings={BOOKINGS} concurrency={CONCURRENCY} rounds={ROUNDS}")
+        print(f"blocking pymongo : {before:10.1f} calls/s")
+        print(f"motor (async)    : {after:10.1f} calls/s")
+        print(f"speedup          : {after / before:10.2f}x")
+    finally:
+        database.close_mongo()
+        sync_client.drop_database(os.environ["MONGO_DB_NAME"])
+        sync_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
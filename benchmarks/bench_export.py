@@ -0,0 +1,101 @@
+"""
+Benchmark: dumping 50k bookings.
+
+Before: list(find()) into memory, then one FastJSONResponse body.
+After:  stream_export over a batched cursor (NDJSON and CSV).
+
+Usage:
+    python -m benchmarks.bench_export
+
+The cursor is simulated in memory with the export batch size, so only the
+response side is measured. Reports wall time and peak Python allocation
+(tracemalloc) while the body is produced.
+"""
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from api.extensions.helper.export import EXPORT_BATCH_SIZE, stream_export
+from api.extensions.helper.json_response import FastJSONResponse
+from api.models.order.Order import BOOKING_EXPORT_FIELDS
+
+DOCUMENTS = int(os.getenv("BENCH_DOCUMENTS", "50000"))
+
+
+def make_booking(i):
+    return {
+        "_id": ObjectId(),
+        "vendor_id": str(ObjectId()),
+        "supplier_id": str(ObjectId()),
+        "product_id": str(ObjectId()),
+        "qty": i % 40 + 1,
+        "total_price": 12.5 * (i % 40 + 1),
+        "status": "pending",
+        "order_date": datetime.now(timezone.utc),
+    }
+
+
+class BatchedCursor:
+    """Produces documents one batch at a time, like a Motor cursor with batch_size"""
+
+    def __init__(self, total):
+        self.total = total
+        self.produced = 0
+        self.batch = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.batch:
+            if self.produced >= self.total:
+                raise StopAsyncIteration
+            size = min(EXPORT_BATCH_SIZE, self.total - self.produced)
+            self.batch = [make_booking(self.produced + i) for i in range(size)][::-1]
+            self.produced += size
+            await asyncio.sleep(0)
+        return self.batch.pop()
+
+    async def to_list(self, length=None):
+        return [document async for document in self]
+
+    async def close(self):
+        pass
+
+
+async def before():
+    bookings = await BatchedCursor(DOCUMENTS).to_list(length=None)
+    return len(FastJSONResponse(content={"data": bookings}).body)
+
+
+async def after(export_format):
+    response = stream_export(BatchedCursor(DOCUMENTS), BOOKING_EXPORT_FIELDS, export_format, "bookings")
+    size = 0
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size
+
+
+def measure(label, make):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = asyncio.run(make())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<32} {elapsed * 1000:8.0f} ms  peak {peak / 1024 / 1024:7.1f} MiB  body {size / 1024 / 1024:6.1f} MiB")
+
+
+def main():
+    print(f"{DOCUMENTS} bookings, batch size {EXPORT_BATCH_SIZE}")
+    measure("list(find()) + FastJSONResponse", before)
+    measure("stream_export ndjson", lambda: after("ndjson"))
+    measure("stream_export csv", lambda: after("csv"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: rendering a 10k-product list response.
+
+Before: serialize_for_json per document, then JSONResponse (json.dumps).
+After:  FastJSONResponse on the raw documents (orjson with a BSON default hook).
+
+Usage:
+    python -m benchmarks.bench_json_response
+
+Reports CPU time per render and peak Python allocation (tracemalloc).
+"""
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+from api.extensions.helper.json_response import FastJSONResponse
+from api.extensions.helper.json_serializer import serialize_for_json
+
+DOCUMENTS = int(os.getenv("BENCH_DOCUMENTS", "10000"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "20"))
+
+
+def make_products():
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Product {i}",
+            "category": "vegetables",
+            "price_per_unit": 12.5 + i % 10,
+            "unit": "kg",
+            "available_quantity": 100 + i,
+            "image_url": f"https://cdn.example.com/products/{i}.jpg",
+            "location": {"address": "Market road", "city": "Pune", "coordinates": [73.85, 18.52]},
+            "supplier_id": str(ObjectId()),
+            "created_at": now,
+        }
+        for i in range(DOCUMENTS)
+    ]
+
+
+def before(products):
+    items = [serialize_for_json(product) for product in products]
+    return JSONResponse(content={"message": "Products fetched successfully", "data": items}).body
+
+
+def after(products):
+    return FastJSONResponse(content={"message": "Products fetched successfully", "data": products}).body
+
+
+def measure(label, render, products):
+    render(products)
+    start = time.process_time()
+    for _ in range(ROUNDS):
+        body = render(products)
+    cpu_ms = (time.process_time() - start) / ROUNDS * 1000
+
+    tracemalloc.start()
+    render(products)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  {label:<36} {cpu_ms:8.1f} ms CPU/render  peak {peak / 1024 / 1024:7.1f} MiB  body {len(body) / 1024:7.0f} KiB")
+    return cpu_ms, peak
+
+
+def main():
+    products = make_products()
+    print(f"{DOCUMENTS} product documents, {ROUNDS} rounds")
+    cpu_before, peak_before = measure("serialize_for_json + JSONResponse", before, products)
+    cpu_after, peak_after = measure("FastJSONResponse (orjson)", after, products)
+    print(f"  CPU {cpu_before / cpu_after:.1f}x faster, peak allocation {peak_before / max(peak_after, 1):.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: pricing a cart with Order.quote.
+
+Prices are served from a warm "prices" cache (the steady state for popular
+products), so this measures the Python side: validating the lines, the
+batched cache lookup and the totals. Redis is disabled; L1 answers.
+
+Usage:
+    python -m benchmarks.bench_quote
+
+Environment:
+    BENCH_LINES        comma-separated cart sizes (default "10,100,300,500")
+    BENCH_ITERATIONS   quotes per cart size (default 2000)
+"""
+import asyncio
+import os
+import time
+
+from bson import ObjectId
+
+from api import db as database
+from api.extensions.redis_cache.tiered import TieredCache
+from api.models.order.Order import Order
+
+LINES = [int(n) for n in os.getenv("BENCH_LINES", "10,100,300,500").split(",")]
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "2000"))
+
+
+def warm_cart(size):
+    prices = TieredCache._namespace("prices")
+    items = []
+    for i in range(size):
+        product_id = str(ObjectId())
+        prices.set_local(product_id, {"name": f"p{i}", "unit": "kg", "price_per_unit": 0.25 + i * 0.37, "supplier_id": "s1"})
+        items.append({"product_id": product_id, "qty": 1 + i % 7})
+    return items
+
+
+async def measure(items):
+    await Order.quote(items)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await Order.quote(items)
+    return (time.perf_counter() - start) / ITERATIONS
+
+
+def main():
+    database.redis_client = None
+    print(f"Order.quote, warm price cache, {ITERATIONS} iterations")
+    for size in LINES:
+        seconds = asyncio.run(measure(warm_cart(size)))
+        print(f"  {size:>4} lines  {seconds * 1e3:7.3f} ms/quote  {seconds * 1e6 / size:6.2f} us/line")
+
+
+if __name__ == "__main__":
+    main()
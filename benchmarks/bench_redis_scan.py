@@ -0,0 +1,100 @@
+"""
+Benchmark: Redis latency seen by other clients while one client enumerates a
+1M-key keyspace with KEYS (before) vs Cache.scan_keys (after), plus
+Cache.delete_by_pattern cleanup time.
+
+Usage:
+    REDIS_HOST=redis://localhost:6379 python -m benchmarks.bench_redis_scan
+
+A prober on its own connection PINGs in a loop and reports p50/p99/max
+latency for each phase. Uses database BENCH_REDIS_DB (default 15) and
+FLUSHes it at the start and the end.
+"""
+import asyncio
+import os
+import statistics
+import time
+
+import redis.asyncio as redis
+
+from api import db as database
+from api.extensions.redis_cache import Cache
+
+KEYS = int(os.getenv("BENCH_KEYS", "1000000"))
+BENCH_REDIS_DB = int(os.getenv("BENCH_REDIS_DB", "15"))
+SEED_BATCH = 10000
+PATTERN = "bench:*"
+
+
+def bench_url() -> str:
+    return f"{database.REDIS_URL.rstrip('/')}/{BENCH_REDIS_DB}"
+
+
+async def seed(client: redis.Redis) -> None:
+    for start in range(0, KEYS, SEED_BATCH):
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + SEED_BATCH, KEYS)):
+                pipe.set(f"bench:{i}", "x")
+            await pipe.execute()
+
+
+async def measure(label: str, work) -> None:
+    prober = redis.from_url(bench_url())
+    samples = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await prober.ping()
+            samples.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.001)
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.2)
+    start = time.perf_counter()
+    result = await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+    await prober.aclose()
+
+    samples.sort()
+    p99 = samples[int(len(samples) * 0.99) - 1] if samples else 0
+    print(
+        f"  {label:<28} {elapsed:7.2f}s  result={result:<8} "
+        f"ping p50={statistics.median(samples):6.2f}ms p99={p99:7.2f}ms max={samples[-1]:8.2f}ms"
+    )
+
+
+async def main():
+    database.REDIS_URL = bench_url()
+    await database.init_redis()
+    client = database.redis_client
+    await client.flushdb()
+    print(f"Seeding {KEYS} keys...")
+    await seed(client)
+
+    async def with_keys():
+        return len(await client.keys(PATTERN))
+
+    async def with_scan():
+        seen = 0
+        async for batch in Cache.scan_keys(PATTERN):
+            seen += len(batch)
+        return seen
+
+    async def with_unlink():
+        return await Cache.delete_by_pattern(PATTERN)
+
+    print(f"Enumerating {KEYS} keys:")
+    await measure("KEYS (before)", with_keys)
+    await measure("scan_keys (after)", with_scan)
+    await measure("delete_by_pattern (UNLINK)", with_unlink)
+
+    await client.flushdb()
+    await database.close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
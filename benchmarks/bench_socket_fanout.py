@@ -0,0 +1,143 @@
+"""
+Load test: Socket.IO fan-out to 10k sockets spread over several workers.
+
+Start the server separately with the Redis client manager, e.g.
+
+    SERVER_WORKERS=4 python server.py
+
+then run
+
+    REDIS_HOST=redis://localhost:6379 python -m benchmarks.bench_socket_fanout
+
+Client processes open BENCH_SOCKETS authenticated websockets (raw Engine.IO v4,
+so no extra client dependency). Uvicorn spreads them across the workers.
+Each round is published once through a write-only AsyncRedisManager to the
+"role:bench" room. The load test reports how many sockets received it and
+the delivery latency.
+
+Environment:
+    BENCH_URL          server base URL (default ws://127.0.0.1:10001)
+    BENCH_SOCKETS      sockets in total (default 10000)
+    BENCH_CLIENTS      client processes (default: cores)
+    BENCH_ROUNDS       broadcasts to send (default 5)
+
+Each client process needs a file-descriptor limit above its socket count.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+import socketio
+import websockets
+
+from api.db import REDIS_URL
+from api.extensions.jwt import create_token
+from api.socket import SOCKET_REDIS_CHANNEL, role_room
+
+BASE_URL = os.getenv("BENCH_URL", "ws://127.0.0.1:10001")
+SOCKETS = int(os.getenv("BENCH_SOCKETS", "10000"))
+CLIENTS = int(os.getenv("BENCH_CLIENTS", str(os.cpu_count() or 1)))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+ROLE = "bench"
+EVENT = "bench"
+
+
+def raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def hold_socket(token, ready, received):
+    """Connect, authenticate, answer pings and record (round, latency) for every bench event"""
+    url = f"{BASE_URL}/sockets/?EIO=4&transport=websocket"
+    async with websockets.connect(url, user_agent_header="Mozilla/5.0", max_queue=None) as ws:
+        await ws.recv()  # Engine.IO open
+        await ws.send("40" + json.dumps({"token": token}))
+        ready.release()
+        async for message in ws:
+            if message == "2":
+                await ws.send("3")
+            elif message.startswith("42"):
+                event, data = json.loads(message[2:])
+                if event == EVENT:
+                    received.append((data["round"], time.time() - data["sent"]))
+
+
+async def run_client(count, connected, done, results):
+    tokens = [create_token({"uid": f"bench-{os.getpid()}-{i}", "role": ROLE})[0] for i in range(count)]
+    ready = asyncio.Semaphore(0)
+    received = []
+    tasks = []
+    for token in tokens:
+        tasks.append(asyncio.create_task(hold_socket(token, ready, received)))
+        # Pace the handshakes so the server's accept queue is not flooded
+        if len(tasks) % 200 == 0:
+            await asyncio.sleep(0.05)
+    for _ in tokens:
+        await ready.acquire()
+    connected.put(count)
+
+    while not done.is_set():
+        await asyncio.sleep(0.2)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    results.put(received)
+
+
+def client_process(count, connected, done, results):
+    raise_fd_limit()
+    asyncio.run(run_client(count, connected, done, results))
+
+
+async def broadcast_rounds():
+    manager = socketio.AsyncRedisManager(REDIS_URL, channel=SOCKET_REDIS_CHANNEL, write_only=True)
+    for number in range(ROUNDS):
+        await manager.emit(EVENT, {"round": number, "sent": time.time()}, room=role_room(ROLE))
+        await asyncio.sleep(2)
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float("nan")
+
+
+def main():
+    connected, results = multiprocessing.Queue(), multiprocessing.Queue()
+    done = multiprocessing.Event()
+    shares = [SOCKETS // CLIENTS + (1 if i < SOCKETS % CLIENTS else 0) for i in range(CLIENTS)]
+    processes = [multiprocessing.Process(target=client_process, args=(share, connected, done, results)) for share in shares]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    total = sum(connected.get() for _ in processes)
+    print(f"{total} sockets connected in {time.perf_counter() - start:.1f}s over {CLIENTS} client processes")
+    # Each worker subscribes to Redis when its first socket connects; let the last ones settle
+    time.sleep(2)
+
+    asyncio.run(broadcast_rounds())
+    time.sleep(2)
+    done.set()
+
+    latencies = {number: [] for number in range(ROUNDS)}
+    for _ in processes:
+        for number, latency in results.get():
+            latencies[number].append(latency)
+    for process in processes:
+        process.join()
+
+    for number, values in latencies.items():
+        values.sort()
+        print(
+            f"  round {number}: delivered {len(values)}/{total}"
+            f"  p50 {percentile(values, 0.5) * 1000:7.1f} ms"
+            f"  p99 {percentile(values, 0.99) * 1000:7.1f} ms"
+            f"  max {(values[-1] if values else float('nan')) * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: /api/v1/product/get_all_products throughput vs worker count.
+
+Starts `python server.py` in prod mode once per worker count, waits until it
+answers, then drives it from separate client processes for a fixed time.
+
+Usage:
+    MONGO_SERVER_URL=mongodb://localhost:27017 MONGO_DB_NAME=farm_stack \\
+    REDIS_HOST=redis://localhost:6379 python -m benchmarks.bench_workers
+
+Environment:
+    BENCH_WORKERS      worker counts to try (default "1,2,4,...,cores")
+    BENCH_CLIENTS      load generator processes (default: cores)
+    BENCH_CONCURRENCY  open connections per client process (default 32)
+    BENCH_SECONDS      measured seconds per run (default 10)
+
+The load generator shares the machine, so for clean numbers give it its own
+cores (e.g. run with taskset) or point BENCH_URL at a server on another host.
+"""
+import asyncio
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from api.extensions.jwt import create_token
+
+CORES = os.cpu_count() or 1
+PORT = int(os.getenv("BENCH_PORT", "10101"))
+BASE_URL = os.getenv("BENCH_URL", f"http://127.0.0.1:{PORT}")
+ROUTE = "/api/v1/product/get_all_products"
+CLIENTS = int(os.getenv("BENCH_CLIENTS", str(CORES)))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "32"))
+SECONDS = float(os.getenv("BENCH_SECONDS", "10"))
+
+
+def worker_counts():
+    configured = os.getenv("BENCH_WORKERS")
+    if configured:
+        return [int(n) for n in configured.split(",")]
+    counts, n = [], 1
+    while n < CORES:
+        counts.append(n)
+        n *= 2
+    return counts + [CORES]
+
+
+def start_server(workers):
+    env = dict(os.environ, MODE="prod", SERVER_WORKERS=str(workers), SERVER_PORT=str(PORT), PYTHONUNBUFFERED="1")
+    server = subprocess.Popen([sys.executable, "server.py"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            # The version root is rate limited, so a 429 also means the workers are up
+            if httpx.get(f"{BASE_URL}/api/v1/", headers={"User-Agent": "Mozilla/5.0"}).status_code in (200, 429):
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+async def drive(headers, seconds):
+    """Keep CONCURRENCY requests in flight until the deadline; returns (ok, errors)"""
+    ok = errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+
+    async with httpx.AsyncClient(base_url=BASE_URL, headers=headers, limits=limits, timeout=10) as client:
+        async def loop():
+            nonlocal ok, errors
+            while time.perf_counter() < deadline:
+                try:
+                    response = await client.get(ROUTE)
+                    if response.status_code == 200:
+                        ok += 1
+                    else:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+
+        await asyncio.gather(*(loop() for _ in range(CONCURRENCY)))
+    return ok, errors
+
+
+def client_process(headers, seconds, results):
+    results.put(asyncio.run(drive(headers, seconds)))
+
+
+def measure(headers):
+    # Warm caches and connections before timing
+    asyncio.run(drive(headers, 1))
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=client_process, args=(headers, SECONDS, results)) for _ in range(CLIENTS)]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    ok = sum(t[0] for t in totals)
+    errors = sum(t[1] for t in totals)
+    return ok / SECONDS, errors
+
+
+def main():
+    token, _ = create_token({"uid": "bench", "role": "vendor"})
+    headers = {"Authorization": f"Bearer {token}", "User-Agent": "Mozilla/5.0"}
+
+    print(f"{ROUTE}: {CLIENTS} client processes x {CONCURRENCY} connections, {SECONDS:.0f}s per run, {CORES} cores")
+    baseline = None
+    for workers in worker_counts():
+        server = start_server(workers)
+        try:
+            rps, errors = measure(headers)
+        finally:
+            server.terminate()
+            server.wait()
+        if baseline is None:
+            baseline = max(rps, 1e-9)
+        print(f"  {workers:>3} workers  {rps:9.0f} req/s  {rps / baseline:5.2f}x  efficiency {rps / baseline / workers:6.1%}  errors {errors}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,5 +10,5 @@ def client():
 
 @pytest.fixture
 def mock_mail():
-    with patch.object(MAIL, 'sendHtmlMail') as mock:
+    with patch.object(MAIL, 'queueHtmlMail') as mock:
         yield mock 
\ No newline at end of file
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from api import db as database
+from api.extensions.ban import BanStore
+from api.extensions.gate import SecurityGateMiddleware
+
+
+def test_ban_store_checks_expiry_and_appends_log(monkeypatch, tmp_path):
+    log_path = tmp_path / "logs" / "custom-ban.log"
+    monkeypatch.setattr("api.extensions.ban.BAN_LOG_PATH", str(log_path))
+    monkeypatch.setattr(database, "redis_client", None)
+    monkeypatch.setattr(BanStore, "_banned", {})
+
+    async def scenario():
+        await BanStore.start()
+        await BanStore.ban("10.0.0.1")
+        await BanStore.ban("10.0.0.1")
+        await BanStore.ban("10.0.0.2", ttl=-1)
+        await BanStore.stop()
+
+    asyncio.run(scenario())
+    assert BanStore.is_banned("10.0.0.1")
+    # Already expired, and temporary bans never reach the firewall log
+    assert not BanStore.is_banned("10.0.0.2")
+    assert log_path.read_text() == "10.0.0.1\n"
+
+
+def test_gate_rejects_banned_ip_before_routing(monkeypatch):
+    monkeypatch.setattr(database, "redis_client", None)
+    monkeypatch.setattr(BanStore, "_banned", {})
+    app = FastAPI()
+    calls = []
+
+    @app.get("/ping")
+    async def ping():
+        calls.append(1)
+        return {"status": "ok"}
+
+    app.add_middleware(SecurityGateMiddleware, enforce=True)
+    client = TestClient(app)
+    headers = {"User-Agent": "Mozilla/5.0", "X-Real-IP": "10.0.0.3"}
+
+    assert client.get("/ping", headers=headers).status_code == 200
+    asyncio.run(BanStore.ban("10.0.0.3"))
+    assert client.get("/ping", headers=headers).status_code == 403
+    assert calls == [1]
+
+
+@pytest.mark.skipif(os.getenv("MODE", "prod").lower() == "dev", reason="the gate only enforces bans outside dev")
+def test_banned_ip_preflight_is_refused_before_cors(monkeypatch):
+    monkeypatch.setattr(database, "redis_client", None)
+    monkeypatch.setattr(BanStore, "_banned", {})
+    from server import app
+
+    # The real app's middleware stack; the lifespan (databases) is not needed
+    client = TestClient(app)
+    headers = {
+        "User-Agent": "Mozilla/5.0",
+        "X-Real-IP": "10.0.0.4",
+        "Origin": "https://example.com",
+        "Access-Control-Request-Method": "GET",
+    }
+
+    assert client.options("/api/v1/", headers=headers).status_code == 200
+    asyncio.run(BanStore.ban("10.0.0.4"))
+    assert client.options("/api/v1/", headers=headers).status_code == 403
+
+
+
+class SortedSetRedis:
+    """Just enough of a Redis client for BanStore's pipelines; `down` makes execute() fail"""
+
+    def __init__(self):
+        self.scores = {}
+        self.down = False
+
+    def pipeline(self, transaction=False):
+        return SortedSetPipeline(self)
+
+
+class SortedSetPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def zadd(self, key, mapping):
+        self.commands.append(lambda: self.redis.scores.update({ip: float(score) for ip, score in mapping.items()}))
+
+    def publish(self, channel, message):
+        self.commands.append(lambda: 1)
+
+    def zremrangebyscore(self, key, low, high):
+        self.commands.append(lambda: [self.redis.scores.pop(ip) for ip, score in list(self.redis.scores.items()) if score <= high])
+
+    def zrangebyscore(self, key, low, high, withscores=False):
+        self.commands.append(lambda: [(ip.encode(), score) for ip, score in self.redis.scores.items() if score >= low])
+
+    async def execute(self):
+        if self.redis.down:
+            raise ConnectionError("Redis is down")
+        return [command() for command in self.commands]
+
+
+def test_ban_whose_redis_write_failed_survives_refresh(monkeypatch):
+    redis_client = SortedSetRedis()
+    monkeypatch.setattr(database, "redis_client", redis_client)
+    monkeypatch.setattr(BanStore, "_banned", {})
+    monkeypatch.setattr(BanStore, "_unsynced", {})
+
+    async def scenario():
+        redis_client.down = True
+        await BanStore.ban("10.0.0.5")
+        await BanStore.refresh()
+        banned_during_outage = BanStore.is_banned("10.0.0.5")
+        redis_client.down = False
+        await BanStore.refresh()
+        return banned_during_outage
+
+    assert asyncio.run(scenario())
+    # The first successful refresh kept the local ban and wrote it for the other workers
+    assert BanStore.is_banned("10.0.0.5")
+    assert redis_client.scores == {"10.0.0.5": float("inf")}
+    assert BanStore._unsynced == {}
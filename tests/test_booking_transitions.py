@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from api.models.order.Order import BOOKING_TRANSITIONS, Order, allowed_sources, holds_stock
+
+
+def test_transition_table():
+    assert allowed_sources("confirmed") == ["pending"]
+    assert allowed_sources("delivered") == ["confirmed"]
+    assert allowed_sources("cancelled") == ["confirmed", "pending"]
+    # Nothing moves back to pending, and final states have no exits
+    assert allowed_sources("pending") == []
+    assert BOOKING_TRANSITIONS["delivered"] == BOOKING_TRANSITIONS["cancelled"] == set()
+    # Only bookings that can still be cancelled hold reserved stock
+    assert [status for status in BOOKING_TRANSITIONS if holds_stock(status)] == ["pending", "confirmed"]
+
+
+def test_unknown_status_is_rejected_before_any_query():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(Order.update_booking_status("0" * 24, "shipped", supplier_id="s1"))
+    assert error.value.status_code == 400
+
+
+def test_bulk_update_reports_invalid_items_individually():
+    results = asyncio.run(Order.bulk_update_status([
+        {"booking_id": "not-an-id", "status": "confirmed"},
+        {"booking_id": "0" * 24, "status": "shipped"},
+        "garbage",
+    ], supplier_id="s1"))
+    assert [(r["ok"], r["code"], r["detail"]) for r in results] == [
+        (False, 400, "Invalid booking_id"),
+        (False, 400, "Invalid status"),
+        (False, 400, "Invalid status"),
+    ]
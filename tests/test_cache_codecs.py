@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from bson import ObjectId
+from api.extensions.redis_cache.codecs import CODECS
+
+
+def test_codecs_round_trip_bson_types():
+    value = {
+        "_id": ObjectId(),
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 250000),
+        "items": [{"supplier_id": ObjectId(), "qty": 3, "price": 12.5}, None, "text"],
+        "active": True,
+    }
+    for name, codec in CODECS.items():
+        decoded = codec.decode(codec.encode(value))
+        assert decoded == value, name
+        assert isinstance(decoded["_id"], ObjectId), name
+
+
+def test_json_codec_keeps_timezone():
+    codec = CODECS["json"]
+    stamp = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    assert codec.decode(codec.encode({"at": stamp}))["at"] == stamp
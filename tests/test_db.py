@@ -1,21 +1,29 @@
 import pytest
-from api.db import db, client, session
+from fastapi.testclient import TestClient
+from api import db as database
 import os
 
 def test_mongodb_connection():
     if os.getenv('DB_TYPE') in ['mongodb', 'both']:
-        assert client is not None
-        assert db is not None
-        # Test connection by performing a simple operation
-        result = db.command('ping')
-        assert result['ok'] == 1
+        from server import app
+        # The Motor client is opened by the lifespan, so run the app
+        with TestClient(app) as test_client:
+            assert database.client is not None
+            assert database.db is not None
+            # Test connection by performing a simple operation on the app's event loop
+            result = test_client.portal.call(database.db.command, 'ping')
+            assert result['ok'] == 1
 
 def test_mysql_connection():
     if os.getenv('DB_TYPE') in ['mysql', 'both']:
-        assert session is not None
-        # Test connection by performing a simple query
-        try:
-            session.execute('SELECT 1')
-            assert True
-        except:
-            pytest.fail("MySQL connection failed") 
\ No newline at end of file
+        from server import app
+        # The session is opened per worker by the lifespan, so run the app
+        with TestClient(app):
+            assert database.session is not None
+            # Test connection by performing a simple query
+            try:
+                database.session.execute('SELECT 1')
+                assert True
+            except:
+                pytest.fail("MySQL connection failed")
+
@@ -0,0 +1,114 @@
+import asyncio
+import json
+from api.extensions.discord import AlertDispatcher
+
+
+class DebugWebhookServer:
+    """Minimal local HTTP/1.1 stand-in for a Discord webhook: records JSON bodies, answers 204"""
+
+    def __init__(self, delay: float = 0):
+        self.payloads = []
+        self.connections = 0
+        self.delay = delay
+        self.server = None
+        self.url = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/api/webhooks/test"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            content_length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b""):
+                    break
+                name, _, value = header.decode().partition(":")
+                if name.strip().lower() == "content-length":
+                    content_length = int(value.strip())
+            body = await reader.readexactly(content_length)
+            self.payloads.append(json.loads(body))
+            await asyncio.sleep(self.delay)
+            writer.write(b"HTTP/1.1 204 No Content\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+        writer.close()
+
+
+def test_alerts_are_deduplicated_and_batched_over_one_connection(monkeypatch):
+    monkeypatch.setattr("api.extensions.discord.DISCORD_ALERT_BATCH_WINDOW", 0.2)
+
+    async def scenario():
+        server = DebugWebhookServer()
+        await server.start()
+        try:
+            await AlertDispatcher.start(server.url)
+            assert AlertDispatcher.send("first", "1.1.1.1", "/wp-login.php")
+            await asyncio.sleep(0.4)
+            for i in range(100):
+                AlertDispatcher.send(f"scan {i}", "2.2.2.2", f"/path/{i % 20}")
+            await AlertDispatcher.stop(timeout=5)
+        finally:
+            await server.stop()
+        return server
+
+    server = asyncio.run(scenario())
+    # A lone alert keeps its text; the burst of 20 distinct routes becomes one digest
+    assert [payload["content"] for payload in server.payloads[:1]] == ["first"]
+    assert len(server.payloads) == 2
+    assert server.payloads[1]["content"].startswith("🚨 20 security events")
+    assert server.connections == 1
+
+
+def test_alerts_are_dropped_when_queue_is_full(monkeypatch):
+    monkeypatch.setattr("api.extensions.discord.DISCORD_ALERT_QUEUE_SIZE", 5)
+    monkeypatch.setattr("api.extensions.discord.DISCORD_ALERT_BATCH_WINDOW", 0)
+
+    async def scenario():
+        server = DebugWebhookServer(delay=0.5)
+        await server.start()
+        try:
+            await AlertDispatcher.start(server.url)
+            dropped_before = AlertDispatcher.dropped
+            accepted = [AlertDispatcher.send("alert", f"3.3.3.{i}", "/") for i in range(20)]
+            dropped = AlertDispatcher.dropped - dropped_before
+            await AlertDispatcher.stop(timeout=5)
+        finally:
+            await server.stop()
+        return accepted, dropped
+
+    accepted, dropped = asyncio.run(scenario())
+    assert accepted.count(True) == 5
+    assert dropped == 15
+
+
+def test_dedupe_memory_stays_bounded_during_a_wide_scan(monkeypatch):
+    monkeypatch.setattr("api.extensions.discord.DISCORD_ALERT_QUEUE_SIZE", 100)
+
+    async def scenario():
+        await AlertDispatcher.start("http://127.0.0.1:9/unused")
+        # Stand in for the sender so the queue never fills
+        AlertDispatcher._worker.cancel()
+        sizes = []
+        for i in range(10_000):
+            assert AlertDispatcher.send("scan", f"10.{i // 256 % 256}.{i % 256}.1", f"/probe/{i}")
+            AlertDispatcher._queue.get_nowait()
+            AlertDispatcher._queue.task_done()
+            sizes.append(len(AlertDispatcher._recent))
+        # Still deduplicating the most recent keys
+        repeated = AlertDispatcher.send("scan", "10.39.15.1", "/probe/9999")
+        await AlertDispatcher.stop(timeout=1)
+        return sizes, repeated
+
+    sizes, repeated = asyncio.run(scenario())
+    assert max(sizes) == 100
+    assert repeated is False
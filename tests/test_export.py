@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from api.extensions.helper.export import csv_rows, stream_export
+
+
+class FakeCursor:
+    """Async-iterable stand-in for a Motor cursor that records how far it was read"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.read = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.read >= len(self.documents):
+            raise StopAsyncIteration
+        self.read += 1
+        return self.documents[self.read - 1]
+
+    async def close(self):
+        self.closed = True
+
+
+def test_csv_writes_one_chunk_per_document():
+    oid = ObjectId()
+    cursor = FakeCursor([
+        {"_id": oid, "name": "a,b", "location": {"city": "Pune"}, "created_at": datetime(2025, 1, 1)},
+        {"_id": oid, "name": None},
+    ])
+
+    async def collect():
+        return [chunk async for chunk in csv_rows(cursor, ["_id", "name", "location", "created_at"])]
+
+    chunks = asyncio.run(collect())
+    assert chunks[0] == b"_id,name,location,created_at\r\n"
+    assert chunks[1] == f'{oid},"a,b","{{""city"":""Pune""}}",2025-01-01T00:00:00\r\n'.encode()
+    assert chunks[2] == f"{oid},,,\r\n".encode()
+
+
+def test_stream_stops_reading_and_closes_cursor_on_disconnect():
+    cursor = FakeCursor([{"_id": ObjectId(), "n": i} for i in range(100)])
+    response = stream_export(cursor, ["_id", "n"], "ndjson", "test")
+
+    async def read_two():
+        body = response.body_iterator
+        first = await body.__anext__()
+        await body.__anext__()
+        await body.aclose()
+        return first
+
+    first = asyncio.run(read_two())
+    assert first.endswith(b"\n") and b'"n":0' in first
+    assert cursor.read == 2
+    assert cursor.closed
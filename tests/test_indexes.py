@@ -0,0 +1,35 @@
+import runpy
+import sys
+import pytest
+from pymongo.errors import OperationFailure
+from api import db as database
+from api.db import indexes
+
+
+class EmptyCollection:
+    """A collection with only the default _id index and no $indexStats"""
+
+    async def index_information(self):
+        return {"_id_": {"key": [("_id", 1)]}}
+
+    def aggregate(self, pipeline):
+        raise OperationFailure("$indexStats not supported")
+
+
+def test_check_cli_reports_model_indexes(monkeypatch, capsys):
+    async def init_mongo():
+        monkeypatch.setattr(database, "isMongoDBAvailable", True)
+
+    monkeypatch.setattr(database, "init_mongo", init_mongo)
+    monkeypatch.setattr(database, "close_mongo", lambda: None)
+    monkeypatch.setattr(indexes, "get_collection", lambda name: EmptyCollection())
+    monkeypatch.setattr(sys, "argv", ["api.db.indexes", "--check"])
+
+    # Same as `python -m api.db.indexes --check`
+    with pytest.warns(RuntimeWarning), pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("api.db.indexes", run_name="__main__")
+
+    output = capsys.readouterr().out
+    assert exit_info.value.code == 1
+    assert "missing    orders.vendor_id_id" in output
+    assert "missing    orders.supplier_id_id" in output
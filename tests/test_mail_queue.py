@@ -0,0 +1,108 @@
+import asyncio
+import smtplib
+from api.extensions.mail import MAIL
+from api.extensions.mail.queue import MailQueue
+
+
+class DebugSMTPServer:
+    """Minimal local SMTP stand-in: accepts AUTH PLAIN and records every delivered message"""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+
+        async def reply(line):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply("220 localhost debug SMTP")
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                await reply("250-localhost")
+                await reply("250 AUTH PLAIN")
+            elif command.startswith("AUTH"):
+                await reply("235 Authentication successful")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                await reply("250 OK")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    data_line = await reader.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    data.append(data_line)
+                self.messages.append(b"".join(data))
+                await reply("250 Queued")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("502 Command not implemented")
+        writer.close()
+
+
+def test_mail_queue_batches_over_pooled_connections(monkeypatch):
+    async def scenario():
+        server = DebugSMTPServer()
+        await server.start()
+        monkeypatch.setattr(MAIL, "MAIL_SERVER", "127.0.0.1")
+        monkeypatch.setattr(MAIL, "MAIL_PORT", str(server.port))
+        monkeypatch.setattr(MAIL, "MAIL_USERNAME", "sender@example.com")
+        monkeypatch.setattr(MAIL, "MAIL_PASSWORD", "secret")
+        monkeypatch.setattr(MAIL, "MAIL_USE_TLS", False)
+        monkeypatch.setattr(MAIL, "MAIL_USE_SSL", False)
+        try:
+            await MAIL.queueHtmlMail("one@example.com", "Tester", "OTP", "Your OTP is 1", "<b>1</b>")
+            await MAIL.queueBatch([
+                MAIL.buildHtmlMail(f"user{i}@example.com", "Tester", "Batch", "Body", "<b>Body</b>")
+                for i in range(25)
+            ])
+            await MailQueue.stop(timeout=10)
+        finally:
+            await server.stop()
+        return server
+
+    server = asyncio.run(scenario())
+    assert len(server.messages) == 26
+    # Connections are reused across messages instead of one per mail
+    assert server.connections <= 2
+
+
+def test_mail_queue_retries_when_server_is_down(monkeypatch):
+    async def scenario():
+        attempts = []
+
+        def refuse():
+            attempts.append(1)
+            raise smtplib.SMTPConnectError(421, "unavailable")
+
+        monkeypatch.setattr("api.extensions.mail.queue.MAIL_RETRY_BACKOFF", 0.01)
+        monkeypatch.setattr("api.extensions.mail.queue.MAIL_MAX_RETRIES", 2)
+        failed_before = MailQueue.failed
+        await MailQueue.start(refuse)
+        MailQueue.enqueue([MAIL.buildHtmlMail("x@example.com", "Tester", "OTP", "Body", "<b>Body</b>")])
+        await asyncio.sleep(0.5)
+        await MailQueue.stop(timeout=1)
+        return len(attempts), MailQueue.failed - failed_before
+
+    attempts, failed = asyncio.run(scenario())
+    assert attempts == 3
+    assert failed == 1
@@ -0,0 +1,44 @@
+import asyncio
+from api import db as database
+from api.extensions.redis_cache.tiered import TieredCache
+from api.models.order.Order import Order, price_lines
+from api.models.product.Product import ProductModel
+
+
+def test_get_many_loads_only_missing_keys_once(monkeypatch):
+    monkeypatch.setattr(database, "redis_client", None)
+    TieredCache.register_namespace("test_prices", ttl=60, local_ttl=60)
+    loads = []
+
+    async def loader(keys):
+        loads.append(keys)
+        return {key: {"price": len(key)} for key in keys if key != "gone"}
+
+    async def scenario():
+        first = await TieredCache.get_many("test_prices", ["a", "bb", "gone"], loader)
+        second = await TieredCache.get_many("test_prices", ["bb", "ccc", "a"], loader)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == {"a": {"price": 1}, "bb": {"price": 2}}
+    assert second == {"bb": {"price": 2}, "ccc": {"price": 3}, "a": {"price": 1}}
+    # One loader call per request, only for keys not already cached
+    assert loads == [["a", "bb", "gone"], ["ccc"]]
+
+
+def test_quote_totals_match_checkout_pricing(monkeypatch):
+    a, b, missing = "a" * 24, "b" * 24, "c" * 24
+
+    async def get_prices(product_ids):
+        prices = {a: {"name": "Onion", "unit": "kg", "price_per_unit": 0.1, "supplier_id": "s1"},
+                  b: {"name": "Rice", "unit": "kg", "price_per_unit": 1.15, "supplier_id": "s1"}}
+        return {product_id: prices[product_id] for product_id in product_ids if product_id in prices}
+
+    monkeypatch.setattr(ProductModel, "get_prices", get_prices)
+    quote = asyncio.run(Order.quote([
+        {"product_id": a, "qty": 3}, {"product_id": b, "qty": 3}, {"product_id": missing, "qty": 1},
+    ]))
+
+    assert [(item["product_id"], item["total_price"]) for item in quote["items"]] == [(a, 0.3), (b, 3.45)]
+    assert quote["total_price"] == price_lines([0.1, 1.15], [3, 3])[1] == 3.75
+    assert quote["missing"] == [missing]
@@ -0,0 +1,35 @@
+import asyncio
+from api.extensions.helper.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"items": [1, 2, 3]}
+
+    async def scenario():
+        results = await asyncio.gather(*(SingleFlight.do("test:page:first:50", load) for _ in range(20)))
+        # Once finished, the next caller computes again
+        await SingleFlight.do("test:page:first:50", load)
+        return results
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results)
+    stats = SingleFlight.stats()["test"]
+    assert stats["coalesced"] == 19
+
+
+def test_errors_reach_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(*(SingleFlight.do("test:fail", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,26 @@
+import json
+from api.extensions.jwt import create_token
+from api.socket import sio_server, user_room, role_room
+
+WS_URL = "/sockets/?EIO=4&transport=websocket"
+WS_HEADERS = {"user-agent": "Mozilla/5.0", "upgrade": "websocket", "connection": "upgrade"}
+
+
+def test_connect_requires_a_valid_token(client):
+    with client.websocket_connect(WS_URL, headers=WS_HEADERS) as ws:
+        ws.receive_text()  # engine.io open packet
+        ws.send_text("40" + json.dumps({"token": "not-a-jwt"}))
+        assert ws.receive_text().startswith("44")
+
+
+def test_authenticated_socket_joins_user_and_role_rooms(client):
+    token, _ = create_token({"uid": "socket-user", "role": "supplier"})
+    with client.websocket_connect(WS_URL, headers=WS_HEADERS) as ws:
+        ws.receive_text()
+        ws.send_text("40" + json.dumps({"token": token}))
+        packets = [ws.receive_text(), ws.receive_text()]
+        assert any(p.startswith("40{") for p in packets)
+
+        rooms = sio_server.manager.rooms["/"]
+        assert len(rooms[user_room("socket-user")]) == 1
+        assert len(rooms[role_room("supplier")]) == 1
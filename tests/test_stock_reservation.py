@@ -0,0 +1,79 @@
+import asyncio
+import os
+import pytest
+from fastapi import HTTPException
+from motor.motor_asyncio import AsyncIOMotorClient
+from api import db as database
+from api.socket import SocketEmitter
+from api.models.order import Order as order_module
+from api.models.order.Order import Order, _order_lines, _use_transactions, stock_lines
+
+BOOKINGS = 1000
+STOCK = 250
+
+
+@pytest.mark.skipif(not os.getenv("MONGO_SERVER_URL"), reason="needs a MongoDB server (MONGO_SERVER_URL)")
+def test_parallel_bookings_never_oversell(monkeypatch):
+    async def no_push(*args, **kwargs):
+        return True
+
+    # Cache invalidation and socket pushes are not under test
+    monkeypatch.setattr(database, "redis_client", None)
+    monkeypatch.setattr(SocketEmitter, "to_user", no_push)
+
+    async def scenario():
+        client = AsyncIOMotorClient(os.getenv("MONGO_SERVER_URL"), maxPoolSize=100)
+        db = client[f"{os.getenv('MONGO_DB_NAME', 'farm_stack')}_stock_test"]
+        monkeypatch.setattr(database, "db", db)
+        try:
+            await db["orders"].delete_many({})
+            product = await db["products"].insert_one(
+                {"name": "Onion", "price_per_unit": 12.5, "available_quantity": STOCK, "supplier_id": "s1"}
+            )
+            product_id = str(product.inserted_id)
+
+            async def book(i):
+                return await Order.create_booking({
+                    "vendor_id": f"v{i}", "product_id": product_id, "qty": 1, "total_price": 0.01,
+                })
+
+            results = await asyncio.gather(*(book(i) for i in range(BOOKINGS)), return_exceptions=True)
+            remaining = (await db["products"].find_one({"_id": product.inserted_id}))["available_quantity"]
+            orders = await db["orders"].count_documents({"product_id": product_id})
+            return results, remaining, orders
+        finally:
+            await client.drop_database(db.name)
+            client.close()
+
+    results, remaining, orders = asyncio.run(scenario())
+    created = [r for r in results if isinstance(r, dict)]
+    refused = [r for r in results if isinstance(r, HTTPException)]
+
+    assert len(created) == orders == STOCK
+    assert remaining == 0
+    assert len(refused) == BOOKINGS - STOCK and all(r.status_code == 409 for r in refused)
+    # Price comes from the product, not the client
+    assert all(r["total_price"] == 12.5 and r["supplier_id"] == "s1" for r in created)
+
+
+def test_order_lines_merge_repeated_products_and_validate():
+    a, b = "a" * 24, "b" * 24
+    assert _order_lines([{"product_id": a, "qty": 2}, {"product_id": b, "qty": 1}, {"product_id": a, "qty": 3}]) == {a: 5, b: 1}
+    for items in ([], [{"product_id": "x", "qty": 1}], [{"product_id": a, "qty": 0}], [{"product_id": a, "qty": True}]):
+        with pytest.raises(HTTPException) as error:
+            _order_lines(items)
+        assert error.value.status_code == 400
+    # Single-product bookings and multi-line orders release the same way
+    assert stock_lines({"product_id": a, "qty": 2}) == {a: 2}
+    assert stock_lines({"items": [{"product_id": a, "qty": 2}, {"product_id": b, "qty": 4}]}) == {a: 2, b: 4}
+
+
+def test_transactions_follow_the_server_unless_forced(monkeypatch):
+    monkeypatch.setattr(order_module, "ORDER_TRANSACTIONS", "auto")
+    # Standalone mongod: multi-line orders take the compensating path
+    monkeypatch.setattr(database, "mongoSupportsTransactions", False)
+    assert _use_transactions() is False
+    monkeypatch.setattr(database, "mongoSupportsTransactions", True)
+    assert _use_transactions() is True
+    monkeypatch.setattr(order_module, "ORDER_TRANSACTIONS", "false")
+    assert _use_transactions() is False
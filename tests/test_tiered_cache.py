@@ -0,0 +1,31 @@
+import asyncio
+from api import db as database
+from api.extensions.redis_cache.tiered import TieredCache
+
+
+def test_tiered_cache_serves_l1_and_drops_on_invalidation(monkeypatch):
+    # Without Redis the L2 tier is a miss and the in-process tier still works
+    monkeypatch.setattr(database, "redis_client", None)
+    TieredCache.register_namespace("test_items", ttl=60, local_ttl=60, max_entries=2)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        return {"value": len(loads)}
+
+    async def scenario():
+        first = await TieredCache.get("test_items", "a", loader)
+        second = await TieredCache.get("test_items", "a", loader)
+        # Another worker's invalidation arrives over pub/sub
+        TieredCache._apply_invalidation(b"test_items a")
+        third = await TieredCache.get("test_items", "a", loader)
+        await TieredCache.get("test_items", "b", loader)
+        await TieredCache.get("test_items", "c", loader)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    stats = TieredCache.stats()["namespaces"]["test_items"]
+    assert first == second == {"value": 1}
+    assert third == {"value": 2}
+    assert stats["l1_hits"] == 1
+    assert stats["size"] == 2
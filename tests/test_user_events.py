@@ -0,0 +1,24 @@
+import asyncio
+from api import db as database
+from api.socket import SocketEmitter
+from api.socket.events import UserEvents
+
+
+def test_publish_pushes_live_without_redis(monkeypatch):
+    monkeypatch.setattr(database, "redis_client", None)
+    pushed = []
+
+    async def capture(user_id, event, data):
+        pushed.append((user_id, event, data))
+        return True
+
+    monkeypatch.setattr(SocketEmitter, "to_user", capture)
+    asyncio.run(UserEvents.publish("booking:status", {"booking_id": "b1", "status": "confirmed"}, "v1", "s1", "v1"))
+
+    # Each party once; no resume token, so a reconnecting client will resync
+    assert [(user, event) for user, event, _ in pushed] == [("v1", "booking:status"), ("s1", "booking:status")]
+    assert all(data["resume"] is None and data["status"] == "confirmed" for _, _, data in pushed)
+
+
+def test_unknown_resume_token_needs_resync():
+    assert asyncio.run(UserEvents.missed("v1", "not-a-stream-id")) is None